@@ -0,0 +1,242 @@
+"""
+Declarative intent rules for the assistant.
+
+A ``Rule`` names an intent and says when it applies:
+
+- ``all_words`` / ``any_words``: whole words of the message (accent and
+  case-insensitive); ``"cancel*"`` matches any word starting with
+  "cancel", and several words ("cancel all") must appear in sequence;
+- ``pattern``: a regular expression that must also be found (case
+  insensitive); its named groups become slots;
+- ``context``: a flag the caller must have set (e.g. the GUI waiting for a
+  client's name); context rules match any text unless they say otherwise;
+- ``slots``: more values to pull out of the message, each a regular
+  expression (its first group, or the whole match) or a function of the
+  text;
+- ``priority``: the highest-priority applicable rule wins, ties going to
+  the rule declared first.
+
+``RuleEngine`` compiles a rule set into one word scan plus a dispatch
+table from keywords to the rules that need them, so a message is read once
+and only rules whose keywords are present are looked at. It counts hits
+per rule and the time spent matching.
+
+``assistant_rules`` holds the rules shared by the AI Assistant tab and the
+conversation engine.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+from smartscheduler.models.person import normalize_name
+
+_WORD = re.compile(r"[^\W_]+")
+
+SlotExtractor = Union[str, Callable[[str], object]]
+
+@dataclass(frozen=True)
+class Rule:
+    intent: str
+    all_words: Tuple[str, ...] = ()
+    any_words: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    context: Optional[str] = None
+    priority: int = 0
+    slots: Mapping[str, SlotExtractor] = field(default_factory=dict)
+
+@dataclass
+class IntentMatch:
+    intent: str
+    slots: Dict[str, object]
+    text: str
+
+@dataclass
+class _Compiled:
+    rule: Rule
+    all_ids: FrozenSet[int]
+    any_ids: FrozenSet[int]
+    pattern: Optional["re.Pattern"]
+    extractors: List[Tuple[str, Callable[[str], object]]]
+
+def _regex_slot(pattern: str) -> Callable[[str], object]:
+    regex = re.compile(pattern, re.IGNORECASE)
+
+    def extract(text: str):
+        m = regex.search(text)
+        if m is None:
+            return None
+        return (m.group(1) if regex.groups else m.group(0)).strip()
+    return extract
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+class RuleEngine:
+    def __init__(self, rules: Collection[Rule]):
+        self._keyword_ids: Dict[str, int] = {}
+        self._words: Dict[str, int] = {}
+        self._stems: Dict[str, int] = {}
+        self._phrases: Dict[str, int] = {}
+        # Best rule first; a rule's position is its rank.
+        ordered = sorted(enumerate(rules), key=lambda ir: (-ir[1].priority, ir[0]))
+        self._rules: List[_Compiled] = []
+        self._by_keyword: Dict[int, List[int]] = {}
+        self._always: List[int] = []
+        for rank, (_, rule) in enumerate(ordered):
+            all_ids = frozenset(self._keyword(w) for w in rule.all_words)
+            any_ids = frozenset(self._keyword(w) for w in rule.any_words)
+            self._rules.append(_Compiled(
+                rule,
+                all_ids,
+                any_ids,
+                re.compile(rule.pattern, re.IGNORECASE) if rule.pattern else None,
+                [
+                    (name, _regex_slot(extract) if isinstance(extract, str) else extract)
+                    for name, extract in rule.slots.items()
+                ],
+            ))
+            # One required keyword is enough to find the rule.
+            keys = sorted(all_ids)[:1] or sorted(any_ids)
+            for key in keys:
+                self._by_keyword.setdefault(key, []).append(rank)
+            if not keys:
+                self._always.append(rank)
+        self._stem_lengths = sorted({len(s) for s in self._stems})
+        self._phrase_sizes = sorted({p.count(" ") + 1 for p in self._phrases})
+
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {c.rule.intent: 0 for c in self._rules}
+        self.messages = 0
+        self.unmatched = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _keyword(self, keyword: str) -> int:
+        key = self._keyword_ids.setdefault(keyword, len(self._keyword_ids))
+        term = normalize_name(keyword.rstrip("*"))
+        if keyword.endswith("*"):
+            self._stems[term] = key
+        elif " " in term:
+            self._phrases[term] = key
+        else:
+            self._words[term] = key
+        return key
+
+    def _scan(self, text: str) -> set:
+        """Ids of the keywords present in ``text``."""
+        words = _WORD.findall(normalize_name(text))
+        found = set()
+        for word in words:
+            key = self._words.get(word)
+            if key is not None:
+                found.add(key)
+            for length in self._stem_lengths:
+                if length > len(word):
+                    break
+                key = self._stems.get(word[:length])
+                if key is not None:
+                    found.add(key)
+        for size in self._phrase_sizes:
+            for i in range(len(words) - size + 1):
+                key = self._phrases.get(" ".join(words[i:i + size]))
+                if key is not None:
+                    found.add(key)
+        return found
+
+    def match(self, text: str, context: Collection[str] = ()) -> Optional[IntentMatch]:
+        """The best rule applying to ``text`` under the given context flags."""
+        began = time.perf_counter()
+        found = self._scan(text)
+        candidates = set(self._always)
+        for key in found:
+            candidates.update(self._by_keyword.get(key, ()))
+        result = None
+        for rank in sorted(candidates):
+            compiled = self._rules[rank]
+            rule = compiled.rule
+            if rule.context is not None and rule.context not in context:
+                continue
+            if not compiled.all_ids <= found or (compiled.any_ids and not compiled.any_ids & found):
+                continue
+            slots: Dict[str, object] = {}
+            if compiled.pattern is not None:
+                m = compiled.pattern.search(text)
+                if m is None:
+                    continue
+                slots.update(m.groupdict())
+            for name, extract in compiled.extractors:
+                slots[name] = extract(text)
+            result = IntentMatch(rule.intent, slots, text)
+            break
+        elapsed = time.perf_counter() - began
+        with self._lock:
+            self.messages += 1
+            self.seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            if result is None:
+                self.unmatched += 1
+            else:
+                self.hits[result.intent] += 1
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        """Hits per intent and match latency (mean and max, microseconds)."""
+        with self._lock:
+            return {
+                "messages": self.messages,
+                "unmatched": self.unmatched,
+                "hits": dict(self.hits),
+                "mean_us": self.seconds / self.messages * 1e6 if self.messages else 0.0,
+                "max_us": self.max_seconds * 1e6,
+            }
+
+# ---------------------------------------------------------------------------
+# Assistant rules
+# ---------------------------------------------------------------------------
+INTENT_PICK_APPOINTMENT = "pick_appointment"
+INTENT_CANCEL_APPOINTMENT = "cancel_appointment"
+INTENT_CANCEL_CLIENT_NAME = "cancel_client_name"
+INTENT_SCHEDULE_EXPLICIT = "schedule_explicit"
+INTENT_CONFIRM_CANCEL_ALL = "confirm_cancel_all"
+INTENT_CANCEL_ALL = "cancel_all"
+INTENT_GREETING = "greeting"
+INTENT_RESTART = "restart"
+
+# Context flags set by the AI Assistant tab.
+CONTEXT_CHOOSING_APPOINTMENT = "choosing_appointment"
+CONTEXT_AWAITING_CLIENT = "awaiting_client"
+CONTEXT_CONFIRMING_CANCEL_ALL = "confirming_cancel_all"
+
+def _number(text: str) -> Optional[int]:
+    try:
+        return int(text.strip())
+    except ValueError:
+        return None
+
+_AFTER_FOR = r"\bfor\s+(.+)"
+
+# Priorities keep the order in which the tab used to test these.
+ASSISTANT_RULES = (
+    Rule(INTENT_PICK_APPOINTMENT, context=CONTEXT_CHOOSING_APPOINTMENT, priority=100,
+         slots={"choice": _number}),
+    Rule(INTENT_CANCEL_APPOINTMENT, all_words=("cancel*", "appointment*"), priority=90,
+         slots={"client_name": _AFTER_FOR}),
+    Rule(INTENT_CANCEL_CLIENT_NAME, context=CONTEXT_AWAITING_CLIENT, priority=80,
+         slots={"client_name": lambda text: text.strip()}),
+    # 'Schedule appointment with Laura Sanchez on 27/06/2025 at 16:00 for Adriana Vargas'
+    Rule(INTENT_SCHEDULE_EXPLICIT, any_words=("appointment", "cita"), priority=70,
+         pattern=r"(?:appointment|cita)\s+with\s+(?P<employee>[\w\s]+)\s+on\s+(?P<date>\d{1,2}/\d{1,2}/\d{4})"
+                 r"\s+at\s+(?P<time>\d{1,2}(?::\d{2})?)\s*(?P<meridiem>am|pm)?(?:\s+for\s+(?P<client>[\w\s]+))?"),
+    Rule(INTENT_CONFIRM_CANCEL_ALL, context=CONTEXT_CONFIRMING_CANCEL_ALL, priority=60,
+         slots={"confirmed": lambda text: text.strip().lower() in ("si", "yes", "confirm", "ok")}),
+    # Reached only when cancel_appointment does not apply, as before.
+    Rule(INTENT_CANCEL_ALL, all_words=("cancel all", "appointments"), priority=50,
+         slots={"client_name": _AFTER_FOR}),
+    Rule(INTENT_GREETING, any_words=("hello", "hi", "hey", "hola"), priority=20),
+    Rule(INTENT_RESTART, any_words=("start", "restart", "reset", "nuevo", "empezar de nuevo"), priority=10),
+)
+
+assistant_rules = RuleEngine(ASSISTANT_RULES)
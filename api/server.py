@@ -0,0 +1,349 @@
+"""
+Local HTTP/JSON API.
+
+A small HTTP/1.1 server (keep-alive, JSON bodies) on ``asyncio`` streams,
+so several front desks, scripts or integrations can use SmartScheduler at
+once instead of going through the GUI:
+
+    GET  /health
+    GET  /employees
+    GET  /appointments?employee_id=&client_id=&status=&start=&end=&limit=
+    POST /appointments                {"client", "employee", "start", "end"}
+    POST /appointments/<id>/cancel
+    POST /clients/cancel              {"client"}
+    POST /assistant                   {"session_id"?, "text"}
+
+The event loop never touches SQLite. Reads (and the assistant) run on a
+bounded thread pool. Writes, including the bookings the assistant makes,
+go through one ``WriteQueue`` (``data/writer.py``). A semaphore caps the
+requests in flight, so a burst waits at the socket instead of queueing
+without bound. Times are ISO 8601 wall-clock times in the configured zone;
+a time with a UTC offset is converted to that zone first.
+
+Run with:  python -m smartscheduler.api.server [--host H] [--port P] [--db PATH]
+           [--threads N] [--max-pending N]
+"""
+
+import asyncio
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from itertools import islice
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from smartscheduler.core.ai_engine import book, chat_completion, set_booker
+from smartscheduler.core.sessions import sessions
+from smartscheduler.data import connection
+from smartscheduler.data.database import (
+    cancel_appointment_by_id,
+    cancel_appointments_by_client_id,
+    create_tables,
+    get_client_by_name,
+    iter_appointments,
+)
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.data.timestamps import to_local
+from smartscheduler.data.writer import WriteQueue
+
+DEFAULT_THREADS = 4
+DEFAULT_MAX_PENDING = 256
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BODY = 1024 * 1024
+MAX_HEADERS = 100
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    keep_alive: bool = True
+    params: Dict[str, str] = field(default_factory=dict)  # from the route
+
+    def json(self) -> dict:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return data
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """The next request on the connection, or None once the client is done."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) == MAX_HEADERS:
+            raise HTTPError(431, "too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length")
+    if length < 0:
+        raise HTTPError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    token = headers.get("connection", "").lower()
+    keep_alive = token != "close" if version == "HTTP/1.1" else token == "keep-alive"
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return Request(method.upper(), url.path, query, body, keep_alive)
+
+def render_response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+# ---------------------------------------------------------------------------
+# Request parsing helpers
+# ---------------------------------------------------------------------------
+def _int(value, name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"'{name}' must be an integer")
+
+def _time(value, name: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        return to_local(datetime.fromisoformat(str(value))).replace(microsecond=0)
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an ISO 8601 date/time")
+
+def _text(data: dict, name: str) -> str:
+    value = data.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{name}' is required")
+    return value.strip()
+
+def _appointment(row) -> dict:
+    appointment_id, client, employee, start, end, status = row
+    return {
+        "id": appointment_id,
+        "client": client,
+        "employee": employee,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "status": status,
+    }
+
+def _cancel_for_client(name: str) -> Optional[int]:
+    client = get_client_by_name(name)
+    if client is None:
+        return None
+    return cancel_appointments_by_client_id(client.id)
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+class APIServer:
+    def __init__(self, threads: int = DEFAULT_THREADS, max_pending: int = DEFAULT_MAX_PENDING):
+        self.reads = ThreadPoolExecutor(threads, thread_name_prefix="api-read")
+        self.writes = WriteQueue(name="api-writer")
+        self.pending = asyncio.Semaphore(max_pending)
+        # The assistant's bookings go through the writer too.
+        self._previous_booker = set_booker(self._book)
+        self.routes = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("GET", re.compile(r"/employees"), self.employees),
+            ("GET", re.compile(r"/appointments"), self.list_appointments),
+            ("POST", re.compile(r"/appointments"), self.create_appointment),
+            ("POST", re.compile(r"/appointments/(?P<id>\d+)/cancel"), self.cancel_appointment),
+            ("POST", re.compile(r"/clients/cancel"), self.cancel_client),
+            ("POST", re.compile(r"/assistant"), self.assistant),
+        ]
+
+    def close(self) -> None:
+        set_booker(self._previous_booker)
+        self.reads.shutdown()
+        self.writes.close()
+
+    def _book(self, *args):
+        return self.writes.submit(book, *args).result()
+
+    async def read(self, fn, *args):
+        """Run blocking read work on the thread pool."""
+        async with self.pending:
+            return await asyncio.get_running_loop().run_in_executor(self.reads, partial(fn, *args))
+
+    async def write(self, fn, *args):
+        """Run a write on the writer thread, once committed."""
+        async with self.pending:
+            return await asyncio.wrap_future(self.writes.submit(fn, *args))
+
+    # --- Connection handling ---
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    writer.write(render_response(e.status, {"error": str(e)}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, payload = await self.dispatch(request)
+                writer.write(render_response(status, payload, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request):
+        allowed = False
+        for method, pattern, handler in self.routes:
+            m = pattern.fullmatch(request.path)
+            if m is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = m.groupdict()
+            try:
+                return await handler(request)
+            except HTTPError as e:
+                return e.status, {"error": str(e)}
+            except Exception as e:
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+        if allowed:
+            return 405, {"error": f"{request.method} not allowed on {request.path}"}
+        return 404, {"error": f"no route for {request.path}"}
+
+    # --- Endpoints ---
+    async def health(self, request: Request):
+        return 200, {"status": "ok", "pending_writes": self.writes.pending()}
+
+    async def employees(self, request: Request):
+        def load():
+            return [
+                {"id": e.id, "name": e.name, "role": e.role, "email": e.email}
+                for e in employee_directory.employees()
+            ]
+        return 200, await self.read(load)
+
+    async def list_appointments(self, request: Request):
+        q = request.query
+        limit = _int(q.get("limit"), "limit") or DEFAULT_LIMIT
+        if not 1 <= limit <= MAX_LIMIT:
+            raise HTTPError(400, f"'limit' must be between 1 and {MAX_LIMIT}")
+        rows = iter_appointments(
+            employee_id=_int(q.get("employee_id"), "employee_id"),
+            client_id=_int(q.get("client_id"), "client_id"),
+            status=q.get("status"),
+            start_time=_time(q.get("start"), "start"),
+            end_time=_time(q.get("end"), "end"),
+            page_size=limit,
+        )
+        return 200, await self.read(lambda: [_appointment(row) for row in islice(rows, limit)])
+
+    async def create_appointment(self, request: Request):
+        data = request.json()
+        client, employee = _text(data, "client"), _text(data, "employee")
+        start, end = _time(data.get("start"), "start"), _time(data.get("end"), "end")
+        if start is None or end is None or end <= start:
+            raise HTTPError(400, "'start' and 'end' are required, with end after start")
+        success, message = await self.write(book, client, employee, start, end)
+        return (201 if success else 409), {"success": success, "message": message}
+
+    async def cancel_appointment(self, request: Request):
+        affected = await self.write(cancel_appointment_by_id, int(request.params["id"]))
+        return 200, {"cancelled": affected}
+
+    async def cancel_client(self, request: Request):
+        name = _text(request.json(), "client")
+        affected = await self.write(_cancel_for_client, name)
+        if affected is None:
+            raise HTTPError(404, f"no client named '{name}'")
+        return 200, {"cancelled": affected}
+
+    async def assistant(self, request: Request):
+        data = request.json()
+        text = data.get("text")
+        if not isinstance(text, str):
+            raise HTTPError(400, "'text' is required")
+        session_id = data.get("session_id")
+        session = sessions.get(str(session_id) if session_id else None)
+        reply = await self.read(chat_completion, session, [("user", text)])
+        return 200, {"session_id": session.id, "reply": reply}
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, threads: int = DEFAULT_THREADS,
+                max_pending: int = DEFAULT_MAX_PENDING, ready=None) -> None:
+    """Serve until cancelled. ``ready``, if given, is called with the bound port."""
+    api = APIServer(threads, max_pending)
+    server = await asyncio.start_server(api.handle, host, port, backlog=1024)
+    try:
+        bound = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(bound)
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def main(argv) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the SmartScheduler JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", help="database file (default: the configured one)")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="read threads")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="requests in flight before new ones wait")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        connection.configure(path=args.db)
+    create_tables()
+    try:
+        asyncio.run(serve(args.host, args.port, args.threads, args.max_pending,
+                          ready=lambda port: print(f"Listening on http://{args.host}:{port}")))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+"""
+Refresh and scroll latency of the virtualized appointment list as the
+table grows.
+
+Scratch databases of 1 000 to 1 000 000 appointments are read through
+``AppointmentPager`` (the data side of the View appointments tab, without
+Tk) in every sort order:
+
+- a refresh (count plus first page);
+- line-by-line scrolling;
+- page-down scrolling;
+- random scrollbar jumps, before and after the idle sweep that
+  remembers sort keys all along the list (its total time is shown too);
+- catching up with another connection's writes (one booking and one
+  status change) through the change feed.
+
+For comparison, it also times reading every row, as the old full refresh
+did before inserting them all into the Treeview.
+
+Run with:  python -m smartscheduler.benchmarks.bench_appointment_list [sizes...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from smartscheduler.data import connection, database
+from smartscheduler.data.database import APPOINTMENT_SORTS, STATUS_SCHEDULED, iter_appointments
+from smartscheduler.models.person import normalize_name
+from smartscheduler.views.appointment_list import AppointmentPager
+
+VISIBLE = 30
+STATUSES = ("Scheduled", "Completed", "Cancelled")
+
+def _fill(size: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    conn = connection.get_connection()
+    clients = max(10, size // 10)
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO employees (name, email, phone, role, availability, name_key) VALUES (?, ?, ?, ?, '{}', ?)",
+            ((f"Employee {i}", f"e{i}@clinic.com", "0", "Doctor", normalize_name(f"Employee {i}"))
+             for i in range(50)),
+        )
+        conn.executemany(
+            "INSERT INTO clients (name, email, phone, name_key) VALUES (?, '', '', ?)",
+            ((f"Client {n}", normalize_name(f"Client {n}"))
+             for n in (rng.randrange(10 ** 7) for _ in range(clients))),
+        )
+        rows = []
+        for _ in range(size):
+            start = 1_900_000_000 + rng.randrange(10 ** 8) // 1800 * 1800
+            rows.append((rng.randrange(1, clients + 1), rng.randrange(1, 51), start, start + 3600,
+                         rng.choice(STATUSES)))
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    conn.execute("ANALYZE")
+
+def _ms(work, repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        work()
+    return (time.perf_counter() - began) / repeat * 1000
+
+def _measure(pager: AppointmentPager, rng: random.Random):
+    refresh = _ms(lambda: (pager.refresh(), pager.rows(0, VISIBLE)), 5)
+    top = [0]
+
+    def line():
+        top[0] += 1
+        pager.rows(top[0], VISIBLE)
+
+    def page():
+        top[0] += VISIBLE
+        pager.rows(top[0], VISIBLE)
+
+    step = _ms(line, 300)
+    top[0] = 0
+    page_down = _ms(page, 100)
+    def jump():
+        pager.rows(rng.randrange(max(1, pager.total - VISIBLE)), VISIBLE)
+
+    cold = _ms(jump, 20)
+    began = time.perf_counter()
+    while pager.sweep():
+        pass
+    sweep = (time.perf_counter() - began) * 1000
+    after_sweep = _ms(jump, 50)
+    return refresh, step, page_down, cold, sweep, after_sweep, _catch_up(pager, rng)
+
+def _catch_up(pager: AppointmentPager, rng: random.Random, repeat: int = 20) -> float:
+    other = connection.open_connection()
+    spent = 0.0
+    for _ in range(repeat):
+        start = 1_900_000_000 + rng.randrange(10 ** 8) // 1800 * 1800
+        other.execute(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) VALUES (1, 1, ?, ?, ?)",
+            (start, start + 3600, STATUS_SCHEDULED),
+        )
+        other.execute("UPDATE appointments SET status = ? WHERE id = ?",
+                      (rng.choice(STATUSES), 1 + rng.randrange(pager.total)))
+        began = time.perf_counter()
+        pager.catch_up()
+        pager.rows(0, VISIBLE)
+        spent += time.perf_counter() - began
+    other.close()
+    return spent / repeat * 1000
+
+def _row(times) -> str:
+    refresh, step, page_down, cold, sweep, jump, catch_up = times
+    return (f"{refresh:>10.2f} {step:>8.3f} {page_down:>8.3f} {cold:>8.2f} "
+            f"{sweep:>9.0f} {jump:>10.2f} {catch_up:>11.2f}")
+
+def main(sizes) -> None:
+    print(f"{'rows':>9} {'sort':>8} {'refresh ms':>10} {'line ms':>8} {'page ms':>8} {'jump ms':>8} "
+          f"{'sweep ms':>9} {'jump after':>10} {'catch-up ms':>11} {'full read ms':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.configure(path=os.path.join(tmp, "list.db"))
+            database.create_tables()
+            _fill(size)
+            rng = random.Random(2)
+            full = _ms(lambda: sum(1 for _ in iter_appointments()), 1)
+            for sort in APPOINTMENT_SORTS:
+                pager = AppointmentPager()
+                pager.set_sort(sort)
+                print(f"{size:>9} {sort:>8} {_row(_measure(pager, rng))} {full:>12.0f}")
+            pager = AppointmentPager()
+            pager.set_filters(status=STATUS_SCHEDULED)
+            print(f"{size:>9} {'sched.':>8} {_row(_measure(pager, rng))}")
+            connection.close_connection()
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000, 1000000])
@@ -0,0 +1,80 @@
+"""
+Double-booking audit over a synthetic book of N appointments (200
+employees, hourly slots, 70% still scheduled, every 997th slot pushed 30
+minutes late so it overlaps its neighbour or runs past closing time).
+
+Run with:  python -m smartscheduler.benchmarks.bench_audit [N]
+(default: 10000000; the book is built in SQL, which takes a minute or so)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from smartscheduler.data import audit, connection, database
+from smartscheduler.data.migrations import explain
+from smartscheduler.models.person import Employee
+
+EMPLOYEES = 200
+ORIGIN = datetime(2015, 1, 1)
+
+
+def _build(n):
+    database.create_tables()
+    conn = connection.get_connection()
+    hours = {day: ["08:00-18:00"] for day in ("Monday", "Tuesday", "Wednesday", "Thursday",
+                                              "Friday", "Saturday", "Sunday")}
+    for i in range(EMPLOYEES):
+        database.add_employee(Employee(name=f"Employee {i}", email=f"e{i}@clinic.com",
+                                       phone="0", role="Doctor", availability=hours))
+    conn.execute("INSERT INTO clients (name, name_key) VALUES ('Bench Client', 'bench client')")
+    # The audit never reads the R*Tree; keeping it in sync would dominate
+    # the build time.
+    for event in ("insert", "update", "delete"):
+        conn.execute(f"DROP TRIGGER trg_appointments_interval_{event}")
+
+    began = time.perf_counter()
+    with connection.transaction():
+        conn.execute(
+            """WITH RECURSIVE k(x) AS (SELECT 0 UNION ALL SELECT x + 1 FROM k WHERE x + 1 < :per)
+               INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status)
+               SELECT 1, e.id,
+                      :origin + (x / 10) * 86400 + (8 + x % 10) * 3600 + (x % 997 = 0) * 1800,
+                      :origin + (x / 10) * 86400 + (9 + x % 10) * 3600 + (x % 997 = 0) * 1800,
+                      CASE WHEN x % 10 < 7 OR x % 997 = 0 THEN :scheduled ELSE :completed END
+               FROM employees AS e CROSS JOIN k
+               ORDER BY x, e.id""",
+            {
+                "per": n // EMPLOYEES,
+                "origin": database.to_epoch(ORIGIN),
+                "scheduled": database.STATUS_SCHEDULED,
+                "completed": database.STATUS_COMPLETED,
+            },
+        )
+    conn.execute("ANALYZE")
+    print(f"built {n:,} appointments in {time.perf_counter() - began:.1f}s")
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(path=os.path.join(tmp, "bench.db"))
+        _build(n)
+        conn = connection.get_connection()
+        for line in explain(conn, audit._SQL_SCHEDULED_BY_EMPLOYEE, {"status": database.STATUS_SCHEDULED}):
+            print(f"  plan: {line}")
+
+        summary = audit.AuditSummary()
+        began = time.perf_counter()
+        findings = sum(1 for _ in audit.audit_appointments(summary))
+        elapsed = time.perf_counter() - began
+        print(f"audited {summary.entries:,} scheduled entries of {summary.employees} employees "
+              f"in {elapsed:.2f}s ({summary.entries / elapsed / 1e6:.2f}M rows/s)")
+        print(f"  {summary.overlaps:,} overlaps, {summary.outside_availability:,} outside working hours "
+              f"({findings:,} findings)")
+        connection.close_connection()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
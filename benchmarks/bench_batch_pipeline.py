@@ -0,0 +1,103 @@
+"""
+Batch pipeline load test: a synthetic export of booking conversations is run
+through ``run_batch`` on a scratch database, with different numbers of
+worker processes.
+
+Every session is a three-message conversation (greeting, employee with
+date and time, client name) for a random one-hour slot, so some sessions
+compete for the same slot. Afterwards the book is checked for overlapping
+Scheduled appointments (there must be none).
+
+Run with:  python -m smartscheduler.benchmarks.bench_batch_pipeline [sessions] [workers...]
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from smartscheduler.core.batch_pipeline import run_batch
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Employee
+
+EMPLOYEES = ["Laura Sánchez", "Carlos Romero", "Nuria Ortega", "Javier Molina", "Elena Castro"]
+FIRST_DAY = date(2030, 1, 7)
+DAYS = 20
+HOURS = range(8, 20)
+WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _letters(n: int) -> str:
+    """A distinct alphabetic surname per session (names are letters only)."""
+    out = ""
+    for _ in range(4):
+        n, k = divmod(n, 26)
+        out += chr(97 + k)
+    return out.title()
+
+def export(sessions: int, seed: int = 3) -> str:
+    """The JSONL export, conversations interleaved as they would arrive."""
+    rng = random.Random(seed)
+    conversations = []
+    for i in range(sessions):
+        day = FIRST_DAY + timedelta(days=rng.randrange(DAYS))
+        conversations.append((f"sms-{i:06d}", [
+            "Hello",
+            f"I need an appointment with {rng.choice(EMPLOYEES)} on {day:%d/%m/%Y} "
+            f"at {rng.choice(HOURS)}:00",
+            f"my name is Client {_letters(i)}",
+        ]))
+    lines = []
+    while conversations:
+        i = rng.randrange(len(conversations))
+        session_id, messages = conversations[i]
+        lines.append(json.dumps({"session_id": session_id, "text": messages.pop(0)}))
+        if not messages:
+            conversations[i] = conversations[-1]
+            conversations.pop()
+    return "\n".join(lines) + "\n"
+
+def _seed(path: str) -> None:
+    connection.configure(path=path)
+    database.create_tables()
+    availability = {day: ["08:00-20:00"] for day in WEEK}
+    for i, name in enumerate(EMPLOYEES):
+        database.add_employee(Employee(
+            name=name, email=f"batch{i}@clinic.com", phone="0", role="Doctor",
+            availability=availability,
+        ))
+    connection.close_connection()
+
+def _double_bookings() -> int:
+    return connection.get_connection().execute(
+        """SELECT COUNT(*) FROM appointments a
+           JOIN appointments b
+             ON a.employee_id = b.employee_id AND a.id < b.id
+            AND a.start_epoch < b.end_epoch AND b.start_epoch < a.end_epoch
+           WHERE a.status = ? AND b.status = ?""",
+        (database.STATUS_SCHEDULED, database.STATUS_SCHEDULED),
+    ).fetchone()[0]
+
+def main(sessions: int, worker_counts) -> int:
+    stream = export(sessions)
+    print(f"{sessions} sessions, {stream.count(chr(10))} messages")
+    print(f"{'workers':>7} {'msg/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'booked':>7} {'txns':>5} {'doubles':>7}")
+    failed = 0
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "batch.db")
+            _seed(path)
+            report = run_batch(io.StringIO(stream), io.StringIO(), workers, path)
+            doubles = _double_bookings()
+            connection.close_connection()
+        failed += bool(doubles or report.errors)
+        print(f"{workers:>7} {report.throughput:>8.1f} {report.percentile(0.50):>7.2f} "
+              f"{report.percentile(0.99):>7.2f} {report.booked:>7} {report.write_transactions:>5} "
+              f"{doubles:>7}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(args[0] if args else 2000, args[1:] or [1, 2, 4]))
@@ -0,0 +1,107 @@
+"""
+Batch assignment of a queue of booking requests against a half-booked
+two-week book (two-hour preferred windows), compared with the naive first-come-first-served pass.
+
+Run with:  python -m smartscheduler.benchmarks.bench_batch_schedule [requests]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.data.database import count_appointments
+from smartscheduler.models.person import Employee, normalize_name
+from smartscheduler.services.scheduler import BookingRequest, schedule_batch
+
+FIRST_DAY = datetime(2025, 1, 6)
+DAYS = 14
+ROLES = {"Therapist": 12, "Doctor": 8}
+
+
+def _seed(fill=0.5):
+    database.create_tables()
+    conn = connection.get_connection()
+    rng = random.Random(5)
+    hours = {
+        day: ["09:00-13:00", "15:00-19:00"]
+        for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+    }
+    for role, count in ROLES.items():
+        for i in range(count):
+            database.add_employee(Employee(
+                name=f"{role} {i}", email=f"{role.lower()}{i}@clinic.com", phone="0",
+                role=role, availability=hours,
+            ))
+    conn.execute("INSERT INTO clients (name, name_key) VALUES ('Walk In', 'walk in')")
+    rows = []
+    for emp in range(1, sum(ROLES.values()) + 1):
+        for d in range(DAYS):
+            day = FIRST_DAY + timedelta(days=d)
+            if day.weekday() >= 5:
+                continue
+            for hour in (9, 10, 11, 12, 15, 16, 17, 18):
+                if rng.random() < fill:
+                    start = day + timedelta(hours=hour, minutes=rng.choice((0, 15, 30)))
+                    rows.append((1, emp, database.to_epoch(start),
+                                 database.to_epoch(start + timedelta(minutes=30)),
+                                 database.STATUS_SCHEDULED))
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _requests(count):
+    rng = random.Random(8)
+    workdays = [FIRST_DAY + timedelta(days=d) for d in range(DAYS)
+                if (FIRST_DAY + timedelta(days=d)).weekday() < 5]
+    requests = []
+    for i in range(count):
+        windows = []
+        for day in rng.sample(workdays, rng.choice((1, 1, 2))):
+            # A two-hour preferred window inside the morning or afternoon.
+            start = day + timedelta(hours=rng.choice((9, 10, 11, 15, 16, 17)))
+            windows.append((start, start + timedelta(hours=2)))
+        requests.append(BookingRequest(
+            client_name=f"Client {i}",
+            role=rng.choice(list(ROLES)),
+            duration=timedelta(minutes=rng.choice((30, 45, 60, 90))),
+            windows=windows,
+        ))
+    return requests
+
+
+def _print(label, quality, capacity, seconds):
+    print(f"  {label:<10} {quality.assigned:5d} filled  {quality.booked_minutes:6d} min booked  "
+          f"{quality.booked_minutes / capacity:6.1%} of free time  "
+          f"{quality.fragmented_minutes:5d} min fragmented  {seconds * 1000:8.1f} ms")
+
+
+def main(count=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(path=os.path.join(tmp, "bench.db"))
+        _seed()
+        requests = _requests(count)
+        connection.get_connection().executemany(
+            "INSERT INTO clients (name, name_key) VALUES (?, ?)",
+            [(r.client_name, normalize_name(r.client_name)) for r in requests],
+        )
+        before = count_appointments()
+        began = time.perf_counter()
+        result = schedule_batch(requests)
+        total = time.perf_counter() - began
+        print(f"{count} requests, {result.capacity_minutes} free minutes in the book")
+        _print("naive", result.baseline, result.capacity_minutes, result.baseline_seconds)
+        _print("optimized", result.quality, result.capacity_minutes, result.solve_seconds)
+        print(f"  committed {count_appointments() - before} appointments "
+              f"({len(result.rejected)} rejected) in {total * 1000:.1f} ms end to end")
+        connection.close_connection()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
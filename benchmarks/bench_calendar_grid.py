@@ -0,0 +1,78 @@
+"""
+Week navigation latency of the employee calendar (data side, without Tk).
+
+One employee has ten years of scheduled 15-minute appointments, seven days
+a week, 08:00-21:00, about half of the slots booked. Random weeks are
+turned into slot states with ``week_states`` at 60, 30 and 15-minute
+slots. Redrawing the Canvas then only re-colours the cells whose state
+changed. Target: well under a 16 ms frame.
+
+Run with:  python -m smartscheduler.benchmarks.bench_calendar_grid [weeks]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Employee
+from smartscheduler.services.calendar_grid import HOUR_END, HOUR_START, week_states
+
+TARGET_MS = 16.0
+FIRST_DAY = date(2020, 1, 6)  # a Monday
+YEARS = 10
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _seed(fill: float = 0.5) -> int:
+    database.create_tables()
+    database.add_employee(Employee(
+        name="Busy Employee", email="busy@clinic.com", phone="0", role="Doctor",
+        availability={day: ["08:00-14:00", "15:00-21:00"] for day in WEEKDAYS},
+    ))
+    conn = connection.get_connection()
+    conn.execute("INSERT INTO clients (name, name_key) VALUES ('Bench Client', 'bench client')")
+    rng = random.Random(1)
+    rows = []
+    for d in range(YEARS * 365):
+        day = datetime.combine(FIRST_DAY + timedelta(days=d), datetime.min.time())
+        for quarter in range((HOUR_END - HOUR_START) * 4):
+            if rng.random() < fill:
+                start = day + timedelta(hours=HOUR_START, minutes=15 * quarter)
+                rows.append((database.to_epoch(start), database.to_epoch(start + timedelta(minutes=15))))
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) "
+            "VALUES (1, 1, ?, ?, 'Scheduled')",
+            rows,
+        )
+    conn.execute("ANALYZE")
+    return len(rows)
+
+def main(weeks: int = 200) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(path=os.path.join(tmp, "calendar.db"))
+        appointments = _seed()
+        print(f"{appointments:,} appointments for one employee over {YEARS} years")
+        rng = random.Random(2)
+        worst = 0.0
+        for slot in (60, 30, 15):
+            week_states(1, FIRST_DAY, slot)  # warm the caches
+            times = []
+            for _ in range(weeks):
+                week = FIRST_DAY + timedelta(weeks=rng.randrange(YEARS * 52))
+                began = time.perf_counter()
+                week_states(1, week, slot)
+                times.append((time.perf_counter() - began) * 1000)
+            times.sort()
+            worst = max(worst, times[-1])
+            print(f"{slot:>3}-minute slots: p50 {times[len(times) // 2]:.2f} ms  "
+                  f"p99 {times[int(len(times) * 0.99)]:.2f} ms  max {times[-1]:.2f} ms")
+        connection.close_connection()
+    print(f"target < {TARGET_MS:.0f} ms: {'ok' if worst < TARGET_MS else 'MISSED'}")
+    return 0 if worst < TARGET_MS else 1
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(a) for a in sys.argv[1:]]))
@@ -0,0 +1,77 @@
+"""
+Per-call overhead of the data layer: a fresh ``sqlite3.connect()`` per call
+(the old behaviour) versus the thread-local connection manager.
+
+Run with:  python -m smartscheduler.benchmarks.bench_connection [iterations]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Client, Employee
+
+
+def _seed():
+    database.create_tables()
+    emp = Employee(name="Bench Employee", email="bench@clinic.com", phone="0", role="Doctor")
+    database.add_employee(emp)
+    database.add_client(Client(name="Bench Client"))
+    return emp
+
+
+def _per_call_connect(path, employee_id, start, end):
+    # Mirrors the previous implementation of is_employee_available().
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT 1 FROM appointments
+           WHERE employee_id = ? AND status = ?
+             AND start_epoch < ? AND end_epoch > ?
+           LIMIT 1""",
+        (
+            employee_id,
+            database.STATUS_SCHEDULED,
+            database.to_epoch(end),
+            database.to_epoch(start),
+        ),
+    )
+    cursor.fetchone()
+    conn.close()
+
+
+def _timeit(label, fn, iterations):
+    began = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - began
+    print(f"{label:<28} {elapsed / iterations * 1e6:9.1f} us/call")
+    return elapsed
+
+
+def main(iterations=5000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        connection.configure(path=path)
+        emp = _seed()
+        start = datetime(2025, 1, 6, 10, 0)
+        end = start + timedelta(hours=1)
+
+        before = _timeit(
+            "connect per call", lambda: _per_call_connect(path, emp.id, start, end), iterations
+        )
+        after = _timeit(
+            "connection manager",
+            lambda: database.is_employee_available(emp.id, start, end),
+            iterations,
+        )
+        print(f"speed-up: {before / after:.1f}x")
+        connection.close_connection()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,124 @@
+"""
+Per-message latency of the assistant's date/time parser.
+
+The messages are the golden corpus of ``tests/test_date_parser.py``; they
+are checked against their expected (date, time) first, and any mismatch
+fails the run. Latency is then measured over the corpus for the
+single-pass parser and for the previous regex-after-regex implementation.
+
+Run with:  python -m smartscheduler.benchmarks.bench_date_parser [rounds]
+"""
+
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.core.date_parser import parse_date_time
+from smartscheduler.tests.test_date_parser import CORPUS, NOW
+
+
+def _old_parse_date_time(text):
+    """The previous implementation, kept as the latency baseline."""
+    text_lower = text.lower()
+    target_date = None
+    target_time = None
+    patterns = {
+        'day after tomorrow': datetime.now() + timedelta(days=2),
+        'tomorrow': datetime.now() + timedelta(days=1),
+        'today': datetime.now(),
+        'next week': datetime.now() + timedelta(days=7),
+    }
+    for word, date_obj in patterns.items():
+        if word in text_lower:
+            target_date = date_obj.date()
+            break
+    date_patterns = [
+        r'(\d{1,2})/(\d{1,2})/(\d{4})', r'(\d{1,2})/(\d{1,2})',
+        r'friday (\d{1,2})', r'saturday (\d{1,2})', r'sunday (\d{1,2})', r'monday (\d{1,2})',
+        r'tuesday (\d{1,2})', r'wednesday (\d{1,2})', r'thursday (\d{1,2})',
+        r'june (\d{1,2})', r'july (\d{1,2})',
+    ]
+    if not target_date:
+        for pattern in date_patterns:
+            match = re.search(pattern, text_lower)
+            if match:
+                try:
+                    now = datetime.now()
+                    if '/' in pattern and len(match.groups()) == 3:
+                        day, month, year = match.groups()
+                        target_date = datetime(int(year), int(month), int(day)).date()
+                    elif '/' in pattern and len(match.groups()) == 2:
+                        day, month = match.groups()
+                        target_date = datetime(now.year, int(month), int(day)).date()
+                    elif 'june' in pattern:
+                        target_date = datetime(now.year, 6, int(match.group(1))).date()
+                    elif 'july' in pattern:
+                        target_date = datetime(now.year, 7, int(match.group(1))).date()
+                    else:
+                        target_date = datetime(now.year, now.month, int(match.group(1))).date()
+                except Exception:
+                    continue
+                break
+    time_patterns = [
+        r'\b(\d{1,2})\s*pm\b', r'\b(\d{1,2})\s*am\b', r'(\d{1,2}):(\d{2})',
+        r'at (\d{1,2})', r'(\d{1,2}) o\'clock',
+    ]
+    for pattern in time_patterns:
+        match = re.search(pattern, text_lower)
+        if match:
+            try:
+                if 'pm' in pattern:
+                    hour = int(match.group(1))
+                    if hour != 12:
+                        hour += 12
+                    target_time = f"{hour:02d}:00"
+                elif 'am' in pattern:
+                    hour = int(match.group(1))
+                    if hour == 12:
+                        hour = 0
+                    target_time = f"{hour:02d}:00"
+                elif ':' in pattern:
+                    target_time = f"{int(match.group(1)):02d}:{match.group(2)}"
+                else:
+                    hour = int(match.group(1))
+                    if 8 <= hour <= 12:
+                        target_time = f"{hour:02d}:00"
+                    elif 1 <= hour <= 8:
+                        target_time = f"{hour + 12:02d}:00"
+                break
+            except Exception:
+                continue
+    return target_date, target_time
+
+
+def check_corpus():
+    failures = 0
+    for text, expected_date, expected_time in CORPUS:
+        got = parse_date_time(text, NOW)
+        if got != (expected_date, expected_time):
+            failures += 1
+            print(f"  MISMATCH {text!r}: got {got}, expected {(expected_date, expected_time)}")
+    print(f"golden corpus: {len(CORPUS) - failures}/{len(CORPUS)} messages parsed as expected")
+    return failures == 0
+
+
+def _latency(parse, rounds):
+    messages = [text for text, _, _ in CORPUS]
+    began = time.perf_counter()
+    for _ in range(rounds):
+        for text in messages:
+            parse(text)
+    return (time.perf_counter() - began) / (rounds * len(messages)) * 1e6
+
+
+def main(rounds):
+    ok = check_corpus()
+    new = _latency(lambda text: parse_date_time(text), rounds)
+    old = _latency(_old_parse_date_time, rounds)
+    print(f"per message: single pass {new:6.2f} us   previous {old:6.2f} us   ({old / new:.1f}x)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
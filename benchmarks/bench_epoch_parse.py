@@ -0,0 +1,87 @@
+"""
+Cost of the old TEXT timestamps versus integer epoch columns on N rows:
+reading rows into datetimes, writing datetimes, and a range filter.
+
+Run with:  python -m smartscheduler.benchmarks.bench_epoch_parse [N]
+(default: 1000000)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection
+from smartscheduler.data.timestamps import from_epoch, to_epoch
+
+FORMAT = "%Y-%m-%d %H:%M:%S"
+ORIGIN = datetime(2020, 1, 1, 8, 0)
+
+
+def _build(conn, n):
+    conn.execute("CREATE TABLE text_times (start_time TEXT, end_time TEXT)")
+    conn.execute("CREATE TABLE epoch_times (start_epoch INTEGER, end_epoch INTEGER)")
+    starts = [ORIGIN + timedelta(minutes=30 * k) for k in range(n)]
+    with conn:
+        conn.executemany(
+            "INSERT INTO text_times VALUES (?, ?)",
+            ((s.strftime(FORMAT), (s + timedelta(hours=1)).strftime(FORMAT)) for s in starts),
+        )
+        conn.executemany(
+            "INSERT INTO epoch_times VALUES (?, ?)",
+            ((to_epoch(s), to_epoch(s + timedelta(hours=1))) for s in starts),
+        )
+    return starts
+
+
+def _time(label, fn, n):
+    began = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - began
+    print(f"  {label:<44} {elapsed:7.2f} s  {elapsed / n * 1e9:8.0f} ns/row")
+    return elapsed
+
+
+def main(n):
+    strptime = datetime.strptime
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        starts = _build(conn, n)
+        print(f"{n:,} rows")
+
+        print("read rows into datetimes")
+        old = _time("TEXT + strptime (old views)", lambda: [
+            (strptime(s, FORMAT), strptime(e, FORMAT))
+            for s, e in conn.execute("SELECT start_time, end_time FROM text_times")
+        ], n)
+        new = _time("INTEGER + from_epoch (UTC)", lambda: [
+            (from_epoch(s), from_epoch(e))
+            for s, e in conn.execute("SELECT start_epoch, end_epoch FROM epoch_times")
+        ], n)
+        connection.configure(timezone="Europe/Madrid")
+        _time("INTEGER + from_epoch (Europe/Madrid)", lambda: [
+            (from_epoch(s), from_epoch(e))
+            for s, e in conn.execute("SELECT start_epoch, end_epoch FROM epoch_times")
+        ], n)
+        connection.configure(timezone="UTC")
+        print(f"  -> {old / new:.1f}x faster reads in UTC")
+
+        print("convert datetimes for writing")
+        _time("strftime (old add_appointment)", lambda: [s.strftime(FORMAT) for s in starts], n)
+        _time("to_epoch", lambda: [to_epoch(s) for s in starts], n)
+
+        print("range filter (full scan, no index)")
+        lo, hi = starts[n // 4], starts[3 * n // 4]
+        _time("TEXT comparison", lambda: conn.execute(
+            "SELECT COUNT(*) FROM text_times WHERE start_time >= ? AND start_time < ?",
+            (lo.strftime(FORMAT), hi.strftime(FORMAT))).fetchone(), n)
+        _time("INTEGER comparison", lambda: conn.execute(
+            "SELECT COUNT(*) FROM epoch_times WHERE start_epoch >= ? AND start_epoch < ?",
+            (to_epoch(lo), to_epoch(hi))).fetchone(), n)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
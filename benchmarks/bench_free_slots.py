@@ -0,0 +1,90 @@
+"""
+Free-slot search latency over a 90-day horizon for a busy employee.
+Target: < 5 ms per search.
+
+Run with:  python -m smartscheduler.benchmarks.bench_free_slots [searches]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.models.person import Employee
+from smartscheduler.services.scheduler import find_free_slots, iter_free_slots
+
+TARGET_MS = 5.0
+HORIZON = timedelta(days=90)
+FIRST_DAY = datetime(2025, 1, 6)
+
+
+def _seed(history_days=3 * 365, fill=0.7):
+    database.create_tables()
+    availability = {
+        day: ["09:00-13:00", "15:00-18:00"]
+        for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+    }
+    conn = connection.get_connection()
+    database.add_employee(Employee(
+        name="Busy Employee", email="busy@clinic.com", phone="0", role="Doctor",
+        availability=availability,
+    ))
+    conn.execute("INSERT INTO clients (name, name_key) VALUES ('Bench Client', 'bench client')")
+    rng = random.Random(1)
+    rows = []
+    # Years of history before the horizon plus a 70%-booked horizon.
+    for d in range(-history_days, HORIZON.days):
+        day = FIRST_DAY + timedelta(days=d)
+        if day.weekday() >= 5:
+            continue
+        for hour in (9, 10, 11, 12, 15, 16, 17):
+            if rng.random() < fill:
+                start = day + timedelta(hours=hour, minutes=rng.choice((0, 15, 30)))
+                status = database.STATUS_SCHEDULED if d >= 0 else database.STATUS_COMPLETED
+                rows.append((1, 1, database.to_epoch(start),
+                             database.to_epoch(start + timedelta(minutes=30)), status))
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
+
+
+def _bench(label, fn, searches):
+    fn()  # warm the directory cache and the page cache
+    began = time.perf_counter()
+    for _ in range(searches):
+        fn()
+    ms = (time.perf_counter() - began) / searches * 1000
+    verdict = "ok" if ms < TARGET_MS else "OVER TARGET"
+    print(f"  {label:<40} {ms:7.3f} ms/search  [{verdict}]")
+    return ms
+
+
+def main(searches=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(path=os.path.join(tmp, "bench.db"))
+        rows = _seed()
+        print(f"{rows:,} appointments, 90-day horizon")
+        end = FIRST_DAY + HORIZON
+        _bench("next 10 slots of 45 min",
+               lambda: find_free_slots(1, timedelta(minutes=45), FIRST_DAY, end, limit=10),
+               searches)
+        _bench("every 45-min slot in 90 days",
+               lambda: list(iter_free_slots(1, timedelta(minutes=45), FIRST_DAY, end)),
+               searches)
+        _bench("every 15-min-step 60-min slot in 90 days",
+               lambda: list(iter_free_slots(1, timedelta(minutes=60), FIRST_DAY, end,
+                                            step=timedelta(minutes=15))),
+               searches)
+        print(f"  directory cache: {employee_directory.stats()}")
+        connection.close_connection()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
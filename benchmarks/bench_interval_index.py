@@ -0,0 +1,106 @@
+"""
+Overlap checks: the original three-branch OR query (B-tree index) versus the R*Tree
+interval index, on a synthetic book of N appointments.
+
+Run with:  python -m smartscheduler.benchmarks.bench_interval_index [N ...]
+(default: 1000000; pass 10000000 for the large run, which takes a while
+to build).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection, database
+
+EMPLOYEES = 200
+PROBES = 2000
+
+OLD_OVERLAP = """SELECT 1 FROM appointments
+   WHERE employee_id = ?
+     AND status = ?
+     AND (
+            (start_epoch < ? AND end_epoch > ?)
+         OR (start_epoch < ? AND end_epoch > ?)
+         OR (start_epoch >= ? AND end_epoch <= ?)
+     )
+   LIMIT 1"""
+
+
+def _build(n):
+    database.create_tables()
+    conn = connection.get_connection()
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO employees (name, email, phone, role, availability) VALUES (?, ?, ?, ?, '{}')",
+            ((f"Employee {i}", f"e{i}@clinic.com", "0", "Doctor") for i in range(EMPLOYEES)),
+        )
+        conn.execute("INSERT INTO clients (name) VALUES ('Bench Client')")
+
+    origin = datetime(2015, 1, 1, 8, 0)
+    statuses = [database.STATUS_SCHEDULED] * 5 + [database.STATUS_COMPLETED] * 4 + [database.STATUS_CANCELLED]
+    rng = random.Random(42)
+
+    def rows():
+        # Each employee gets consecutive one-hour slots, 8 per day.
+        per_employee = n // EMPLOYEES
+        for emp in range(1, EMPLOYEES + 1):
+            for k in range(per_employee):
+                start = origin + timedelta(days=k // 8, hours=k % 8)
+                yield (1, emp, database.to_epoch(start), database.to_epoch(start + timedelta(hours=1)),
+                       rng.choice(statuses))
+
+    began = time.perf_counter()
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) VALUES (?, ?, ?, ?, ?)",
+            rows(),
+        )
+    conn.execute("ANALYZE")
+    print(f"built {n:,} appointments in {time.perf_counter() - began:.1f}s")
+    return origin, n // EMPLOYEES // 8
+
+
+def _probes(origin, days):
+    rng = random.Random(7)
+    for _ in range(PROBES):
+        start = origin + timedelta(days=rng.randrange(days), hours=rng.randrange(10), minutes=30)
+        yield rng.randrange(1, EMPLOYEES + 1), start, start + timedelta(hours=1)
+
+
+def _old(conn, emp, start, end):
+    s, e = database.to_epoch(start), database.to_epoch(end)
+    conn.execute(OLD_OVERLAP, (emp, database.STATUS_SCHEDULED, e, s, e, s, s, e)).fetchone()
+
+
+def _new(conn, emp, start, end):
+    database.is_employee_available(emp, start, end)
+
+
+def _time(label, fn, probes):
+    conn = connection.get_connection()
+    began = time.perf_counter()
+    for emp, start, end in probes:
+        fn(conn, emp, start, end)
+    elapsed = time.perf_counter() - began
+    print(f"  {label:<22} {elapsed / len(probes) * 1e6:10.1f} us/check")
+    return elapsed
+
+
+def main(sizes):
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.configure(path=os.path.join(tmp, "bench.db"))
+            origin, days = _build(n)
+            probes = list(_probes(origin, days))
+            old = _time("TEXT OR query", _old, probes)
+            new = _time("R*Tree interval index", _new, probes)
+            print(f"  speed-up: {old / new:.1f}x")
+            connection.close_connection()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000_000])
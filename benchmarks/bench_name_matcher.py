@@ -0,0 +1,89 @@
+"""
+Per-message latency of employee name matching as the directory grows.
+
+Synthetic directories of 100 to 100 000 people are matched against the
+same messages with the name index and with the previous approach (every
+name normalized on every message, substring checks both ways). It also
+times adding names one at a time to a built index against rebuilding it.
+
+Run with:  python -m smartscheduler.benchmarks.bench_name_matcher [sizes...]
+"""
+
+import random
+import sys
+import time
+
+from smartscheduler.models.person import normalize_name
+from smartscheduler.services.name_matcher import NameIndex
+
+FIRST = [
+    "Laura", "Carlos", "Ana", "María", "José", "Lucía", "Javier", "Marta", "Pablo", "Elena",
+    "Sergio", "Paula", "David", "Sara", "Daniel", "Carmen", "Jorge", "Andrea", "Raúl", "Irene",
+    "Álvaro", "Nuria", "Diego", "Cristina", "Rubén", "Silvia", "Adrián", "Beatriz", "Iván", "Rocío",
+]
+LAST = [
+    "García", "Fernández", "González", "Rodríguez", "López", "Martínez", "Sánchez", "Pérez",
+    "Gómez", "Martín", "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Muñoz", "Álvarez",
+    "Romero", "Alonso", "Gutiérrez", "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos",
+    "Gil", "Ramírez", "Serrano", "Blanco", "Molina", "Morales", "Suárez", "Ortega", "Delgado",
+    "Castro", "Ortiz", "Rubio", "Marín", "Sanz", "Iglesias",
+]
+MESSAGES = [
+    "I want to schedule an appointment with Laura García Romero on Friday at 10 am.",
+    "Book a meeting with Carlos next Tuesday at 3 pm.",
+    "Show all my appointments for this month.",
+    "with Nuria Ortega Castro please",
+    "lucia fernandes tomorrow",
+    "a",
+]
+
+def directory(size: int, seed: int = 1):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        # Half of them with a compound first name ("María José").
+        first = rng.choice(FIRST) if rng.random() < 0.5 else f"{rng.choice(FIRST)} {rng.choice(FIRST)}"
+        names.add(f"{first} {rng.choice(LAST)} {rng.choice(LAST)}")
+    return dict(enumerate(sorted(names)))
+
+def _old_match(names, text):
+    """The previous implementation, kept as the baseline."""
+    text_norm = normalize_name(text)
+    for key, name in names.items():
+        name_norm = normalize_name(name)
+        if name_norm in text_norm or text_norm in name_norm:
+            return key
+    return None
+
+def _per_message(match, rounds):
+    began = time.perf_counter()
+    for _ in range(rounds):
+        for text in MESSAGES:
+            match(text)
+    return (time.perf_counter() - began) / (rounds * len(MESSAGES)) * 1e6
+
+def main(sizes):
+    print(f"{'names':>8} {'build s':>8} {'index us':>9} {'previous us':>12} {'add 1 us':>9}")
+    for size in sizes:
+        names = directory(size)
+        began = time.perf_counter()
+        index = NameIndex()
+        index.sync(names)
+        index.match("warm up")
+        build = time.perf_counter() - began
+
+        new = _per_message(index.match, 200)
+        old = _per_message(lambda text: _old_match(names, text), max(1, 2000 // size))
+
+        # Names added one at a time, each followed by a match, as the
+        # assistant does; folds of the delta automaton are included.
+        extra = directory(size // 10 + 1, seed=2)
+        began = time.perf_counter()
+        for offset, name in extra.items():
+            index.add(size + offset, name)
+            index.match(name)
+        add = (time.perf_counter() - began) / len(extra) * 1e6
+        print(f"{size:>8} {build:>8.2f} {new:>9.1f} {old:>12.1f} {add:>9.1f}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 1000, 10000, 100000])
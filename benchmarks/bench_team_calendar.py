@@ -0,0 +1,97 @@
+"""
+Team calendar load and scroll cost (data side, without Tk).
+
+100 to 500 employees work 08:00-21:00 every day; each has half a year of
+scheduled 30-minute appointments (about 40% of the time booked) and a
+recurring weekly series. For a random day and week, at 60 and 15-minute
+slots, it times:
+
+- ``team_grid`` for everyone (one grouped query plus bit-vector bucketing);
+- the runs of a screen of rows (what a scroll step draws);
+- the old way of looking: ``week_states`` one employee at a time.
+
+Run with:  python -m smartscheduler.benchmarks.bench_team_calendar [employees...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Employee
+from smartscheduler.models.series import AppointmentSeries
+from smartscheduler.services.calendar_grid import team_grid, week_states
+
+FIRST_DAY = date(2030, 1, 7)  # a Monday
+DAYS = 182
+SCREEN_ROWS = 30
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _seed(employees: int, fill: float = 0.4) -> int:
+    database.create_tables()
+    availability = {day: ["08:00-14:00", "15:00-21:00"] for day in WEEKDAYS}
+    for i in range(employees):
+        database.add_employee(Employee(
+            name=f"Employee {i:03d}", email=f"team{i}@clinic.com", phone="0",
+            role=("Doctor", "Nurse", "Therapist")[i % 3], availability=availability,
+        ))
+    conn = connection.get_connection()
+    conn.execute("INSERT INTO clients (name, name_key) VALUES ('Bench Client', 'bench client')")
+    rng = random.Random(1)
+    rows = []
+    for employee_id in range(1, employees + 1):
+        for d in range(DAYS):
+            day = datetime.combine(FIRST_DAY + timedelta(days=d), datetime.min.time())
+            for half in range(26):
+                if rng.random() < fill:
+                    start = day + timedelta(hours=8, minutes=30 * half)
+                    rows.append((employee_id, database.to_epoch(start),
+                                 database.to_epoch(start + timedelta(minutes=30))))
+    with connection.transaction():
+        conn.executemany(
+            "INSERT INTO appointments (client_id, employee_id, start_epoch, end_epoch, status) "
+            "VALUES (1, ?, ?, ?, 'Scheduled')",
+            rows,
+        )
+    for employee_id in range(1, employees + 1):
+        database.add_series(AppointmentSeries(
+            client_id=1, employee_id=employee_id,
+            first_start=datetime.combine(FIRST_DAY, datetime.min.time()) + timedelta(hours=14),
+            duration=timedelta(hours=1), count=DAYS // 7,
+        ))
+    conn.execute("ANALYZE")
+    return len(rows)
+
+def _ms(work, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - began)
+    return best * 1000
+
+def main(sizes) -> None:
+    print(f"{'staff':>6} {'range':>5} {'slot':>4} {'load ms':>8} {'screen ms':>9} {'one by one ms':>13}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.configure(path=os.path.join(tmp, "team.db"))
+            _seed(size)
+            ids = list(range(1, size + 1))
+            rng = random.Random(2)
+            for days in (1, 7):
+                day = FIRST_DAY + timedelta(days=rng.randrange(DAYS - 7))
+                for slot in (60, 15):
+                    team_grid(ids, day, days, slot)  # warm the caches
+                    load = _ms(lambda: team_grid(ids, day, days, slot))
+                    grid = team_grid(ids, day, days, slot)
+                    top = rng.randrange(size - SCREEN_ROWS)
+                    screen = _ms(lambda: [grid.runs(e) for e in ids[top:top + SCREEN_ROWS]])
+                    one_by_one = _ms(lambda: [week_states(e, day, slot, days) for e in ids], 1)
+                    print(f"{size:>6} {days:>4}d {slot:>4} {load:>8.1f} {screen:>9.2f} {one_by_one:>13.1f}")
+            connection.close_connection()
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 500])
@@ -0,0 +1,157 @@
+"""
+API load test: the JSON server runs in its own process on a scratch
+database, and many concurrent keep-alive clients (asyncio, one connection
+each) send it a mix of requests:
+
+- 60% appointment listings for one employee;
+- 20% bookings of random one-hour slots;
+- 15% assistant messages (each client is one conversation);
+- 5% employee listings.
+
+Reports requests/s, latency percentiles and status codes. Afterwards the
+book is checked for overlapping Scheduled appointments (there must be
+none). The run fails on any 5xx or double booking.
+
+Run with:  python -m smartscheduler.benchmarks.load_api [clients] [requests per client]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Employee
+
+EMPLOYEES = ["Laura Sánchez", "Carlos Romero", "Nuria Ortega", "Javier Molina", "Elena Castro"]
+WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+FIRST_DAY = datetime(2030, 1, 7)
+DAYS = 30
+
+def _seed(path: str) -> None:
+    connection.configure(path=path)
+    database.create_tables()
+    availability = {day: ["08:00-20:00"] for day in WEEK}
+    for i, name in enumerate(EMPLOYEES):
+        database.add_employee(Employee(
+            name=name, email=f"api{i}@clinic.com", phone="0", role="Doctor",
+            availability=availability,
+        ))
+    connection.close_connection()
+
+def _serve(path: str, ports) -> None:
+    from smartscheduler.api.server import serve
+
+    connection.configure(path=path)
+    asyncio.run(serve(port=0, ready=ports.put))
+
+async def _request(reader, writer, method: str, path: str, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+        + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+def _slot(rng: random.Random):
+    start = FIRST_DAY + timedelta(days=rng.randrange(DAYS), hours=8 + rng.randrange(12))
+    return start, start + timedelta(hours=1)
+
+async def _client(port: int, number: int, count: int, latencies, statuses) -> None:
+    rng = random.Random(number)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    conversation = [
+        "Hello",
+        f"I need an appointment with {rng.choice(EMPLOYEES)} on "
+        f"{FIRST_DAY + timedelta(days=rng.randrange(DAYS)):%d/%m/%Y} at {8 + rng.randrange(12)}:00",
+        f"my name is Client {chr(65 + number % 26)}{chr(65 + number // 26 % 26)}",
+    ]
+    try:
+        for i in range(count):
+            roll = rng.random()
+            if roll < 0.60:
+                request = ("GET", f"/appointments?employee_id={1 + rng.randrange(len(EMPLOYEES))}&limit=20")
+            elif roll < 0.80:
+                start, end = _slot(rng)
+                request = ("POST", "/appointments", {
+                    "client": f"Walk-in {number}", "employee": rng.choice(EMPLOYEES),
+                    "start": start.isoformat(), "end": end.isoformat(),
+                })
+            elif roll < 0.95:
+                request = ("POST", "/assistant", {
+                    "session_id": f"client-{number}", "text": conversation[i % len(conversation)],
+                })
+            else:
+                request = ("GET", "/employees")
+            began = time.perf_counter()
+            status, _ = await _request(reader, writer, *request)
+            latencies.append(time.perf_counter() - began)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+async def _load(port: int, clients: int, count: int):
+    latencies, statuses = [], Counter()
+    began = time.perf_counter()
+    await asyncio.gather(*(_client(port, n, count, latencies, statuses) for n in range(clients)))
+    return time.perf_counter() - began, latencies, statuses
+
+def _double_bookings() -> int:
+    return connection.get_connection().execute(
+        """SELECT COUNT(*) FROM appointments a
+           JOIN appointments b
+             ON a.employee_id = b.employee_id AND a.id < b.id
+            AND a.start_epoch < b.end_epoch AND b.start_epoch < a.end_epoch
+           WHERE a.status = ? AND b.status = ?""",
+        (database.STATUS_SCHEDULED, database.STATUS_SCHEDULED),
+    ).fetchone()[0]
+
+def main(clients: int = 200, count: int = 50) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api.db")
+        _seed(path)
+        ports = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve, args=(path, ports), daemon=True)
+        server.start()
+        try:
+            port = ports.get(timeout=30)
+            elapsed, latencies, statuses = asyncio.run(_load(port, clients, count))
+        finally:
+            server.terminate()
+            server.join()
+        doubles = _double_bookings()
+        connection.close_connection()
+
+    latencies.sort()
+    total = len(latencies)
+
+    def pct(p):
+        return latencies[min(total - 1, int(total * p))] * 1000
+
+    print(f"{clients} clients x {count} requests in {elapsed:.2f} s: {total / elapsed:,.0f} req/s")
+    print(f"latency ms  p50 {pct(0.50):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  "
+          f"max {latencies[-1] * 1000:.1f}")
+    print("status codes:", ", ".join(f"{s}: {n}" for s, n in sorted(statuses.items())))
+    print(f"double-bookings: {doubles}")
+    errors = sum(n for s, n in statuses.items() if s >= 500)
+    return 1 if errors or doubles else 0
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(a) for a in sys.argv[1:]]))
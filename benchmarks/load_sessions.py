@@ -0,0 +1,111 @@
+"""
+Session store load test: many more clients than the store may hold talk
+to it from several threads at once. Every message looks its session up
+(creating it if needed) and fills in the conversation state under the
+session lock, the way the assistant does.
+
+The workload runs twice over the same message stream: once timed, once
+under tracemalloc to measure the memory held by the store. The run fails
+if the store ever holds more than its capacity or needs more memory than
+the budget.
+
+Run with:  python -m smartscheduler.benchmarks.load_sessions [clients] [threads] [capacity] [budget MB]
+"""
+
+import itertools
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date
+
+from smartscheduler.core.sessions import SessionStore
+from smartscheduler.models.person import Employee
+
+MESSAGES_PER_CLIENT = 3
+IDLE_TTL = 600.0  # seconds
+TICK = 0.05  # simulated seconds per message
+
+EMPLOYEE = Employee(name="Load Employee", email="load@clinic.com", phone="0", role="Doctor")
+
+def _messages(clients: int, threads: int, seed: int = 7):
+    """Client ids, interleaved at random and split between the threads."""
+    ids = [f"terminal-{i:06d}" for i in range(clients)] * MESSAGES_PER_CLIENT
+    random.Random(seed).shuffle(ids)
+    return [ids[t::threads] for t in range(threads)]
+
+def _run(store: SessionStore, streams, latencies=None) -> float:
+    def worker(stream, out):
+        for session_id in stream:
+            began = time.perf_counter()
+            session = store.get(session_id)
+            if out is not None:
+                out.append(time.perf_counter() - began)
+            with session.lock:
+                state = session.state
+                if state.employee is None:
+                    state.employee = EMPLOYEE
+                elif state.date is None:
+                    state.date = date(2025, 6, 13)
+                else:
+                    state.time = "10:00"
+                    state.client_name = f"Client {session_id[-6:]}"
+
+    outs = [[] if latencies is not None else None for _ in streams]
+    threads = [threading.Thread(target=worker, args=(s, o)) for s, o in zip(streams, outs)]
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+    if latencies is not None:
+        for out in outs:
+            latencies.extend(out)
+    return elapsed
+
+def _store(capacity: int) -> SessionStore:
+    ticks = itertools.count()
+    return SessionStore(capacity, IDLE_TTL, clock=lambda: next(ticks) * TICK)
+
+def main(clients: int, threads: int, capacity: int, budget_mb: float) -> int:
+    streams = _messages(clients, threads)
+    total = sum(len(s) for s in streams)
+    print(f"clients {clients}  threads {threads}  capacity {capacity}  idle ttl {IDLE_TTL:.0f} s")
+
+    store = _store(capacity)
+    latencies = []
+    elapsed = _run(store, streams, latencies)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    stats = store.stats()
+    print(f"messages {total} in {elapsed:.2f} s ({total / elapsed:,.0f}/s), "
+          f"get p50 {p50:.1f} us p99 {p99:.1f} us")
+    print(f"live sessions {stats['sessions']} (created {stats['created']}, "
+          f"expired {stats['expired']}, evicted {stats['evicted']})")
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    store = _store(capacity)
+    _run(store, streams)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    held = (current - baseline) / 2 ** 20
+    peak = (peak - baseline) / 2 ** 20
+    live = len(store)
+    per_session = (current - baseline) / max(1, live)
+    within = peak <= budget_mb and live <= capacity
+    print(f"memory: {held:.1f} MB held for {live} sessions ({per_session:.0f} B each), "
+          f"peak {peak:.1f} MB, budget {budget_mb:.0f} MB: {'ok' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sys.exit(main(
+        int(args[0]) if len(args) > 0 else 50_000,
+        int(args[1]) if len(args) > 1 else 8,
+        int(args[2]) if len(args) > 2 else 10_000,
+        float(args[3]) if len(args) > 3 else 8.0,
+    ))
@@ -0,0 +1,100 @@
+"""
+Multi-process booking stress test: several processes race to book the same
+small set of slots through ``book_appointment``. Afterwards the book is
+checked for overlapping *Scheduled* appointments (there must be none) and
+the booking throughput is reported.
+
+Run with:  python -m smartscheduler.benchmarks.stress_booking [processes] [attempts]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from smartscheduler.core.scheduler_utils import book_appointment
+from smartscheduler.data import connection, database
+from smartscheduler.models.person import Client, Employee
+
+EMPLOYEES = 3
+SLOTS_PER_EMPLOYEE = 200
+WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+FIRST_DAY = datetime(2025, 1, 6, 8, 0)
+
+
+def _seed():
+    database.create_tables()
+    availability = {day: ["08:00-20:00"] for day in WEEK}
+    for i in range(EMPLOYEES):
+        database.add_employee(Employee(
+            name=f"Stress Employee {i}", email=f"stress{i}@clinic.com",
+            phone="0", role="Doctor", availability=availability,
+        ))
+    database.add_client(Client(name="Stress Client"))
+
+
+def _slot(rng):
+    # Half-hour offsets on one-hour slots produce partial overlaps too.
+    k = rng.randrange(SLOTS_PER_EMPLOYEE * 2)
+    start = FIRST_DAY + timedelta(days=k // 24, minutes=30 * (k % 24))
+    return start, start + timedelta(hours=1)
+
+
+def _worker(args):
+    path, seed, attempts = args
+    connection.configure(path=path)
+    rng = random.Random(seed)
+    booked = busy = 0
+    for _ in range(attempts):
+        start, end = _slot(rng)
+        result = book_appointment(
+            "Stress Client", f"Stress Employee {rng.randrange(EMPLOYEES)}", start, end
+        )
+        booked += result.success
+        busy += "busy" in result.message
+    return booked, busy
+
+
+def _count_double_bookings():
+    row = connection.get_connection().execute(
+        """SELECT COUNT(*) FROM appointments a
+           JOIN appointments b
+             ON a.employee_id = b.employee_id AND a.id < b.id
+            AND a.start_epoch < b.end_epoch AND b.start_epoch < a.end_epoch
+           WHERE a.status = ? AND b.status = ?""",
+        (database.STATUS_SCHEDULED, database.STATUS_SCHEDULED),
+    ).fetchone()
+    return row[0]
+
+
+def main(processes=8, attempts=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.db")
+        connection.configure(path=path)
+        _seed()
+        connection.close_connection()
+
+        began = time.perf_counter()
+        with Pool(processes) as pool:
+            results = pool.map(_worker, [(path, seed, attempts) for seed in range(processes)])
+        elapsed = time.perf_counter() - began
+
+        booked = sum(r[0] for r in results)
+        busy = sum(r[1] for r in results)
+        total = processes * attempts
+        doubles = _count_double_bookings()
+        print(f"{processes} processes x {attempts} attempts in {elapsed:.2f}s")
+        print(f"  attempts/s:       {total / elapsed:9.1f}")
+        print(f"  bookings:         {booked} ({booked / elapsed:.1f}/s)")
+        print(f"  gave up on busy:  {busy}")
+        print(f"  double-bookings:  {doubles}")
+        connection.close_connection()
+        return doubles
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:]]
+    sys.exit(1 if main(*argv) else 0)
@@ -0,0 +1,270 @@
+"""
+Headless batch pipeline for the assistant.
+
+Reads a JSONL stream of ``{"session_id": ..., "text": ...}`` messages (email
+or SMS exports) and answers each one with ``chat_completion``, as if it had
+been typed into the AI Assistant tab of that session.
+
+- Sessions are spread over a pool of worker processes by a stable hash of
+  their id, so every message of a session goes, in order, to the worker
+  holding its conversation state.
+- Workers only read the database. Their bookings go to the parent's
+  ``WriteQueue`` (``data/writer.py``), whose single writer thread commits
+  the bookings waiting at the same time in one transaction. Concurrent
+  bookings never race for the write lock.
+- Results are written as JSONL (one line per message, tagged with its
+  input line) as they complete. Lines that cannot be read are recorded by
+  the parent directly; the workers' results queue only carries theirs. Throughput and p50/p99 per-message latency
+  (time spent answering, booking round trip included) are reported at the
+  end.
+
+Run with:  python -m smartscheduler.core.batch_pipeline MESSAGES.jsonl
+           [--out RESULTS.jsonl] [--workers N] [--db PATH]
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from smartscheduler.data import connection
+from smartscheduler.data.database import create_tables
+from smartscheduler.data.writer import WriteQueue
+
+CHUNK_SIZE = 32  # messages sent to a worker at a time
+WRITE_GROUP = 64  # bookings committed in one transaction, at most
+
+# (line, session_id, text)
+Message = Tuple[int, str, str]
+
+@dataclass
+class BatchReport:
+    messages: int = 0
+    errors: int = 0
+    bookings: int = 0
+    booked: int = 0
+    write_transactions: int = 0
+    seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Per-message latency percentile, in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+def read_messages(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """``(line number, message or error text)`` for every non-blank line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict) or not isinstance(record.get("text"), str) \
+                or record.get("session_id") in (None, ""):
+            yield number, "a message needs 'session_id' and 'text'"
+            continue
+        yield number, (number, str(record["session_id"]), record["text"])
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+class _WriterClient:
+    """Booker for ``set_booker``: hands the booking to the writer and waits."""
+
+    def __init__(self, index, requests, replies):
+        self.index = index
+        self.requests = requests
+        self.replies = replies
+
+    def __call__(self, client_name, employee_name, start_time, end_time):
+        self.requests.put((self.index, (client_name, employee_name, start_time, end_time)))
+        return self.replies.get()
+
+def _worker(index, inbox, results, requests, replies, config, max_sessions):
+    from smartscheduler.core.ai_engine import chat_completion, set_booker
+    from smartscheduler.core.sessions import SessionStore
+
+    # The parent's settings, whether the process was forked or spawned.
+    connection.configure(**asdict(config))
+    set_booker(_WriterClient(index, requests, replies))
+    store = SessionStore(max_sessions)
+    while True:
+        chunk = inbox.get()
+        if chunk is None:
+            break
+        done = []
+        for line, session_id, text in chunk:
+            began = time.perf_counter()
+            try:
+                reply, error = chat_completion(store.get(session_id), [("user", text)]), None
+            except Exception as e:
+                reply, error = None, str(e)
+            done.append((line, session_id, reply, error, time.perf_counter() - began))
+        results.put(done)
+    results.put(None)
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+def _forward(requests, replies, writes: WriteQueue, report: BatchReport):
+    """Hand the workers' bookings to the write queue; answer when committed."""
+    from smartscheduler.core.ai_engine import book
+
+    def answer(index, future):
+        error = future.exception()
+        outcome = (False, f"Error creating appointment: {error}") if error else future.result()
+        report.bookings += 1
+        report.booked += bool(outcome[0])
+        replies[index].put(outcome)
+
+    while True:
+        item = requests.get()
+        if item is None:
+            return
+        index, args = item
+        writes.submit(book, *args).add_done_callback(partial(answer, index))
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+def _record(done, out: Optional[IO[str]], report: BatchReport, lock: threading.Lock):
+    """Count results and write them to ``out`` (from the collector or the parent)."""
+    with lock:
+        for line, session_id, reply, error, latency in done:
+            report.messages += 1
+            if error is None:
+                report.latencies.append(latency)
+            else:
+                report.errors += 1
+            if out is not None:
+                record = {"line": line, "session_id": session_id}
+                if error is None:
+                    record["reply"] = reply
+                    record["latency_ms"] = round(latency * 1000, 3)
+                else:
+                    record["error"] = error
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def _collect(results, workers: int, record):
+    finished = 0
+    while finished < workers:
+        done = results.get()
+        if done is None:
+            finished += 1
+            continue
+        record(done)
+
+def worker_for(session_id: str, workers: int) -> int:
+    """The worker that owns a session (stable across runs)."""
+    return zlib.crc32(session_id.encode("utf-8")) % workers
+
+def run_batch(lines: Iterable[str], out: Optional[IO[str]] = None, workers: int = 0,
+              db_path: Optional[str] = None, max_sessions: int = 100_000) -> BatchReport:
+    """
+    Answer every message of a JSONL stream, writing one JSONL result per
+    message to ``out``. ``workers`` defaults to the number of CPUs;
+    ``max_sessions`` bounds the conversations each worker keeps.
+    """
+    workers = workers or os.cpu_count() or 1
+    if db_path:
+        connection.configure(path=db_path)
+    create_tables()
+    # Forked workers must not share the parent's connection.
+    connection.close_connection()
+
+    report = BatchReport()
+    results = multiprocessing.Queue()
+    requests = multiprocessing.Queue()
+    replies = [multiprocessing.Queue() for _ in range(workers)]
+    inboxes = [multiprocessing.Queue(maxsize=8) for _ in range(workers)]
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(i, inboxes[i], results, requests, replies[i], connection.get_config(), max_sessions),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    began = time.perf_counter()
+    for process in processes:
+        process.start()
+    writes = WriteQueue(WRITE_GROUP)
+    writer = threading.Thread(target=_forward, args=(requests, replies, writes, report), daemon=True)
+    record = partial(_record, out=out, report=report, lock=threading.Lock())
+    collector = threading.Thread(target=_collect, args=(results, workers, record), daemon=True)
+    writer.start()
+    collector.start()
+
+    pending: List[List[Message]] = [[] for _ in range(workers)]
+    for line, message in read_messages(lines):
+        if isinstance(message, str):
+            record([(line, None, None, message, 0.0)])
+            continue
+        index = worker_for(message[1], workers)
+        pending[index].append(message)
+        if len(pending[index]) == CHUNK_SIZE:
+            inboxes[index].put(pending[index])
+            pending[index] = []
+    for index, chunk in enumerate(pending):
+        if chunk:
+            inboxes[index].put(chunk)
+        inboxes[index].put(None)
+
+    collector.join()
+    for process in processes:
+        process.join()
+    requests.put(None)
+    writer.join()
+    writes.close()
+    report.write_transactions = writes.transactions
+    report.seconds = time.perf_counter() - began
+    return report
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a JSONL message stream through the assistant.")
+    parser.add_argument("path", help="JSONL file of {session_id, text} messages ('-' for stdin)")
+    parser.add_argument("--out", help="write the results as JSONL here (default: stdout)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: CPUs)")
+    parser.add_argument("--db", help="database file (default: the configured one)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        report = run_batch(source, out, args.workers, args.db)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"Messages: {report.messages} ({report.errors} errors) in {report.seconds:.2f} s, "
+        f"{report.throughput:.1f}/s  latency p50 {report.percentile(0.50):.2f} ms "
+        f"p99 {report.percentile(0.99):.2f} ms  bookings {report.booked}/{report.bookings} "
+        f"in {report.write_transactions} transactions",
+        file=sys.stderr,
+    )
+    return 1 if report.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,230 @@
+"""
+Single-pass date and time extraction for assistant messages.
+
+Every recognised form is one alternative of a single regular expression,
+compiled at import, so a message is tokenized with one ``finditer`` scan.
+Understood forms:
+
+- relative days: today, tomorrow, day after tomorrow, next week
+- weekdays: "friday" and "this friday" (today or later), "next friday"
+  (after today), "friday 13" / "friday the 13th" (day of the month)
+- numeric dates, day first: 15/06, 15/06/2025, 15/06/25, and ISO 2025-06-15
+- month names, full or abbreviated: "june 15", "Sep 3rd, 2026",
+  "15th of june", and ordinal days alone ("the 3rd")
+- times: 14:30, 2:30pm, 2 pm, 10 a.m., noon, midnight, "at 3", "3 o'clock"
+
+Dates without a year resolve to the next such day on or after today.
+Bare hours ("at 3", "3 o'clock") follow working hours: 8-12 stay as they
+are and 1-7 become afternoon. When a message holds several dates (or
+times) the most specific wins, then the earliest.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+    "mon": 0, "tue": 1, "tues": 1, "wed": 2, "thu": 3, "thur": 3, "thurs": 3,
+    "fri": 4, "sat": 5, "sun": 6,
+}
+RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "day after tomorrow": 2, "next week": 7}
+NAMED_TIMES = {"noon": "12:00", "midday": "12:00", "midnight": "00:00"}
+
+# Specificity of each token kind; a higher rank replaces an earlier match.
+RANK_EXPLICIT = 3
+RANK_DAY_OF_MONTH = 2
+RANK_RELATIVE = 1
+
+# ---------------------------------------------------------------------------
+# Token grammar
+# ---------------------------------------------------------------------------
+def _words(names) -> str:
+    # Longest first, so "sept" wins over "sep" and "tues" over "tue".
+    return "|".join(sorted(names, key=len, reverse=True))
+
+_MONTH = rf"(?:{_words(MONTHS)})\.?"
+_ORDINAL = r"(?:st|nd|rd|th)"
+_MERIDIEM = r"[ap](?:m\b|\.m\.)"
+# A number that is really the start of a time or a numeric date.
+_NOT_TIME = rf"(?!\s*(?:{_MERIDIEM}|o'?clock)|[:/]\d)"
+
+# Every token starts at a word boundary with a digit or the first letter
+# of one of these words; checking that once lets the scan skip most
+# positions without trying each alternative.
+_STARTS = "".join(sorted({
+    word[0] for word in (*MONTHS, *WEEKDAYS, *RELATIVE_DAYS, *NAMED_TIMES, "the", "next", "this", "at")
+}))
+
+_TOKENS = re.compile(rf"\b(?=[\d{_STARTS}])(?:" + "|".join((
+    r"(?P<iso>\b(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})\b)",
+    r"(?P<numeric>\b(?P<num_d>\d{1,2})/(?P<num_m>\d{1,2})(?:/(?P<num_y>\d{4}|\d{2}))?\b)",
+    rf"(?P<month_day>\b(?P<md_m>{_MONTH})\s+(?:the\s+)?(?P<md_d>\d{{1,2}}){_ORDINAL}?\b{_NOT_TIME}"
+    rf"(?:,?\s+(?P<md_y>\d{{4}})\b)?)",
+    rf"(?P<day_month>\b(?:the\s+)?(?P<dm_d>\d{{1,2}}){_ORDINAL}?\s+(?:of\s+)?(?P<dm_m>{_MONTH})(?![a-z])"
+    rf"(?:,?\s+(?P<dm_y>\d{{4}})\b)?)",
+    # The day number is left alone when a month name follows it, so that
+    # "monday 15 june" is read by day_month.
+    rf"(?P<weekday>\b(?:(?P<wd_rel>next|this)\s+)?(?P<wd>{_words(WEEKDAYS)})\b"
+    rf"(?:,?\s+(?:the\s+)?(?P<wd_d>\d{{1,2}}){_ORDINAL}?\b{_NOT_TIME}"
+    rf"(?!\s+(?:of\s+)?{_MONTH}(?![a-z])))?)",
+    rf"(?P<relative>\b(?:{_words(RELATIVE_DAYS)})\b)",
+    rf"(?P<ordinal>\b(?:the\s+)?(?P<ord_d>\d{{1,2}}){_ORDINAL}\b)",
+    rf"(?P<clock>\b(?P<clk_h>\d{{1,2}}):(?P<clk_m>\d{{2}})(?!\d)(?:\s*(?P<clk_ap>{_MERIDIEM}))?)",
+    rf"(?P<meridiem>\b(?P<mer_h>\d{{1,2}})\s*(?P<mer_ap>{_MERIDIEM}))",
+    rf"(?P<named_time>\b(?:{_words(NAMED_TIMES)})\b)",
+    rf"(?P<bare_hour>\b(?:at\s+(?P<at_h>\d{{1,2}})\b{_NOT_TIME}|(?P<oc_h>\d{{1,2}})\s*o'?clock\b))",
+)) + ")")
+
+# ---------------------------------------------------------------------------
+# Calendar helpers
+# ---------------------------------------------------------------------------
+def _date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+def _upcoming(today: date, month: int, day: int) -> Optional[date]:
+    """The next ``day``/``month`` on or after today (Feb 29 may be years away)."""
+    for year in range(today.year, today.year + 9):
+        candidate = _date(year, month, day)
+        if candidate is not None and candidate >= today:
+            return candidate
+    return None
+
+def _upcoming_day(today: date, day: int) -> Optional[date]:
+    """The next date with this day of the month, on or after today."""
+    year, month = today.year, today.month
+    for _ in range(13):
+        candidate = _date(year, month, day)
+        if candidate is not None and candidate >= today:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+def _year(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+def _explicit(today: date, day: str, month: int, year: Optional[str]) -> Optional[date]:
+    year = _year(year)
+    if year is None:
+        return _upcoming(today, month, int(day))
+    return _date(year, month, int(day))
+
+def _month(name: str) -> int:
+    return MONTHS[name.rstrip(".")]
+
+# ---------------------------------------------------------------------------
+# Token handlers: match -> (rank, value) or None
+# ---------------------------------------------------------------------------
+def _on_iso(m, today):
+    return RANK_EXPLICIT, _date(int(m["iso_y"]), int(m["iso_m"]), int(m["iso_d"]))
+
+def _on_numeric(m, today):
+    month = int(m["num_m"])
+    if not 1 <= month <= 12:
+        return None
+    return RANK_EXPLICIT, _explicit(today, m["num_d"], month, m["num_y"])
+
+def _on_month_day(m, today):
+    return RANK_EXPLICIT, _explicit(today, m["md_d"], _month(m["md_m"]), m["md_y"])
+
+def _on_day_month(m, today):
+    return RANK_EXPLICIT, _explicit(today, m["dm_d"], _month(m["dm_m"]), m["dm_y"])
+
+def _on_weekday(m, today):
+    if m["wd_d"] is not None:
+        return RANK_DAY_OF_MONTH, _upcoming_day(today, int(m["wd_d"]))
+    ahead = (WEEKDAYS[m["wd"]] - today.weekday()) % 7
+    if m["wd_rel"] == "next" and ahead == 0:
+        ahead = 7
+    return RANK_RELATIVE, today + timedelta(days=ahead)
+
+def _on_relative(m, today):
+    return RANK_RELATIVE, today + timedelta(days=RELATIVE_DAYS[m["relative"]])
+
+def _on_ordinal(m, today):
+    return RANK_DAY_OF_MONTH, _upcoming_day(today, int(m["ord_d"]))
+
+def _hhmm(hour: int, minute: int = 0) -> Optional[str]:
+    return f"{hour:02d}:{minute:02d}" if 0 <= hour <= 23 and 0 <= minute <= 59 else None
+
+def _twelve_hour(hour: int, meridiem: str) -> Optional[int]:
+    if not 1 <= hour <= 12:
+        return None
+    return hour % 12 + (12 if meridiem[0] == "p" else 0)
+
+def _on_clock(m, today):
+    hour = int(m["clk_h"])
+    if m["clk_ap"] is not None:
+        hour = _twelve_hour(hour, m["clk_ap"])
+        if hour is None:
+            return None
+    return RANK_EXPLICIT, _hhmm(hour, int(m["clk_m"]))
+
+def _on_meridiem(m, today):
+    hour = _twelve_hour(int(m["mer_h"]), m["mer_ap"])
+    return (RANK_EXPLICIT, _hhmm(hour)) if hour is not None else None
+
+def _on_named_time(m, today):
+    return RANK_EXPLICIT, NAMED_TIMES[m["named_time"]]
+
+def _on_bare_hour(m, today):
+    hour = int(m["at_h"] or m["oc_h"])
+    if 1 <= hour <= 7:
+        hour += 12
+    elif hour == 0 or hour > 23:
+        return None
+    return RANK_RELATIVE, _hhmm(hour)
+
+_DATE_HANDLERS: Dict[str, Callable] = {
+    "iso": _on_iso,
+    "numeric": _on_numeric,
+    "month_day": _on_month_day,
+    "day_month": _on_day_month,
+    "weekday": _on_weekday,
+    "relative": _on_relative,
+    "ordinal": _on_ordinal,
+}
+_TIME_HANDLERS: Dict[str, Callable] = {
+    "clock": _on_clock,
+    "meridiem": _on_meridiem,
+    "named_time": _on_named_time,
+    "bare_hour": _on_bare_hour,
+}
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def parse_date_time(text: str, now: Optional[datetime] = None) -> Tuple[Optional[date], Optional[str]]:
+    """
+    Extract a date and a time from free text.
+    Returns ``(datetime.date, "HH:MM")``, with None for anything not found.
+    ``now`` defaults to the current time and anchors relative expressions.
+    """
+    today = (now or datetime.now()).date()
+    found_date = found_time = None
+    date_rank = time_rank = 0
+    for m in _TOKENS.finditer(text.lower()):
+        kind = m.lastgroup
+        handler = _DATE_HANDLERS.get(kind)
+        if handler is not None:
+            if date_rank < RANK_EXPLICIT:
+                result = handler(m, today)
+                if result is not None and result[1] is not None and result[0] > date_rank:
+                    date_rank, found_date = result
+        elif time_rank < RANK_EXPLICIT:
+            result = _TIME_HANDLERS[kind](m, today)
+            if result is not None and result[1] is not None and result[0] > time_rank:
+                time_rank, found_time = result
+    return found_date, found_time
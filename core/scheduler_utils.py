@@ -1,45 +1,109 @@
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import List, Optional
+
+from smartscheduler.data.connection import transaction
+from smartscheduler.data.directory import employee_directory
 from smartscheduler.data.database import (
     get_employee_by_name,
     get_client_by_name,
     is_employee_available,
     add_appointment,
+    add_series,
+    find_interval_conflicts,
+    get_series,
+    set_series_exception,
+    STATUS_SCHEDULED,
 )
+from smartscheduler.data.timestamps import to_epoch
 from smartscheduler.models.appointment import Appointment
+from smartscheduler.models.availability import CompiledAvailability
+from smartscheduler.models.series import AppointmentSeries, iter_original_starts
+
+BOOKING_RETRIES = 5
+BOOKING_BACKOFF = 0.05  # seconds, doubled on every retry
+
+@dataclass
+class BookingResult:
+    """Outcome of a booking attempt."""
+    success: bool
+    message: str
+    appointment_id: Optional[int] = None
+    attempts: int = 1
+
+@dataclass
+class SeriesBookingResult:
+    """Outcome of booking a recurring series."""
+    success: bool
+    message: str
+    series_id: Optional[int] = None
+    conflicts: List[datetime] = field(default_factory=list)
+    attempts: int = 1
+
+MAX_LISTED_CONFLICTS = 5
 
 def is_time_in_employee_availability(employee, start_time, end_time):
     """
     Check if the proposed appointment is WITHIN any of the employee's available intervals.
     Returns True if available, False otherwise.
     """
-    availability = employee.availability or {}
-    day_of_week = start_time.strftime("%A")
-    intervals = availability.get(day_of_week, [])
-    for interval in intervals:
-        start_str, end_str = interval.split("-")
-        avail_start = datetime.strptime(start_str, "%H:%M").time()
-        avail_end = datetime.strptime(end_str, "%H:%M").time()
-        if avail_start <= start_time.time() and end_time.time() <= avail_end:
-            return True
-    return False
+    compiled = employee_directory.availability(employee.id) if employee.id else None
+    if compiled is None:
+        compiled = CompiledAvailability.from_dict(employee.availability or {})
+    return compiled.contains(start_time, end_time)
 
-def schedule_appointment_with_validation(client_name, employee_name, start_time, end_time):
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    text = str(error).lower()
+    return "locked" in text or "busy" in text
+
+def _run_immediate(work, retries, backoff):
     """
-    Try to schedule an appointment for the given client and employee, validating:
-    - That the employee exists
-    - That the client exists
-    - That the appointment is within the employee's working hours
-    - That there are no overlaps
-    Returns (success: bool, message: str)
+    Run ``work()`` inside a ``BEGIN IMMEDIATE`` transaction, retrying with
+    exponential backoff (plus jitter) while the DB is busy. Returns
+    ``(result, attempts)``, or ``(None, retries)`` if the DB stayed busy.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            with transaction("IMMEDIATE"):
+                return work(), attempt
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e):
+                raise
+            if attempt < retries:
+                time.sleep(backoff * (2 ** (attempt - 1)) * (1 + random.random()))
+    return None, retries
+
+def book_appointment(client_name, employee_name, start_time, end_time,
+                     retries=BOOKING_RETRIES, backoff=BOOKING_BACKOFF) -> BookingResult:
     """
+    Validate and insert an appointment atomically: every check and the
+    insert run inside one ``BEGIN IMMEDIATE`` transaction, so concurrent
+    bookers cannot both pass the overlap check for the same slot.
+    Retries with exponential backoff (plus jitter) while the DB is busy.
+    """
+    result, attempts = _run_immediate(
+        lambda: _book_in_transaction(client_name, employee_name, start_time, end_time),
+        retries, backoff,
+    )
+    if result is None:
+        return BookingResult(
+            False, "The schedule is busy right now, please try again.", attempts=retries
+        )
+    result.attempts = attempts
+    return result
+
+def _book_in_transaction(client_name, employee_name, start_time, end_time) -> BookingResult:
     # 1. Verify the existence of the client and employee
     client = get_client_by_name(client_name)
     if not client:
-        return False, f"No client found with name '{client_name}'."
+        return BookingResult(False, f"No client found with name '{client_name}'.")
 
     employee = get_employee_by_name(employee_name)
     if not employee:
-        return False, f"No employee found with name '{employee_name}'."
+        return BookingResult(False, f"No employee found with name '{employee_name}'.")
 
     # 2. Check if the appointment is within the employee's availability
     if not is_time_in_employee_availability(employee, start_time, end_time):
@@ -47,20 +111,20 @@ def schedule_appointment_with_validation(client_name, employee_name, start_time,
         intervals = employee.availability.get(day_of_week, [])
         if intervals:
             pretty_intervals = ", ".join(intervals)
-            return (
+            return BookingResult(
                 False,
                 f"{employee.name} only works on {day_of_week}s at: {pretty_intervals}. "
                 "Please select a time within those ranges."
             )
         else:
-            return (
+            return BookingResult(
                 False,
                 f"{employee.name} does not work on {day_of_week}s. Please select another day."
             )
 
     # 3. Check for overlapping appointments
     if not is_employee_available(employee.id, start_time, end_time):
-        return False, f"{employee.name} already has another appointment at that time."
+        return BookingResult(False, f"{employee.name} already has another appointment at that time.")
 
     # 4. If all checks pass, schedule the appointment
     appointment = Appointment(
@@ -68,11 +132,140 @@ def schedule_appointment_with_validation(client_name, employee_name, start_time,
         employee=employee,
         start_time=start_time,
         end_time=end_time,
-        status="Scheduled"
+        status=STATUS_SCHEDULED
     )
     add_appointment(appointment)
-    return (
+    return BookingResult(
         True,
         f"Appointment scheduled for {client_name} with {employee_name} on "
-        f"{start_time.strftime('%A %d/%m/%Y at %H:%M')}."
-    )
\ No newline at end of file
+        f"{start_time.strftime('%A %d/%m/%Y at %H:%M')}.",
+        appointment_id=appointment.id,
+    )
+
+def schedule_appointment_with_validation(client_name, employee_name, start_time, end_time):
+    """
+    Try to schedule an appointment for the given client and employee, validating:
+    - That the employee exists
+    - That the client exists
+    - That the appointment is within the employee's working hours
+    - That there are no overlaps
+    The checks and the insert run in a single transaction (see ``book_appointment``).
+    Returns (success: bool, message: str)
+    """
+    result = book_appointment(client_name, employee_name, start_time, end_time)
+    return result.success, result.message
+
+# ---------------------------------------------------------------------------
+# Recurring series
+# ---------------------------------------------------------------------------
+def _describe_conflicts(conflicts: List[datetime]) -> str:
+    listed = ", ".join(c.strftime("%d/%m/%Y %H:%M") for c in conflicts[:MAX_LISTED_CONFLICTS])
+    more = len(conflicts) - MAX_LISTED_CONFLICTS
+    return listed + (f" and {more} more" if more > 0 else "")
+
+def _book_series_in_transaction(client_name, employee_name, start_time, end_time,
+                                rule) -> SeriesBookingResult:
+    client = get_client_by_name(client_name)
+    if not client:
+        return SeriesBookingResult(False, f"No client found with name '{client_name}'.")
+    employee = get_employee_by_name(employee_name)
+    if not employee:
+        return SeriesBookingResult(False, f"No employee found with name '{employee_name}'.")
+    try:
+        series = AppointmentSeries.from_rrule(
+            rule, client_id=client.id, employee_id=employee.id,
+            first_start=start_time, duration=end_time - start_time,
+        )
+        series.validate()
+    except ValueError as e:
+        return SeriesBookingResult(False, f"Invalid recurrence: {e}.")
+
+    starts = list(iter_original_starts(series))
+    outside_hours = [s for s in starts if not is_time_in_employee_availability(employee, s, s + series.duration)]
+    if outside_hours:
+        return SeriesBookingResult(
+            False,
+            f"{employee.name} does not work at {_describe_conflicts(outside_hours)}.",
+            conflicts=outside_hours,
+        )
+    # One set-based check for every occurrence.
+    clashes = find_interval_conflicts(
+        employee.id, [(to_epoch(s), to_epoch(s + series.duration)) for s in starts]
+    )
+    if clashes:
+        conflicts = [starts[i] for i in sorted(clashes)]
+        return SeriesBookingResult(
+            False,
+            f"{employee.name} already has another appointment on {_describe_conflicts(conflicts)}.",
+            conflicts=conflicts,
+        )
+    add_series(series)
+    return SeriesBookingResult(
+        True,
+        f"{len(starts)} appointments scheduled for {client_name} with {employee_name} "
+        f"({series.rrule}), starting {start_time.strftime('%A %d/%m/%Y at %H:%M')}.",
+        series_id=series.id,
+    )
+
+def book_series(client_name, employee_name, start_time, end_time, rule,
+                retries=BOOKING_RETRIES, backoff=BOOKING_BACKOFF) -> SeriesBookingResult:
+    """
+    Validate and store a recurring series, e.g. ``rule="FREQ=WEEKLY;COUNT=52"``
+    for a year of weekly sessions at ``start_time``-``end_time``. Every
+    occurrence must fall within working hours and be free; the overlap
+    check is a single query whatever the number of occurrences. Runs in one
+    ``BEGIN IMMEDIATE`` transaction like ``book_appointment``.
+    """
+    result, attempts = _run_immediate(
+        lambda: _book_series_in_transaction(client_name, employee_name, start_time, end_time, rule),
+        retries, backoff,
+    )
+    if result is None:
+        return SeriesBookingResult(
+            False, "The schedule is busy right now, please try again.", attempts=retries
+        )
+    result.attempts = attempts
+    return result
+
+def _series_occurrence(series_id, original_start):
+    series = get_series(series_id)
+    if series is None or series.status != STATUS_SCHEDULED:
+        return None, "No active series with that id."
+    if original_start not in iter_original_starts(series, original_start):
+        return None, "The series has no occurrence at that time."
+    return series, None
+
+def cancel_series_occurrence(series_id, original_start) -> BookingResult:
+    """Cancel one occurrence of a series by recording an exception."""
+    def work():
+        series, error = _series_occurrence(series_id, original_start)
+        if error:
+            return BookingResult(False, error)
+        set_series_exception(series, original_start)
+        return BookingResult(True, f"Occurrence of {original_start.strftime('%d/%m/%Y %H:%M')} cancelled.")
+    result, _ = _run_immediate(work, BOOKING_RETRIES, BOOKING_BACKOFF)
+    return result or BookingResult(False, "The schedule is busy right now, please try again.")
+
+def move_series_occurrence(series_id, original_start, new_start, new_end) -> BookingResult:
+    """
+    Move one occurrence of a series to a new time, after checking working
+    hours and overlaps (ignoring the occurrence being moved).
+    """
+    def work():
+        series, error = _series_occurrence(series_id, original_start)
+        if error:
+            return BookingResult(False, error)
+        employee = employee_directory.get(series.employee_id)
+        if employee is None or not is_time_in_employee_availability(employee, new_start, new_end):
+            return BookingResult(False, "The new time is outside the employee's working hours.")
+        if find_interval_conflicts(series.employee_id, [(to_epoch(new_start), to_epoch(new_end))],
+                                   exclude=(series.id, original_start)):
+            return BookingResult(False, f"{employee.name} already has another appointment at that time.")
+        set_series_exception(series, original_start, (new_start, new_end))
+        return BookingResult(
+            True,
+            f"Occurrence of {original_start.strftime('%d/%m/%Y %H:%M')} moved to "
+            f"{new_start.strftime('%A %d/%m/%Y at %H:%M')}.",
+        )
+    result, _ = _run_immediate(work, BOOKING_RETRIES, BOOKING_BACKOFF)
+    return result or BookingResult(False, "The schedule is busy right now, please try again.")
@@ -0,0 +1,136 @@
+"""
+Conversation sessions for the assistant.
+
+Each conversation (a front-desk terminal, an API client) has its own
+``Session``: its id, a ``ConversationState`` and a lock that serializes the
+messages of that conversation. ``SessionStore`` keeps them by id in LRU
+order and drops a session when it has been idle longer than the TTL, or
+when the store is full and it is the least recently used one, so memory is
+bounded by ``max_sessions`` whatever the number of clients. Every store
+operation is thread-safe.
+
+``sessions`` is the process-wide store.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_IDLE_TTL = 30 * 60  # seconds
+
+class ConversationState:
+    """What the assistant has gathered so far in one conversation."""
+
+    __slots__ = ("employee", "date", "time", "client_name", "last_step")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.employee = None
+        self.date = None
+        self.time = None
+        self.client_name = None
+        self.last_step = None  # To know what info is missing from the user
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class Session:
+    """
+    One conversation. Hold ``lock`` while reading or updating ``state``;
+    the engine does so for a whole message.
+    """
+
+    __slots__ = ("id", "state", "lock", "last_used")
+
+    def __init__(self, session_id: str, now: float):
+        self.id = session_id
+        self.state = ConversationState()
+        self.lock = threading.RLock()
+        self.last_used = now
+
+    def __repr__(self):
+        return f"Session({self.id!r})"
+
+class SessionStore:
+    """
+    Sessions by id, least recently used first. ``get`` creates missing
+    sessions, so an evicted conversation simply starts over.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_ttl: float = DEFAULT_IDLE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def _expire(self, now: float) -> None:
+        # LRU order is also last-use order, so idle sessions are at the front.
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if now - oldest.last_used <= self.idle_ttl:
+                break
+            sessions.popitem(last=False)
+            self.expired += 1
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """
+        The session with this id, created if missing (or expired), and
+        marked as just used. Without an id a new session is opened.
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            if session_id is None:
+                session_id = uuid.uuid4().hex
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = now
+                return session
+            if len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            session = self._sessions[session_id] = Session(session_id, now)
+            self.created += 1
+            return session
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def sweep(self) -> int:
+        """Drop idle sessions now; returns how many are left."""
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+sessions = SessionStore()
@@ -0,0 +1,235 @@
+"""
+Double-booking audit of the whole appointment book.
+
+Scheduled appointments (and the occurrences of scheduled series) are
+streamed in ``(employee_id, start)`` order straight off the covering index
+and checked in a single sweep. Memory per employee is bounded by the
+deepest pile-up of overlapping bookings, never by the size of the book.
+Each entry is checked for:
+
+- overlaps with any earlier entry of the same employee that is still
+  running (one finding per overlapping pair);
+- falling outside the employee's working hours.
+
+Run with:  python -m smartscheduler.data.audit [--report REPORT.jsonl]
+
+Findings are written as JSONL (to stdout unless ``--report`` is given)
+and a summary goes to stderr. The exit status is 1 if anything was found.
+"""
+
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from smartscheduler.data.connection import transaction
+from smartscheduler.data.database import (
+    STATUS_SCHEDULED,
+    create_tables,
+    get_compiled_availability,
+    get_scheduled_series,
+)
+from smartscheduler.data.migrations import register_hot_query
+from smartscheduler.data.timestamps import epoch_to_wall_seconds, from_epoch, local_zone, to_epoch
+from smartscheduler.models.series import iter_occurrences
+
+KIND_OVERLAP = "overlap"
+KIND_OUTSIDE_AVAILABILITY = "outside_availability"
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# The unary + keeps SQLite from treating status as a constant and dropping
+# it from the ORDER BY, which would otherwise force a sort of the whole
+# book; with it the covering index already yields rows in order.
+_SQL_SCHEDULED_BY_EMPLOYEE = register_hot_query(
+    "audit: scheduled appointments by employee",
+    """SELECT employee_id, start_epoch, end_epoch, id FROM appointments
+       WHERE +status = :status
+       ORDER BY employee_id, status, start_epoch, end_epoch""",
+    {"status": STATUS_SCHEDULED},
+)
+
+@dataclass
+class AuditFinding:
+    kind: str
+    employee_id: int
+    # {"appointment_id": ...} or {"series_id": ..., "original_start": ...},
+    # plus the entry's start and end.
+    entry: Dict[str, object]
+    # The earlier entry it overlaps (overlaps only).
+    other: Optional[Dict[str, object]] = None
+
+@dataclass
+class AuditSummary:
+    entries: int = 0
+    employees: int = 0
+    overlaps: int = 0
+    outside_availability: int = 0
+    seconds: float = 0.0
+
+    @property
+    def findings(self) -> int:
+        return self.overlaps + self.outside_availability
+
+# ---------------------------------------------------------------------------
+# Streams
+# ---------------------------------------------------------------------------
+# Entries are (employee_id, start_epoch, end_epoch, ref) tuples, where ref is
+# an appointment id or a (series_id, original_start) pair.
+def _occurrence_entries() -> Iterator[tuple]:
+    """Occurrences of every scheduled series, in (employee, start) order."""
+    by_employee: Dict[int, list] = {}
+    for series in get_scheduled_series():
+        by_employee.setdefault(series.employee_id, []).append(series)
+    for employee_id in sorted(by_employee):
+        for o in heapq.merge(*(iter_occurrences(s) for s in by_employee[employee_id]),
+                             key=lambda o: o.start):
+            yield employee_id, to_epoch(o.start), to_epoch(o.end), (o.series_id, o.original_start)
+
+def _entries(conn) -> Iterable[tuple]:
+    appointments = conn.execute(_SQL_SCHEDULED_BY_EMPLOYEE, {"status": STATUS_SCHEDULED})
+    occurrences = _occurrence_entries()
+    first = next(occurrences, None)
+    if first is None:
+        return appointments
+    return heapq.merge(appointments, [first], occurrences, key=itemgetter(0, 1))
+
+def _wall_clock():
+    """
+    Epoch -> wall seconds function for the configured zone. UTC is the
+    identity; other zones memoize the UTC offset per quarter hour, which
+    every DST transition falls on.
+    """
+    if local_zone() is timezone.utc:
+        return None
+    offsets: Dict[int, int] = {}
+
+    def wall(epoch: int) -> int:
+        bucket = epoch // 900
+        offset = offsets.get(bucket)
+        if offset is None:
+            offset = offsets[bucket] = epoch_to_wall_seconds(bucket * 900) - bucket * 900
+        return epoch + offset
+    return wall
+
+def _describe(entry: tuple) -> Dict[str, object]:
+    _, start, end, ref = entry
+    if isinstance(ref, tuple):
+        described = {"series_id": ref[0], "original_start": ref[1].isoformat()}
+    else:
+        described = {"appointment_id": ref}
+    described["start"] = from_epoch(start).isoformat()
+    described["end"] = from_epoch(end).isoformat()
+    return described
+
+# ---------------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------------
+def _sweep(entries: Iterable[tuple], availability: Dict, summary: AuditSummary) -> Iterator[AuditFinding]:
+    wall = _wall_clock()
+    current = None
+    hours = reach = holder = active = None
+    block_start, block_end = 1, 0
+    count = 0
+    for entry in entries:
+        employee_id, start, end, _ = entry
+        count += 1
+        if employee_id != current:
+            current = employee_id
+            hours = availability.get(employee_id)
+            reach = holder = active = None
+            block_start, block_end = 1, 0
+            summary.employees += 1
+
+        # Overlaps. reach is the furthest end seen so far; while no two
+        # entries overlap the only one that can still be running is holder,
+        # and the active list is only built once they start to pile up.
+        if reach is None or start >= reach:
+            reach, holder, active = end, entry, None
+        else:
+            if active is None:
+                active = [holder]
+            active = [a for a in active if a[2] > start]
+            for earlier in active:
+                summary.overlaps += 1
+                yield AuditFinding(KIND_OVERLAP, employee_id, _describe(entry), _describe(earlier))
+            active.append(entry)
+            if end > reach:
+                reach = end
+
+        # Working hours. Entries are in start order, so most fall in the
+        # same working block (in epoch seconds) as the previous one.
+        if block_start <= start and end <= block_end:
+            continue
+        wall_start, wall_end = (wall(start), wall(end)) if wall is not None else (start, end)
+        day = wall_start // SECONDS_PER_DAY
+        midnight = day * SECONDS_PER_DAY
+        # 1970-01-01 was a Thursday (weekday 3).
+        block = hours.block((day + 3) % 7, (wall_start - midnight) // 60) if hours is not None else None
+        if block is None or wall_end > midnight + block[1] * 60:
+            summary.outside_availability += 1
+            yield AuditFinding(KIND_OUTSIDE_AVAILABILITY, employee_id, _describe(entry))
+            continue
+        offset = wall_start - start
+        block_start = midnight + block[0] * 60 - offset
+        block_end = midnight + block[1] * 60 - offset
+        if wall is not None and (wall(block_start) - block_start != offset
+                                 or wall(block_end) - block_end != offset):
+            # The block spans a DST change; don't reuse it.
+            block_start, block_end = 1, 0
+    summary.entries = count
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def audit_appointments(summary: Optional[AuditSummary] = None) -> Iterator[AuditFinding]:
+    """
+    Stream every double booking and out-of-hours booking in the book, in
+    (employee, start) order. The whole audit reads one consistent snapshot.
+    If given, ``summary`` is filled in as the stream is consumed.
+    """
+    summary = summary if summary is not None else AuditSummary()
+    began = time.perf_counter()
+    with transaction() as conn:
+        availability = get_compiled_availability()
+        yield from _sweep(_entries(conn), availability, summary)
+    summary.seconds = time.perf_counter() - began
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Audit the appointment book for double bookings.")
+    parser.add_argument("--report", help="write the findings as JSONL here instead of stdout")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    summary = AuditSummary()
+    out = open(args.report, "w", encoding="utf-8") if args.report else sys.stdout
+    try:
+        for finding in audit_appointments(summary):
+            out.write(json.dumps({
+                "kind": finding.kind,
+                "employee_id": finding.employee_id,
+                "entry": finding.entry,
+                "other": finding.other,
+            }) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"Audited {summary.entries} entries of {summary.employees} employees "
+        f"in {summary.seconds:.2f} s: {summary.overlaps} overlaps, "
+        f"{summary.outside_availability} outside working hours",
+        file=sys.stderr,
+    )
+    return 1 if summary.findings else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+Bulk import of employee working hours (replaces one-off scripts such as
+the old ``fix_availability.py``).
+
+Run with:  python -m smartscheduler.data.availability_import FILE.json
+
+The file maps employee names or emails to their weekly availability::
+
+    {
+        "Laura Sanchez": {"Monday": ["08:00-12:00", "16:00-20:00"]},
+        "carlos@clinic.com": {"Friday": ["10:00-16:00"]}
+    }
+
+Each listed employee's availability is replaced as a whole. All updates
+are applied in a single transaction.
+"""
+
+import json
+import sys
+from typing import Dict, List, Mapping
+
+from smartscheduler.data.connection import transaction
+from smartscheduler.data.database import (
+    create_tables,
+    get_employee_by_email,
+    get_employee_by_name,
+    update_employee_availability,
+)
+from smartscheduler.models.availability import WEEKDAYS, parse_block
+
+def validate_availability(availability) -> List[str]:
+    """Return a list of problems with an availability mapping (empty if valid)."""
+    if not isinstance(availability, dict):
+        return ["availability must be an object of weekday -> blocks"]
+    problems = []
+    for day, blocks in availability.items():
+        if day not in WEEKDAYS:
+            problems.append(f"unknown weekday '{day}'")
+            continue
+        if not isinstance(blocks, list):
+            problems.append(f"{day}: blocks must be a list")
+            continue
+        for block in blocks:
+            if parse_block(block) is None:
+                problems.append(f"{day}: invalid block '{block}'")
+    return problems
+
+def import_availability(mapping: Mapping[str, dict]) -> Dict[str, str]:
+    """
+    Replace the availability of every employee in ``mapping`` (keyed by
+    email or name). Entries with unknown employees or invalid blocks are
+    skipped. Returns ``{key: "updated" | error message}``.
+    """
+    report: Dict[str, str] = {}
+    with transaction("IMMEDIATE"):
+        for key, availability in mapping.items():
+            employee = get_employee_by_email(key) or get_employee_by_name(key)
+            if employee is None:
+                report[key] = "unknown employee"
+                continue
+            problems = validate_availability(availability)
+            if problems:
+                report[key] = "; ".join(problems)
+                continue
+            update_employee_availability(employee.id, availability)
+            report[key] = "updated"
+    return report
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 1:
+        print(__doc__)
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        mapping = json.load(f)
+    create_tables()
+    report = import_availability(mapping)
+    for key, outcome in report.items():
+        print(f"{key}: {outcome}")
+    return 0 if all(outcome == "updated" for outcome in report.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,339 @@
+"""
+Bulk appointment import.
+
+``add_appointments_bulk`` streams rows in chunks; each chunk is validated,
+checked for conflicts with one query plus a sort-and-sweep pass, and
+inserted with ``executemany`` in a single transaction.
+
+Run with:  python -m smartscheduler.data.bulk_import FILE.csv|FILE.jsonl
+           [--chunk-size N] [--report REPORT.jsonl] [--no-create-clients]
+
+Rows need ``client``, ``employee`` (name or email), ``start_time`` and
+``end_time`` (ISO format; times with a UTC offset are converted to the
+configured zone); ``status`` defaults to Scheduled. A row that cannot be
+read is rejected with a reason, never aborting the import.
+"""
+
+import csv
+import json
+import sys
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from smartscheduler.data.connection import get_connection, transaction
+from smartscheduler.data.database import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_SCHEDULED,
+    create_tables,
+    get_series_intervals,
+)
+from smartscheduler.data.timestamps import to_epoch, to_local
+from smartscheduler.models.appointment import Appointment
+from smartscheduler.models.person import normalize_name
+
+DEFAULT_CHUNK_SIZE = 1000
+STATUSES = (STATUS_SCHEDULED, STATUS_COMPLETED, STATUS_CANCELLED)
+
+@dataclass
+class BulkRowResult:
+    row: int
+    accepted: bool
+    reason: str = ""
+    appointment_id: Optional[int] = None
+
+@dataclass
+class UnreadableRow:
+    """Stands in for an input line that could not be decoded (see ``read_rows``)."""
+    reason: str
+
+@dataclass
+class BulkImportReport:
+    results: List[BulkRowResult] = field(default_factory=list)
+
+    @property
+    def accepted(self) -> int:
+        return sum(1 for r in self.results if r.accepted)
+
+    @property
+    def rejected(self) -> int:
+        return len(self.results) - self.accepted
+
+@dataclass
+class _Candidate:
+    row: int
+    client_id: int
+    employee_id: int
+    start: datetime
+    end: datetime
+    status: str
+    start_epoch: int = 0
+    end_epoch: int = 0
+
+# ---------------------------------------------------------------------------
+# Row parsing
+# ---------------------------------------------------------------------------
+class _Resolver:
+    """Name/email -> id lookups loaded once per import."""
+
+    def __init__(self, conn, create_clients: bool):
+        self.conn = conn
+        self.create_clients = create_clients
+        self.employees: Dict[str, int] = {}
+        for emp_id, name_key, email in conn.execute(
+            "SELECT id, name_key, email FROM employees ORDER BY id"
+        ):
+            self.employees[email.lower()] = emp_id
+            self.employees.setdefault(name_key, emp_id)
+        self.clients: Dict[str, int] = {}
+        for client_id, name_key in conn.execute("SELECT id, name_key FROM clients ORDER BY id"):
+            self.clients.setdefault(name_key, client_id)
+
+    def employee(self, key: str) -> Optional[int]:
+        key = key.strip()
+        return self.employees.get(key.lower()) or self.employees.get(normalize_name(key))
+
+    def client(self, name: str) -> Optional[int]:
+        name = name.strip()
+        key = normalize_name(name)
+        client_id = self.clients.get(key)
+        if client_id is None and self.create_clients and name:
+            client_id = self.conn.execute(
+                "INSERT INTO clients (name, email, phone, name_key) VALUES (?, '', '', ?)",
+                (name, key),
+            ).lastrowid
+            self.clients[key] = client_id
+        return client_id
+
+def _as_mapping(item: Union[Mapping, Appointment]) -> Mapping:
+    if isinstance(item, Appointment):
+        return {
+            "client": item.client.name,
+            "employee": item.employee.email or item.employee.name,
+            "start_time": item.start_time,
+            "end_time": item.end_time,
+            "status": item.status,
+        }
+    return item
+
+def _parse_time(value) -> datetime:
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).strip())
+    return to_local(value).replace(microsecond=0)
+
+def _parse(row: int, item, resolver: _Resolver):
+    """Return a _Candidate, or a rejected BulkRowResult."""
+    if isinstance(item, UnreadableRow):
+        return BulkRowResult(row, False, item.reason)
+    data = _as_mapping(item)
+    if not isinstance(data, Mapping):
+        return BulkRowResult(row, False, f"expected an object, got {type(data).__name__}")
+    try:
+        start = _parse_time(data["start_time"])
+        end = _parse_time(data["end_time"])
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return BulkRowResult(row, False, f"invalid time: {e}")
+    if end <= start:
+        return BulkRowResult(row, False, "end_time must be after start_time")
+    status = str(data.get("status") or STATUS_SCHEDULED).strip().title()
+    if status not in STATUSES:
+        return BulkRowResult(row, False, f"unknown status '{status}'")
+    employee_id = resolver.employee(str(data.get("employee") or ""))
+    if employee_id is None:
+        return BulkRowResult(row, False, f"unknown employee '{data.get('employee')}'")
+    client_id = resolver.client(str(data.get("client") or ""))
+    if client_id is None:
+        return BulkRowResult(row, False, f"unknown client '{data.get('client')}'")
+    return _Candidate(row, client_id, employee_id, start, end, status,
+                      to_epoch(start), to_epoch(end))
+
+# ---------------------------------------------------------------------------
+# Conflict detection
+# ---------------------------------------------------------------------------
+def _existing_intervals(conn, candidates: List[_Candidate]) -> Dict[int, List[tuple]]:
+    """
+    One R*Tree query for all scheduled appointments the chunk could hit,
+    plus the occurrences of the employees' recurring series.
+    """
+    employee_ids = sorted({c.employee_id for c in candidates})
+    start = min(c.start_epoch for c in candidates)
+    end = max(c.end_epoch for c in candidates)
+    rows = conn.execute(
+        """SELECT a.employee_id, a.start_epoch, a.end_epoch, a.id
+           FROM appointment_intervals AS r
+           CROSS JOIN appointments AS a ON a.id = r.id
+           WHERE r.employee_lo <= :emp_hi AND r.employee_hi >= :emp_lo
+             AND r.start_epoch < :end AND r.end_epoch > :start
+             AND a.status = :status
+             AND a.employee_id IN (SELECT value FROM json_each(:employees))
+           ORDER BY a.employee_id, a.start_epoch""",
+        {
+            "emp_lo": employee_ids[0],
+            "emp_hi": employee_ids[-1],
+            "start": start,
+            "end": end,
+            "status": STATUS_SCHEDULED,
+            "employees": json.dumps(employee_ids),
+        },
+    )
+    existing: Dict[int, List[tuple]] = {}
+    for employee_id, booked_start, booked_end, appointment_id in rows:
+        existing.setdefault(employee_id, []).append((booked_start, booked_end, appointment_id))
+    for employee_id, occurrences in get_series_intervals(employee_ids, start, end).items():
+        existing[employee_id] = sorted(existing.get(employee_id, []) + occurrences,
+                                       key=lambda b: b[:2])
+    return existing
+
+def _sweep(candidates: List[_Candidate], existing: Dict[int, List[tuple]]) -> Dict[int, str]:
+    """
+    Sort candidates by (employee, start) and sweep once, keeping the furthest
+    end seen so far. Earlier-starting rows win conflicts inside the batch.
+    Returns {row: reason} for every rejected candidate.
+    """
+    rejected: Dict[int, str] = {}
+    scheduled = sorted(
+        (c for c in candidates if c.status == STATUS_SCHEDULED),
+        key=lambda c: (c.employee_id, c.start_epoch, c.row),
+    )
+    current_employee = None
+    for c in scheduled:
+        if c.employee_id != current_employee:
+            current_employee = c.employee_id
+            booked = existing.get(c.employee_id, [])
+            booked_starts = [b[0] for b in booked]
+            # Prefix maximum of existing end times, to test "any earlier
+            # existing interval still running" in O(1).
+            prefix_end, running = [], None
+            for b in booked:
+                running = b if running is None or b[1] > running[1] else running
+                prefix_end.append(running)
+            accepted_until, accepted_row = None, None
+
+        # Existing appointments starting before us and still running...
+        i = bisect_left(booked_starts, c.end_epoch)
+        if i and prefix_end[i - 1][1] > c.start_epoch:
+            rejected[c.row] = f"overlaps existing appointment {prefix_end[i - 1][2]}"
+        # ...or rows of this import accepted earlier in the sweep.
+        elif accepted_until is not None and accepted_until > c.start_epoch:
+            rejected[c.row] = f"overlaps row {accepted_row} of this import"
+        elif accepted_until is None or c.end_epoch > accepted_until:
+            accepted_until, accepted_row = c.end_epoch, c.row
+    return rejected
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def _insert(conn, accepted: List[_Candidate]) -> List[int]:
+    # AUTOINCREMENT hands out consecutive ids inside our write transaction.
+    base = conn.execute(
+        """SELECT MAX(
+               COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'appointments'), 0),
+               COALESCE((SELECT MAX(id) FROM appointments), 0))"""
+    ).fetchone()[0]
+    conn.executemany(
+        """INSERT INTO appointments
+           (client_id, employee_id, start_epoch, end_epoch, status)
+           VALUES (?, ?, ?, ?, ?)""",
+        (
+            (c.client_id, c.employee_id, c.start_epoch, c.end_epoch, c.status)
+            for c in accepted
+        ),
+    )
+    return list(range(base + 1, base + 1 + len(accepted)))
+
+def _import_chunk(conn, chunk: list, first_row: int, resolver: _Resolver) -> List[BulkRowResult]:
+    results: Dict[int, BulkRowResult] = {}
+    candidates: List[_Candidate] = []
+    for row, item in enumerate(chunk, start=first_row):
+        parsed = _parse(row, item, resolver)
+        if isinstance(parsed, BulkRowResult):
+            results[row] = parsed
+        else:
+            candidates.append(parsed)
+
+    if candidates:
+        rejected = _sweep(candidates, _existing_intervals(conn, candidates))
+        accepted = [c for c in candidates if c.row not in rejected]
+        for c, appointment_id in zip(accepted, _insert(conn, accepted)):
+            results[c.row] = BulkRowResult(c.row, True, appointment_id=appointment_id)
+        for row, reason in rejected.items():
+            results[row] = BulkRowResult(row, False, reason)
+    return [results[row] for row in sorted(results)]
+
+def add_appointments_bulk(items: Iterable[Union[Mapping, Appointment, UnreadableRow]],
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          create_clients: bool = True) -> BulkImportReport:
+    """
+    Import appointments from any iterable of mappings or ``Appointment``
+    objects. Input is consumed ``chunk_size`` rows at a time, and each chunk is
+    committed as one transaction. Scheduled rows that overlap an existing
+    scheduled appointment, or an earlier row of the import for the same
+    employee, are rejected. Returns a per-row report (rows are 1-based).
+    """
+    conn = get_connection()
+    report = BulkImportReport()
+    iterator: Iterator = iter(items)
+    first_row = 1
+    resolver = None
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        with transaction("IMMEDIATE"):
+            if resolver is None:
+                resolver = _Resolver(conn, create_clients)
+            report.results.extend(_import_chunk(conn, chunk, first_row, resolver))
+        first_row += len(chunk)
+    return report
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def read_rows(path: str) -> Iterator[Union[dict, UnreadableRow]]:
+    """
+    Stream rows from a CSV (with header) or JSONL file. A JSONL line that is
+    not valid JSON comes out as an ``UnreadableRow``, which the import rejects.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield UnreadableRow(f"invalid JSON: {e}")
+        else:
+            yield from csv.DictReader(f)
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk import appointments.")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--report", help="write the per-row report as JSONL here")
+    parser.add_argument("--no-create-clients", action="store_true")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    report = add_appointments_bulk(
+        read_rows(args.path),
+        chunk_size=args.chunk_size,
+        create_clients=not args.no_create_clients,
+    )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as out:
+            for result in report.results:
+                out.write(json.dumps(asdict(result)) + "\n")
+    else:
+        for result in report.results:
+            if not result.accepted:
+                print(f"row {result.row}: {result.reason}")
+    print(f"Accepted: {report.accepted}  Rejected: {report.rejected}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
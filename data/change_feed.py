@@ -0,0 +1,103 @@
+"""
+Follower of the appointment change feed.
+
+Every insert, update and delete on ``appointments`` is logged by triggers
+(migration 13 in ``data/migrations.py``) to ``appointment_changes`` with a
+sequence number that only grows. ``ChangeFeed`` remembers the last one it returned
+and reads newer ones; while nothing is committed a poll costs a single
+``PRAGMA data_version``, so it can run often.
+
+    feed = ChangeFeed()  # from now on
+    for seq, appointment_id, op, changed_at in feed.follow():
+        ...
+
+Run with:  python -m smartscheduler.data.change_feed [--from SEQ] [--db PATH]
+           [--interval SECONDS]
+"""
+
+import json
+import sys
+import time
+from typing import Iterator, List, Optional
+
+from smartscheduler.data import connection
+from smartscheduler.data.database import (
+    ChangesPruned,
+    create_tables,
+    get_appointment_changes,
+    latest_change_seq,
+)
+from smartscheduler.data.directory import TableWatch
+
+DEFAULT_BATCH = 1000
+DEFAULT_INTERVAL = 0.5  # seconds between polls while idle
+
+class ChangeFeed:
+    def __init__(self, after_seq: Optional[int] = None):
+        """Follow the changes after ``after_seq`` (default: the newest one)."""
+        self.seq = latest_change_seq() if after_seq is None else after_seq
+        self._watch = TableWatch()
+        self._more = True
+
+    def poll(self, limit: int = DEFAULT_BATCH) -> List[tuple]:
+        """
+        Up to ``limit`` new changes as ``(seq, appointment_id, op,
+        changed_at)``, oldest first. Raises ``ChangesPruned`` if the feed
+        was pruned past ``seq``; ``skip_to_latest()`` then resumes it.
+        """
+        # Checked before reading, so a commit in between is read next time.
+        if not self._watch.committed() and not self._more:
+            return []
+        changes = get_appointment_changes(self.seq, limit)
+        if changes:
+            self.seq = changes[-1][0]
+        self._more = len(changes) == limit
+        return changes
+
+    def skip_to_latest(self) -> None:
+        self.seq = latest_change_seq()
+        self._more = False
+
+    def follow(self, interval: float = DEFAULT_INTERVAL) -> Iterator[tuple]:
+        """Yield changes as they are committed, forever."""
+        while True:
+            changes = self.poll()
+            if not changes:
+                time.sleep(interval)
+            yield from changes
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print appointment changes as JSONL as they happen.")
+    parser.add_argument("--from", dest="after", type=int,
+                        help="start after this sequence number (default: only new changes)")
+    parser.add_argument("--db", help="database file (default: the configured one)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="seconds between polls while idle")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        connection.configure(path=args.db)
+    create_tables()
+    feed = ChangeFeed(args.after)
+    try:
+        while True:
+            try:
+                for seq, appointment_id, op, changed_at in feed.follow(args.interval):
+                    print(json.dumps({
+                        "seq": seq, "appointment_id": appointment_id, "op": op,
+                        "changed_at": changed_at.isoformat(),
+                    }), flush=True)
+            except ChangesPruned as e:
+                print(json.dumps({"pruned": str(e)}), flush=True)
+                feed.skip_to_latest()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
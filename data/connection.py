@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Iterator
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class ConnectionConfig:
+    """
+    Settings applied to every connection opened by the manager.
+    ``mmap_size`` is in bytes, ``cache_size`` follows SQLite semantics
+    (negative values are KiB), ``busy_timeout`` is in milliseconds.
+    ``timezone`` is the IANA zone of the wall-clock times the application
+    works with; the database stores UTC epoch seconds (see
+    ``data/timestamps.py``). Set it before the first migration.
+    """
+    path: str = "smartscheduler.db"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64 * 1024
+    busy_timeout: int = 5000
+    timezone: str = "UTC"
+
+_config = ConnectionConfig()
+_local = threading.local()
+_generation = 0
+_lock = threading.Lock()
+
+def get_config() -> ConnectionConfig:
+    """Return the active connection configuration."""
+    return _config
+
+def configure(**changes) -> ConnectionConfig:
+    """
+    Update the connection configuration (e.g. ``configure(path="other.db")``).
+    Connections opened with the previous settings are reopened lazily on
+    their next use.
+    """
+    global _config, _generation
+    with _lock:
+        _config = replace(_config, **changes)
+        _generation += 1
+    return _config
+
+# ---------------------------------------------------------------------------
+# Connections
+# ---------------------------------------------------------------------------
+def _open(config: ConnectionConfig) -> sqlite3.Connection:
+    # isolation_level=None: statements autocommit unless wrapped in
+    # transaction(), which issues BEGIN/COMMIT explicitly.
+    conn = sqlite3.connect(
+        config.path,
+        timeout=config.busy_timeout / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    conn.execute(f"PRAGMA journal_mode = {config.journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {config.synchronous}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = {int(config.cache_size)}")
+    conn.execute(f"PRAGMA busy_timeout = {int(config.busy_timeout)}")
+    return conn
+
+def open_connection() -> sqlite3.Connection:
+    """
+    Open a new, unshared connection with the configured settings. The caller
+    owns it; most code should use ``get_connection()`` instead.
+    """
+    return _open(_config)
+
+def config_generation() -> int:
+    """Counter bumped by every ``configure()`` call."""
+    return _generation
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return the long-lived connection for the current thread, opening it on
+    first use. A connection inherited across ``fork()`` is never reused.
+    """
+    conn = getattr(_local, "conn", None)
+    if (
+        conn is not None
+        and _local.pid == os.getpid()
+        and _local.generation == _generation
+    ):
+        return conn
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = _open(_config)
+    _local.pid = os.getpid()
+    _local.generation = _generation
+    return _local.conn
+
+def close_connection() -> None:
+    """Close the current thread's connection (it is reopened on demand)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = None
+
+@contextmanager
+def transaction(mode: str = "DEFERRED") -> Iterator[sqlite3.Connection]:
+    """
+    Run a block inside a single transaction on the thread's connection::
+
+        with transaction() as conn:
+            conn.execute(...)
+
+    Commits on success and rolls back on any exception. ``mode`` is one of
+    DEFERRED, IMMEDIATE or EXCLUSIVE. Nested calls join the outer transaction.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
@@ -1,10 +1,15 @@
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from smartscheduler.models.person import Client, Employee
+from smartscheduler.data.connection import get_connection, transaction
+from smartscheduler.data.migrations import migrate, register_hot_query
+from smartscheduler.data.timestamps import from_epoch, to_epoch
+from smartscheduler.models.person import Client, Employee, normalize_name
 from smartscheduler.models.appointment import Appointment
+from smartscheduler.models.availability import WEEKDAYS, CompiledAvailability, parse_block
+from smartscheduler.models.series import AppointmentSeries, Occurrence, iter_occurrences
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -13,85 +18,175 @@ STATUS_SCHEDULED = "Scheduled"
 STATUS_COMPLETED = "Completed"
 STATUS_CANCELLED = "Cancelled"
 
-DB_PATH = "smartscheduler.db"
+# ---------------------------------------------------------------------------
+# Hot queries (their plans are checked by ``migrations --dry-run``)
+# ---------------------------------------------------------------------------
+_SQL_CLIENT_BY_NAME = register_hot_query(
+    "client by name",
+    "SELECT id, name, email, phone FROM clients WHERE name_key = ? ORDER BY id LIMIT 1",
+    ("ana ruiz",),
+)
+_SQL_EMPLOYEE_BY_EMAIL = register_hot_query(
+    "employee by email",
+    "SELECT id, name, email, phone, role, availability FROM employees WHERE email = ?",
+    ("laura@clinic.com",),
+)
+_SQL_EMPLOYEE_BY_NAME = register_hot_query(
+    "employee by name",
+    """SELECT id, name, email, phone, role, availability
+       FROM employees WHERE name_key = ? ORDER BY id LIMIT 1""",
+    ("laura sanchez",),
+)
+_SQL_ACTIVE_BY_CLIENT = register_hot_query(
+    "active appointments by client",
+    "SELECT id, start_epoch, end_epoch, employee_id FROM appointments WHERE client_id = ? AND status = ?",
+    (1, STATUS_SCHEDULED),
+)
+_SQL_CANCEL_BY_CLIENT = register_hot_query(
+    "cancel appointments by client",
+    "UPDATE appointments SET status = ? WHERE client_id = ? AND status = ?",
+    (STATUS_CANCELLED, 1, STATUS_SCHEDULED),
+)
+_SQL_CANCEL_BY_ID = register_hot_query(
+    "cancel appointment by id",
+    "UPDATE appointments SET status = ? WHERE id = ? AND status = ?",
+    (STATUS_CANCELLED, 1, STATUS_SCHEDULED),
+)
+# An existing appointment [s, e) overlaps [start, end) iff s < end and e > start.
+# The R*Tree stores float bounds rounded outwards, so it yields a superset of
+# candidates that is re-checked against the exact integer epochs. CROSS JOIN
+# keeps the R*Tree as the outer loop.
+_SQL_EMPLOYEE_OVERLAP = register_hot_query(
+    "employee overlap check",
+    """SELECT 1 FROM appointment_intervals AS r
+       CROSS JOIN appointments AS a ON a.id = r.id
+       WHERE r.employee_lo <= :employee_id AND r.employee_hi >= :employee_id
+         AND r.start_epoch < :end AND r.end_epoch > :start
+         AND a.employee_id = :employee_id
+         AND a.status = :status
+         AND a.start_epoch < :end AND a.end_epoch > :start
+       LIMIT 1""",
+    {"employee_id": 1, "status": STATUS_SCHEDULED, "start": 1736157600, "end": 1736161200},
+)
+_SQL_BUSY_INTERVALS = register_hot_query(
+    "employee busy intervals",
+    """SELECT a.start_epoch, a.end_epoch FROM appointment_intervals AS r
+       CROSS JOIN appointments AS a ON a.id = r.id
+       WHERE r.employee_lo <= :employee_id AND r.employee_hi >= :employee_id
+         AND r.start_epoch < :end AND r.end_epoch > :start
+         AND a.employee_id = :employee_id
+         AND a.status = :status
+         AND a.start_epoch < :end AND a.end_epoch > :start
+       ORDER BY a.start_epoch""",
+    {"employee_id": 1, "status": STATUS_SCHEDULED, "start": 1736121600, "end": 1743897600},
+)
+# The same for many employees at once, grouped by employee.
+_SQL_TEAM_BUSY_INTERVALS = register_hot_query(
+    "team busy intervals",
+    """SELECT a.employee_id, a.start_epoch, a.end_epoch FROM appointment_intervals AS r
+       CROSS JOIN appointments AS a ON a.id = r.id
+       WHERE r.employee_lo <= :employee_hi AND r.employee_hi >= :employee_lo
+         AND r.start_epoch < :end AND r.end_epoch > :start
+         AND a.employee_id IN (SELECT value FROM json_each(:employees))
+         AND a.status = :status
+         AND a.start_epoch < :end AND a.end_epoch > :start
+       ORDER BY a.employee_id, a.start_epoch""",
+    {"employee_lo": 1, "employee_hi": 500, "employees": "[1, 2]", "status": STATUS_SCHEDULED,
+     "start": 1736121600, "end": 1736726400},
+)
+_SQL_APPOINTMENTS_IN_WINDOW = register_hot_query(
+    "appointments in window",
+    """SELECT
+            a.id,
+            clients.name        AS client_name,
+            employees.name      AS employee_name,
+            a.start_epoch,
+            a.end_epoch,
+            a.status
+        FROM appointment_intervals AS r
+        CROSS JOIN appointments AS a ON a.id = r.id
+        JOIN clients   ON a.client_id   = clients.id
+        JOIN employees ON a.employee_id = employees.id
+        WHERE r.employee_lo <= :employee_hi AND r.employee_hi >= :employee_lo
+          AND r.start_epoch < :end AND r.end_epoch > :start
+          AND a.start_epoch < :end AND a.end_epoch > :start
+        ORDER BY a.start_epoch, a.id""",
+    {"employee_lo": 1, "employee_hi": 1, "start": 1736121600, "end": 1736726400},
+)
+_SERIES_COLUMNS = """id, client_id, employee_id, first_start_epoch, duration_minutes,
+              freq, interval, count, until_epoch, status"""
+_SQL_SERIES_IN_WINDOW = register_hot_query(
+    "series overlapping window",
+    f"""SELECT {_SERIES_COLUMNS}
+       FROM appointment_series
+       WHERE employee_id IN (SELECT value FROM json_each(:employees))
+         AND status = :status
+         AND span_start < :end AND span_end > :start""",
+    {"employees": "[1]", "status": STATUS_SCHEDULED, "start": 1736121600, "end": 1736726400},
+)
+# Every occurrence of a new series against the appointment book in one
+# statement: the occurrences arrive as a JSON array of [start, end] epochs.
+_SQL_OCCURRENCE_CONFLICTS = register_hot_query(
+    "series occurrence conflicts",
+    """SELECT o.key, a.id
+       FROM json_each(:occurrences) AS o
+       CROSS JOIN appointment_intervals AS r
+       CROSS JOIN appointments AS a ON a.id = r.id
+       WHERE r.employee_lo <= :employee_id AND r.employee_hi >= :employee_id
+         AND r.start_epoch < json_extract(o.value, '$[1]')
+         AND r.end_epoch > json_extract(o.value, '$[0]')
+         AND a.employee_id = :employee_id
+         AND a.status = :status
+         AND a.start_epoch < json_extract(o.value, '$[1]')
+         AND a.end_epoch > json_extract(o.value, '$[0]')
+       ORDER BY o.key""",
+    {"occurrences": "[[1736157600, 1736161200]]", "employee_id": 1, "status": STATUS_SCHEDULED},
+)
 
 # ---------------------------------------------------------------------------
 # Low-level helpers
 # ---------------------------------------------------------------------------
 def create_connection() -> sqlite3.Connection:
-    """Return a SQLite connection to the main DB."""
-    return sqlite3.connect(DB_PATH)
+    """
+    Return the thread's long-lived SQLite connection to the main DB.
+    The connection is shared: callers must not close it.
+    """
+    return get_connection()
 
-# ---------------------------------------------------------------------------
-# Schema
-# ---------------------------------------------------------------------------
-def create_tables() -> None:
-    """Create all tables if they don't exist yet."""
-    conn = create_connection()
-    cursor = conn.cursor()
-
-    # Clients table
-    cursor.execute(
-        """CREATE TABLE IF NOT EXISTS clients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT,
-            phone TEXT
-        )"""
-    )
+def _appointment_row(row: tuple) -> tuple:
+    """``(id, client, employee, start, end, status)`` with datetimes for the epochs."""
+    return row[0], row[1], row[2], from_epoch(row[3]), from_epoch(row[4]), row[5]
 
-    # Employees table
-    cursor.execute(
-        """CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT NOT NULL,
-            role TEXT NOT NULL,
-            availability TEXT NOT NULL
-        )"""
-    )
+_employee_listeners: List[Callable[[], None]] = []
 
-    # Appointments table
-    cursor.execute(
-        """CREATE TABLE IF NOT EXISTS appointments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_id INTEGER NOT NULL,
-            employee_id INTEGER NOT NULL,
-            start_time TEXT NOT NULL,
-            end_time TEXT NOT NULL,
-            status TEXT NOT NULL,
-            FOREIGN KEY(client_id) REFERENCES clients(id),
-            FOREIGN KEY(employee_id) REFERENCES employees(id)
-        )"""
-    )
+def on_employees_changed(callback: Callable[[], None]) -> None:
+    """Register a callback run after this process writes to ``employees``."""
+    _employee_listeners.append(callback)
 
-    # Users table
-    cursor.execute(
-        """CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL
-        )"""
-    )
+def _employees_changed() -> None:
+    for callback in _employee_listeners:
+        callback()
 
-    conn.commit()
-    conn.close()
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+def create_tables() -> None:
+    """
+    Create all tables if they don't exist yet and bring the schema up to
+    date by applying any pending migrations (see ``data/migrations.py``).
+    """
+    migrate()
 
 # ---------------------------------------------------------------------------
 # Clients
 # ---------------------------------------------------------------------------
 def get_client_by_name(name: str) -> Optional[Client]:
     """
-    Get a client by their name (case-insensitive).
+    Get a client by their name (case- and accent-insensitive, via ``name_key``).
     Returns a Client object or None if not found.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM clients WHERE LOWER(name) = LOWER(?)", (name,))
+    cursor = create_connection().execute(_SQL_CLIENT_BY_NAME, (normalize_name(name),))
     row = cursor.fetchone()
-    conn.close()
 
     if not row:
         return None
@@ -110,25 +205,18 @@ def add_client(client: Client) -> None:
         client.id = existing.id
         return
 
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO clients (name, email, phone) VALUES (?, ?, ?)",
-        (client.name, client.email, client.phone),
-    )
-    client.id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO clients (name, email, phone, name_key) VALUES (?, ?, ?, ?)",
+            (client.name, client.email, client.phone, normalize_name(client.name)),
+        )
+        client.id = cursor.lastrowid
 
 def get_clients() -> List[Client]:
     """
     Return a list of all clients in the database.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM clients")
-    rows = cursor.fetchall()
-    conn.close()
+    rows = create_connection().execute("SELECT id, name, email, phone FROM clients").fetchall()
 
     clients: List[Client] = []
     for row in rows:
@@ -137,6 +225,12 @@ def get_clients() -> List[Client]:
         clients.append(c)
     return clients
 
+def get_client_names(after_id: int = 0) -> List[Tuple[int, str]]:
+    """``(id, name)`` of the clients with an id above ``after_id``, in id order."""
+    return create_connection().execute(
+        "SELECT id, name FROM clients WHERE id > ? ORDER BY id", (after_id,)
+    ).fetchall()
+
 # ---------------------------------------------------------------------------
 # Employees
 # ---------------------------------------------------------------------------
@@ -145,11 +239,8 @@ def get_employee_by_email(email: str) -> Optional[Employee]:
     Get an employee by their email.
     Returns an Employee object or None if not found.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM employees WHERE email = ?", (email,))
+    cursor = create_connection().execute(_SQL_EMPLOYEE_BY_EMAIL, (email,))
     row = cursor.fetchone()
-    conn.close()
 
     if not row:
         return None
@@ -171,14 +262,11 @@ def get_employee_by_email(email: str) -> Optional[Employee]:
 
 def get_employee_by_name(name: str) -> Optional[Employee]:
     """
-    Get an employee by their name (case-insensitive).
+    Get an employee by their name (case- and accent-insensitive, via ``name_key``).
     Returns an Employee object or None if not found.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM employees WHERE LOWER(name) = LOWER(?)", (name,))
+    cursor = create_connection().execute(_SQL_EMPLOYEE_BY_NAME, (normalize_name(name),))
     row = cursor.fetchone()
-    conn.close()
 
     if not row:
         return None
@@ -208,32 +296,43 @@ def add_employee(employee: Employee) -> None:
         employee.id = existing.id
         return
 
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """INSERT INTO employees (name, email, phone, role, availability)
-           VALUES (?, ?, ?, ?, ?)""",
-        (
-            employee.name,
-            employee.email,
-            employee.phone,
-            employee.role,
-            json.dumps(employee.availability),
-        ),
-    )
-    employee.id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(
+            """INSERT INTO employees (name, email, phone, role, availability, name_key)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                employee.name,
+                employee.email,
+                employee.phone,
+                employee.role,
+                json.dumps(employee.availability),
+                normalize_name(employee.name),
+            ),
+        )
+        employee.id = cursor.lastrowid
+        _write_availability(conn, employee.id, employee.availability)
+    _employees_changed()
+
+def update_employee_availability(employee_id: int, availability: dict) -> None:
+    """
+    Replace an employee's weekly availability
+    (``{"Monday": ["09:00-13:00", ...], ...}``).
+    """
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE employees SET availability = ? WHERE id = ?",
+            (json.dumps(availability), employee_id),
+        )
+        _write_availability(conn, employee_id, availability)
+    _employees_changed()
 
 def get_employees() -> List[Employee]:
     """
     Return a list of all employees in the database.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM employees")
-    rows = cursor.fetchall()
-    conn.close()
+    rows = create_connection().execute(
+        "SELECT id, name, email, phone, role, availability FROM employees"
+    ).fetchall()
 
     employees: List[Employee] = []
     for row in rows:
@@ -255,6 +354,39 @@ def get_employees() -> List[Employee]:
         employees.append(emp)
     return employees
 
+# ---------------------------------------------------------------------------
+# Availability
+# ---------------------------------------------------------------------------
+def _write_availability(conn: sqlite3.Connection, employee_id: int, availability: dict) -> None:
+    """Replace the employee's rows in ``employee_availability``; bad blocks are skipped."""
+    conn.execute("DELETE FROM employee_availability WHERE employee_id = ?", (employee_id,))
+    rows = []
+    for weekday, name in enumerate(WEEKDAYS):
+        for block in (availability or {}).get(name) or []:
+            interval = parse_block(block)
+            if interval:
+                rows.append((employee_id, weekday, *interval))
+    conn.executemany("INSERT OR IGNORE INTO employee_availability VALUES (?, ?, ?, ?)", rows)
+
+def get_compiled_availability(employee_ids: Optional[List[int]] = None):
+    """
+    Load working hours from ``employee_availability`` in one query and
+    compile them. Returns ``{employee_id: CompiledAvailability}``; employees
+    without any rows are missing from the result.
+    """
+    sql = "SELECT employee_id, weekday, start_min, end_min FROM employee_availability"
+    params = ()
+    if employee_ids is not None:
+        sql += " WHERE employee_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(employee_ids)),)
+    days_by_employee = {}
+    for employee_id, weekday, start_min, end_min in create_connection().execute(sql, params):
+        days_by_employee.setdefault(employee_id, {}).setdefault(weekday, []).append((start_min, end_min))
+    return {
+        employee_id: CompiledAvailability(days)
+        for employee_id, days in days_by_employee.items()
+    }
+
 # ---------------------------------------------------------------------------
 # Appointments
 # ---------------------------------------------------------------------------
@@ -263,141 +395,659 @@ def add_appointment(appointment: Appointment) -> None:
     Add a new appointment to the database.
     Updates the ``appointment.id`` field with the DB id.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """INSERT INTO appointments
-           (client_id, employee_id, start_time, end_time, status)
-           VALUES (?, ?, ?, ?, ?)""",
-        (
-            appointment.client.id,
-            appointment.employee.id,
-            appointment.start_time.strftime("%Y-%m-%d %H:%M:%S"),
-            appointment.end_time.strftime("%Y-%m-%d %H:%M:%S"),
-            appointment.status,
-        ),
-    )
-    appointment.id = cursor.lastrowid  # keep the ID in memory
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(
+            """INSERT INTO appointments
+               (client_id, employee_id, start_epoch, end_epoch, status)
+               VALUES (?, ?, ?, ?, ?)""",
+            (
+                appointment.client.id,
+                appointment.employee.id,
+                to_epoch(appointment.start_time),
+                to_epoch(appointment.end_time),
+                appointment.status,
+            ),
+        )
+        appointment.id = cursor.lastrowid  # keep the ID in memory
 
 def update_appointment_status(appointment_id: int, new_status: str) -> None:
     """
     Update the *status* field of a single appointment.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE appointments SET status = ? WHERE id = ?",
-        (new_status, appointment_id),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE appointments SET status = ? WHERE id = ?",
+            (new_status, appointment_id),
+        )
 
 def cancel_appointments_by_client_id(client_id: int) -> int:
     """
     Mark all *scheduled* appointments for a client as CANCELLED.
     Returns the number of affected rows.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE appointments SET status = ? WHERE client_id = ? AND status = ?",
-        (STATUS_CANCELLED, client_id, STATUS_SCHEDULED),
-    )
-    conn.commit()
-    affected = cursor.rowcount
-    conn.close()
-    return affected
+    with transaction() as conn:
+        cursor = conn.execute(
+            _SQL_CANCEL_BY_CLIENT,
+            (STATUS_CANCELLED, client_id, STATUS_SCHEDULED),
+        )
+        return cursor.rowcount
 
 def cancel_appointment_by_id(appointment_id: int) -> int:
     """
     Mark a single appointment as CANCELLED.
     Returns the number of affected rows (1 if cancelled, 0 if not found or already cancelled).
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE appointments SET status = ? WHERE id = ? AND status = ?",
-        (STATUS_CANCELLED, appointment_id, STATUS_SCHEDULED),
-    )
-    conn.commit()
-    affected = cursor.rowcount
-    conn.close()
-    return affected
+    with transaction() as conn:
+        cursor = conn.execute(
+            _SQL_CANCEL_BY_ID,
+            (STATUS_CANCELLED, appointment_id, STATUS_SCHEDULED),
+        )
+        return cursor.rowcount
 
 def get_appointments():
     """
     Return a list of rows with ALL appointments (joined with client / employee names).
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
+    cursor = create_connection().execute(
         """SELECT
                 appointments.id,
                 clients.name        AS client_name,
                 employees.name      AS employee_name,
-                appointments.start_time,
-                appointments.end_time,
+                appointments.start_epoch,
+                appointments.end_epoch,
                 appointments.status
             FROM appointments
             JOIN clients   ON appointments.client_id   = clients.id
             JOIN employees ON appointments.employee_id = employees.id"""
     )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return [_appointment_row(row) for row in cursor]
+
+_APPOINTMENT_COLUMNS = """
+            appointments.id,
+            clients.name        AS client_name,
+            employees.name      AS employee_name,
+            appointments.start_epoch,
+            appointments.end_epoch,
+            appointments.status"""
+
+def _appointment_filters(employee_id=None, client_id=None, status=None,
+                         start_time=None, end_time=None):
+    """Build the WHERE clause and parameters shared by the filtered queries."""
+    clauses, params = [], {}
+    if employee_id is not None:
+        clauses.append("appointments.employee_id = :employee_id")
+        params["employee_id"] = employee_id
+    if client_id is not None:
+        clauses.append("appointments.client_id = :client_id")
+        params["client_id"] = client_id
+    if status is not None:
+        clauses.append("appointments.status = :status")
+        params["status"] = status
+    if start_time is not None:
+        clauses.append("appointments.start_epoch >= :start_time")
+        params["start_time"] = to_epoch(start_time)
+    if end_time is not None:
+        clauses.append("appointments.start_epoch < :end_time")
+        params["end_time"] = to_epoch(end_time)
+    return clauses, params
+
+def _appointments_page_sql(clauses: List[str], after: bool) -> str:
+    if after:
+        clauses = clauses + ["(appointments.start_epoch, appointments.id) > (:after_start, :after_id)"]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"""SELECT {_APPOINTMENT_COLUMNS}
+        FROM appointments
+        JOIN clients   ON appointments.client_id   = clients.id
+        JOIN employees ON appointments.employee_id = employees.id
+        {where}
+        ORDER BY appointments.start_epoch, appointments.id
+        LIMIT :limit"""
+
+register_hot_query(
+    "appointments page",
+    _appointments_page_sql([], after=True),
+    {"after_start": 1736157600, "after_id": 1, "limit": 500},
+)
+register_hot_query(
+    "appointments page by employee and window",
+    _appointments_page_sql(_appointment_filters(1, start_time=datetime(2025, 1, 6),
+                                                end_time=datetime(2025, 1, 13))[0], after=True),
+    {"employee_id": 1, "start_time": 1736121600, "end_time": 1736726400,
+     "after_start": 1736157600, "after_id": 1, "limit": 500},
+)
+
+def iter_appointments(employee_id: Optional[int] = None, client_id: Optional[int] = None,
+                      status: Optional[str] = None, start_time: Optional[datetime] = None,
+                      end_time: Optional[datetime] = None, page_size: int = 500) -> Iterator[tuple]:
+    """
+    Lazily yield appointments matching the given filters, ordered by
+    ``(start_time, id)``. The window selects appointments *starting* in
+    ``[start_time, end_time)``. Rows are fetched ``page_size`` at a time
+    with keyset pagination, so memory stays flat however large the table is.
+    Rows have the same shape as ``get_appointments()``.
+    """
+    clauses, params = _appointment_filters(employee_id, client_id, status, start_time, end_time)
+    params["limit"] = page_size
+    conn = create_connection()
+    sql = _appointments_page_sql(clauses, after=False)
+    while True:
+        rows = conn.execute(sql, params).fetchall()
+        for row in rows:
+            yield _appointment_row(row)
+        if len(rows) < page_size:
+            return
+        params["after_start"], params["after_id"] = rows[-1][3], rows[-1][0]
+        sql = _appointments_page_sql(clauses, after=True)
+
+def count_appointments(employee_id: Optional[int] = None, client_id: Optional[int] = None,
+                       status: Optional[str] = None, start_time: Optional[datetime] = None,
+                       end_time: Optional[datetime] = None) -> int:
+    """Count appointments matching the same filters as ``iter_appointments()``."""
+    clauses, params = _appointment_filters(employee_id, client_id, status, start_time, end_time)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return create_connection().execute(
+        f"SELECT COUNT(*) FROM appointments {where}", params
+    ).fetchone()[0]
+
+# Sort orders of the appointment list. Each key ends with a unique column,
+# so (key) > (last key) resumes a page exactly; the name sorts walk
+# clients/employees by name_key and each person's appointments by start.
+APPOINTMENT_SORTS: Dict[str, Tuple[str, ...]] = {
+    "client": ("clients.name_key", "clients.id", "appointments.start_epoch", "appointments.id"),
+    "employee": ("employees.name_key", "employees.id", "appointments.start_epoch", "appointments.id"),
+    "start": ("appointments.start_epoch", "appointments.id"),
+    "end": ("appointments.end_epoch", "appointments.id"),
+    "status": ("appointments.status", "appointments.start_epoch", "appointments.id"),
+}
+
+def _appointments_sorted_sql(sort: str, descending: bool, clauses: List[str], after: bool) -> str:
+    keys = APPOINTMENT_SORTS[sort]
+    if after:
+        marks = ", ".join(f":k{i}" for i in range(len(keys)))
+        clauses = clauses + [f"({', '.join(keys)}) {'<' if descending else '>'} ({marks})"]
+        if not keys[0].startswith("appointments."):
+            # A row value across two tables cannot seek an index; the bound
+            # on the person's name_key can. (On appointments alone it would
+            # only hide the row value from the index.)
+            clauses.append(f"{keys[0]} {'<=' if descending else '>='} :k0")
+    if sort == "end" and any(":start_time" in clause for clause in clauses):
+        # Implied by end > start, and lets the end index seek.
+        clauses = clauses + ["appointments.end_epoch > :start_time"]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    direction = " DESC" if descending else ""
+    # The table whose index gives the order drives the join (CROSS JOIN).
+    joins = {
+        "client": """clients
+        CROSS JOIN appointments ON appointments.client_id   = clients.id
+        JOIN employees ON appointments.employee_id = employees.id""",
+        "employee": """employees
+        CROSS JOIN appointments ON appointments.employee_id = employees.id
+        JOIN clients   ON appointments.client_id   = clients.id""",
+    }.get(sort, """appointments
+        CROSS JOIN clients   ON appointments.client_id   = clients.id
+        CROSS JOIN employees ON appointments.employee_id = employees.id""")
+    return f"""SELECT {_APPOINTMENT_COLUMNS}, {', '.join(keys)}
+        FROM {joins}
+        {where}
+        ORDER BY {', '.join(key + direction for key in keys)}
+        LIMIT :limit OFFSET :offset"""
+
+for _sort in APPOINTMENT_SORTS:
+    register_hot_query(
+        f"appointment list by {_sort}",
+        _appointments_sorted_sql(_sort, False, [], after=True),
+        {**{f"k{i}": 0 for i in range(len(APPOINTMENT_SORTS[_sort]))}, "limit": 100, "offset": 0},
+    )
+
+def get_appointments_sorted(sort: str = "start", descending: bool = False,
+                            status: Optional[str] = None, start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None, after: Optional[tuple] = None,
+                            offset: int = 0, limit: int = 100) -> Tuple[List[tuple], List[tuple]]:
+    """
+    One page of the appointment list in the order of ``APPOINTMENT_SORTS[sort]``,
+    with the filters of ``iter_appointments()``. The page starts ``offset``
+    rows after the row whose sort key is ``after`` (or after the start).
+    Returns ``(rows, keys)``: rows shaped like ``get_appointments()`` and the
+    sort key of each, to resume from any of them.
+    """
+    if sort not in APPOINTMENT_SORTS:
+        raise ValueError(f"unknown sort '{sort}'")
+    clauses, params = _appointment_filters(None, None, status, start_time, end_time)
+    params.update(limit=limit, offset=offset)
+    if after is not None:
+        params.update((f"k{i}", value) for i, value in enumerate(after))
+    width = len(_APPOINTMENT_COLUMNS.split(","))
+    rows, keys = [], []
+    for row in create_connection().execute(
+        _appointments_sorted_sql(sort, descending, clauses, after is not None), params
+    ):
+        rows.append(_appointment_row(row[:width]))
+        keys.append(tuple(row[width:]))
+    return rows, keys
+
+def count_clients_with_appointments() -> int:
+    """Number of distinct clients that have at least one appointment."""
+    return create_connection().execute(
+        "SELECT COUNT(DISTINCT client_id) FROM appointments"
+    ).fetchone()[0]
+
+def get_appointments_in_window(start_time: datetime, end_time: datetime,
+                               employee_id: Optional[int] = None):
+    """
+    Return the appointments (any status) overlapping ``[start_time, end_time)``,
+    optionally for a single employee, ordered by start time.
+    Rows have the same shape as ``get_appointments()``.
+    """
+    employee_lo, employee_hi = (
+        (employee_id, employee_id) if employee_id is not None else (0, 2 ** 62)
+    )
+    cursor = create_connection().execute(
+        _SQL_APPOINTMENTS_IN_WINDOW,
+        {
+            "employee_lo": employee_lo,
+            "employee_hi": employee_hi,
+            "start": to_epoch(start_time),
+            "end": to_epoch(end_time),
+        },
+    )
+    return [_appointment_row(row) for row in cursor]
+
+def get_busy_intervals(employee_id: int, start_time: datetime, end_time: datetime):
+    """
+    Return ``(start_epoch, end_epoch)`` pairs of the employee's *Scheduled*
+    appointments and series occurrences overlapping the window, sorted by
+    start.
+    """
+    cursor = create_connection().execute(
+        _SQL_BUSY_INTERVALS,
+        {
+            "employee_id": employee_id,
+            "status": STATUS_SCHEDULED,
+            "start": to_epoch(start_time),
+            "end": to_epoch(end_time),
+        },
+    )
+    busy = cursor.fetchall()
+    series = get_series_intervals([employee_id], to_epoch(start_time), to_epoch(end_time))
+    if series:
+        busy = sorted(busy + [(start, end) for start, end, _ in series.get(employee_id, [])])
+    return busy
+
+def get_team_busy_intervals(employee_ids: Sequence[int], start_time: datetime,
+                            end_time: datetime) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    ``get_busy_intervals()`` for many employees in one query:
+    ``{employee_id: [(start_epoch, end_epoch), ...]}`` sorted by start, with
+    an entry for every employee asked for.
+    """
+    busy: Dict[int, List[Tuple[int, int]]] = {e: [] for e in employee_ids}
+    if not busy:
+        return busy
+    start, end = to_epoch(start_time), to_epoch(end_time)
+    for employee_id, interval_start, interval_end in create_connection().execute(
+        _SQL_TEAM_BUSY_INTERVALS,
+        {
+            "employee_lo": min(busy),
+            "employee_hi": max(busy),
+            "employees": json.dumps(list(busy)),
+            "status": STATUS_SCHEDULED,
+            "start": start,
+            "end": end,
+        },
+    ):
+        busy[employee_id].append((interval_start, interval_end))
+    for employee_id, occurrences in get_series_intervals(list(busy), start, end).items():
+        busy[employee_id] = sorted(busy[employee_id] + [(s, e) for s, e, _ in occurrences])
+    return busy
 
 def get_active_appointments_by_client_id(client_id: int):
     """
     Returns a list of scheduled (not cancelled or completed) appointments for a client.
-    Each row: (id, start_time, end_time, employee_id)
+    Each row: (id, start_time, end_time, employee_id), times as datetimes.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, start_time, end_time, employee_id FROM appointments WHERE client_id = ? AND status = ?",
-        (client_id, STATUS_SCHEDULED)
+    cursor = create_connection().execute(
+        _SQL_ACTIVE_BY_CLIENT, (client_id, STATUS_SCHEDULED)
     )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return [(row[0], from_epoch(row[1]), from_epoch(row[2]), row[3]) for row in cursor]
 
 def is_employee_available(employee_id: int, start_time: datetime, end_time: datetime) -> bool:
     """
     Return True if the employee **has no overlapping appointments** in the
     *Scheduled* status during the given time window.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """SELECT 1 FROM appointments
-           WHERE employee_id = ?
-             AND status = ?
-             AND (
-                    (start_time < ? AND end_time > ?)  -- overlap at start
-                 OR (start_time < ? AND end_time > ?)  -- overlap at end
-                 OR (start_time >= ? AND end_time <= ?) -- contained within
-             )
-           LIMIT 1""",
-        (
-            employee_id,
-            STATUS_SCHEDULED,
-            end_time.strftime("%Y-%m-%d %H:%M:%S"),
-            start_time.strftime("%Y-%m-%d %H:%M:%S"),
-            end_time.strftime("%Y-%m-%d %H:%M:%S"),
-            start_time.strftime("%Y-%m-%d %H:%M:%S"),
-            start_time.strftime("%Y-%m-%d %H:%M:%S"),
-            end_time.strftime("%Y-%m-%d %H:%M:%S"),
-        ),
+    cursor = create_connection().execute(
+        _SQL_EMPLOYEE_OVERLAP,
+        {
+            "employee_id": employee_id,
+            "status": STATUS_SCHEDULED,
+            "start": to_epoch(start_time),
+            "end": to_epoch(end_time),
+        },
     )
-
     result = cursor.fetchone()
-    conn.close()
-    # Available if no overlap found
-    return result is None
+    # Available if no overlap found, including occurrences of recurring series
+    return result is None and not get_series_intervals(
+        [employee_id], to_epoch(start_time), to_epoch(end_time)
+    )
+
+# ---------------------------------------------------------------------------
+# Appointment change feed
+# ---------------------------------------------------------------------------
+# Triggers (migration 13) log every insert, update and delete on
+# appointments to appointment_changes, numbered by a sequence that only
+# grows. A consumer keeps the last seq it has seen and asks for newer ones.
+CHANGE_INSERT = "insert"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+CHANGE_LOG_KEEP = 100_000  # entries kept by prune_appointment_changes()
+
+class ChangesPruned(LookupError):
+    """The changes after a sequence number are no longer in the log."""
+
+def latest_change_seq() -> int:
+    """Sequence number of the newest change ever logged (0 if none)."""
+    row = create_connection().execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'appointment_changes'"
+    ).fetchone()
+    return row[0] if row else 0
+
+def get_appointment_changes(after_seq: int, limit: int = 1000) -> List[tuple]:
+    """
+    Up to ``limit`` changes logged after ``after_seq``, oldest first, as
+    ``(seq, appointment_id, op, changed_at)``. Raises ``ChangesPruned`` if
+    some of them were pruned; the caller must then re-read whatever it
+    built from the appointments.
+    """
+    with transaction() as conn:
+        rows = conn.execute(
+            """SELECT seq, appointment_id, op, changed_at FROM appointment_changes
+               WHERE seq > ? ORDER BY seq LIMIT ?""",
+            (after_seq, limit),
+        ).fetchall()
+        # Committed changes are numbered without gaps, so a missing first
+        # one was pruned.
+        first = rows[0][0] if rows else latest_change_seq() + 1
+    if first > after_seq + 1:
+        raise ChangesPruned(f"changes after {after_seq} were pruned (oldest kept: {first})")
+    return [(seq, appointment_id, op, from_epoch(at)) for seq, appointment_id, op, at in rows]
+
+def prune_appointment_changes(keep: int = CHANGE_LOG_KEEP) -> int:
+    """Drop all but the newest ``keep`` changes. Returns how many were dropped."""
+    with transaction("IMMEDIATE") as conn:
+        return conn.execute(
+            "DELETE FROM appointment_changes WHERE seq <= ?", (latest_change_seq() - keep,)
+        ).rowcount
+
+def get_table_versions(*names: str) -> Dict[str, int]:
+    """The ``table_versions`` counters of the given tables."""
+    marks = ", ".join("?" for _ in names)
+    return dict(create_connection().execute(
+        f"SELECT name, version FROM table_versions WHERE name IN ({marks})", names
+    ).fetchall())
+
+def _appointment_keys_sql(sort: str, clauses: List[str], source: str = "") -> str:
+    keys = APPOINTMENT_SORTS[sort]
+    return f"""{source}
+        SELECT {_APPOINTMENT_COLUMNS}, {', '.join(keys)}
+        FROM appointments
+        CROSS JOIN clients   ON appointments.client_id   = clients.id
+        CROSS JOIN employees ON appointments.employee_id = employees.id
+        WHERE {' AND '.join(clauses)}"""
+
+# The rows as they were before the given changes. Named after the table,
+# the CTE shadows it, so the list filters and sort keys apply unchanged.
+_BEFORE_CHANGES = """WITH appointments (id, client_id, employee_id, start_epoch, end_epoch, status) AS (
+            SELECT appointment_id, old_client_id, old_employee_id,
+                   old_start_epoch, old_end_epoch, old_status
+            FROM appointment_changes
+            WHERE seq IN (SELECT value FROM json_each(:seqs)) AND op != 'insert'
+        )"""
+
+register_hot_query(
+    "appointment sort keys by id",
+    _appointment_keys_sql("client", ["appointments.id IN (SELECT value FROM json_each(:ids))"]),
+    {"ids": "[1, 2]"},
+)
+register_hot_query(
+    "appointment sort keys before changes",
+    _appointment_keys_sql("client", ["1"], _BEFORE_CHANGES),
+    {"seqs": "[1, 2]"},
+)
+
+def _keyed_appointments(sql: str, params: dict) -> Dict[int, Tuple[tuple, tuple]]:
+    width = len(_APPOINTMENT_COLUMNS.split(","))
+    return {
+        row[0]: (_appointment_row(row[:width]), tuple(row[width:]))
+        for row in create_connection().execute(sql, params)
+    }
+
+def get_appointment_keys(sort: str, ids: Sequence[int], status: Optional[str] = None,
+                         start_time: Optional[datetime] = None,
+                         end_time: Optional[datetime] = None) -> Dict[int, Tuple[tuple, tuple]]:
+    """
+    ``{id: (row, sort key)}`` for those of the appointments ``ids`` that
+    pass the filters, with rows and keys as in ``get_appointments_sorted()``.
+    """
+    clauses, params = _appointment_filters(None, None, status, start_time, end_time)
+    clauses.append("appointments.id IN (SELECT value FROM json_each(:ids))")
+    params["ids"] = json.dumps(list(ids))
+    return _keyed_appointments(_appointment_keys_sql(sort, clauses), params)
+
+def get_appointment_keys_before(sort: str, seqs: Sequence[int], status: Optional[str] = None,
+                                start_time: Optional[datetime] = None,
+                                end_time: Optional[datetime] = None) -> Dict[int, Tuple[tuple, tuple]]:
+    """
+    Like ``get_appointment_keys()``, for the appointments as they were just
+    before the changes ``seqs`` (an update or delete each; inserts had no
+    earlier row).
+    """
+    clauses, params = _appointment_filters(None, None, status, start_time, end_time)
+    params["seqs"] = json.dumps(list(seqs))
+    return _keyed_appointments(_appointment_keys_sql(sort, clauses or ["1"], _BEFORE_CHANGES), params)
+
+# ---------------------------------------------------------------------------
+# Recurring series
+# ---------------------------------------------------------------------------
+def _optional_datetime(seconds: Optional[int]) -> Optional[datetime]:
+    return from_epoch(seconds) if seconds is not None else None
+
+def _load_exceptions(conn: sqlite3.Connection, series: List[AppointmentSeries]) -> None:
+    by_id = {s.id: s for s in series}
+    for series_id, original, new_start, new_end in conn.execute(
+        """SELECT series_id, original_start_epoch, new_start_epoch, new_end_epoch
+           FROM series_exceptions
+           WHERE series_id IN (SELECT value FROM json_each(?))""",
+        (json.dumps(list(by_id)),),
+    ):
+        moved = (from_epoch(new_start), from_epoch(new_end)) if new_start is not None else None
+        by_id[series_id].exceptions[from_epoch(original)] = moved
+
+def _row_to_series(row) -> AppointmentSeries:
+    series_id, client_id, employee_id, first_start, minutes, freq, interval, count, until, status = row
+    return AppointmentSeries(
+        client_id=client_id,
+        employee_id=employee_id,
+        first_start=from_epoch(first_start),
+        duration=timedelta(minutes=minutes),
+        freq=freq,
+        interval=interval,
+        count=count,
+        until=_optional_datetime(until),
+        status=status,
+        id=series_id,
+    )
+
+def get_series(series_id: int) -> Optional[AppointmentSeries]:
+    """Get a series (any status) with its exceptions, or None if not found."""
+    conn = create_connection()
+    row = conn.execute(
+        f"SELECT {_SERIES_COLUMNS} FROM appointment_series WHERE id = ?",
+        (series_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    series = _row_to_series(row)
+    _load_exceptions(conn, [series])
+    return series
+
+def get_series_in_window(employee_ids: Sequence[int], start_epoch: int,
+                         end_epoch: int) -> List[AppointmentSeries]:
+    """Scheduled series of the given employees with any occurrence in the window."""
+    conn = create_connection()
+    series = [
+        _row_to_series(row)
+        for row in conn.execute(
+            _SQL_SERIES_IN_WINDOW,
+            {
+                "employees": json.dumps(list(employee_ids)),
+                "status": STATUS_SCHEDULED,
+                "start": start_epoch,
+                "end": end_epoch,
+            },
+        )
+    ]
+    if series:
+        _load_exceptions(conn, series)
+    return series
+
+def get_scheduled_series() -> List[AppointmentSeries]:
+    """All scheduled series with their exceptions, ordered by employee."""
+    conn = create_connection()
+    series = [
+        _row_to_series(row)
+        for row in conn.execute(
+            f"""SELECT {_SERIES_COLUMNS} FROM appointment_series
+                WHERE status = ? ORDER BY employee_id, id""",
+            (STATUS_SCHEDULED,),
+        )
+    ]
+    if series:
+        _load_exceptions(conn, series)
+    return series
+
+def get_series_occurrences(employee_id: int, start_time: datetime,
+                           end_time: datetime) -> List[Occurrence]:
+    """The employee's series occurrences overlapping the window, by start."""
+    occurrences = []
+    for series in get_series_in_window([employee_id], to_epoch(start_time), to_epoch(end_time)):
+        occurrences.extend(iter_occurrences(series, start_time, end_time))
+    return sorted(occurrences, key=lambda o: o.start)
+
+def get_series_intervals(employee_ids: Sequence[int], start_epoch: int, end_epoch: int,
+                         exclude: Optional[Tuple[int, datetime]] = None
+                         ) -> Dict[int, List[Tuple[int, int, str]]]:
+    """
+    Occurrences of the employees' series overlapping the window as
+    ``{employee_id: [(start_epoch, end_epoch, label), ...]}`` sorted by start.
+    ``exclude`` is a ``(series_id, original_start)`` occurrence to leave out.
+    """
+    window_start, window_end = from_epoch(start_epoch), from_epoch(end_epoch)
+    intervals: Dict[int, List[Tuple[int, int, str]]] = {}
+    for series in get_series_in_window(employee_ids, start_epoch, end_epoch):
+        for o in iter_occurrences(series, window_start, window_end):
+            if exclude is not None and (o.series_id, o.original_start) == exclude:
+                continue
+            intervals.setdefault(series.employee_id, []).append(
+                (to_epoch(o.start), to_epoch(o.end), f"series {o.series_id} ({o.original_start:%Y-%m-%d %H:%M})")
+            )
+    for items in intervals.values():
+        items.sort()
+    return intervals
+
+def find_interval_conflicts(employee_id: int, intervals: Sequence[Tuple[int, int]],
+                            exclude: Optional[Tuple[int, datetime]] = None) -> Dict[int, str]:
+    """
+    Check many ``(start_epoch, end_epoch)`` intervals of one employee at
+    once: one set-based query against scheduled appointments, plus a sweep
+    against the occurrences of the employee's series.
+    Returns ``{index: what it overlaps}`` for every conflicting interval.
+    """
+    if not intervals:
+        return {}
+    conflicts: Dict[int, str] = {}
+    for index, appointment_id in create_connection().execute(
+        _SQL_OCCURRENCE_CONFLICTS,
+        {
+            "occurrences": json.dumps([list(i) for i in intervals]),
+            "employee_id": employee_id,
+            "status": STATUS_SCHEDULED,
+        },
+    ):
+        conflicts.setdefault(index, f"appointment {appointment_id}")
+
+    span_start = min(start for start, _ in intervals)
+    span_end = max(end for _, end in intervals)
+    booked = get_series_intervals([employee_id], span_start, span_end, exclude).get(employee_id, [])
+    j = 0
+    for index, (start, end) in sorted(enumerate(intervals), key=lambda item: item[1]):
+        while j < len(booked) and booked[j][1] <= start:
+            j += 1
+        # booked[j] is the first occurrence still running at ``start``; if
+        # it starts at or after ``end``, so does every later one.
+        if j < len(booked) and booked[j][0] < end:
+            conflicts.setdefault(index, booked[j][2])
+    return conflicts
+
+def _series_span(series: AppointmentSeries) -> Tuple[int, int]:
+    start, end = series.span()
+    return to_epoch(start), to_epoch(end)
+
+def add_series(series: AppointmentSeries) -> int:
+    """Store a new series (validated by the caller). Sets and returns ``series.id``."""
+    span_start, span_end = _series_span(series)
+    with transaction() as conn:
+        series.id = conn.execute(
+            """INSERT INTO appointment_series
+               (client_id, employee_id, first_start_epoch, duration_minutes, freq, interval,
+                count, until_epoch, status, span_start, span_end)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                series.client_id,
+                series.employee_id,
+                to_epoch(series.first_start),
+                int(series.duration.total_seconds() // 60),
+                series.freq,
+                series.interval,
+                series.count,
+                to_epoch(series.until) if series.until else None,
+                series.status,
+                span_start,
+                span_end,
+            ),
+        ).lastrowid
+    return series.id
+
+def set_series_exception(series: AppointmentSeries, original_start: datetime,
+                         moved_to: Optional[Tuple[datetime, datetime]] = None) -> None:
+    """
+    Record that one occurrence is cancelled (``moved_to`` is None) or moved.
+    The series row itself is untouched apart from its span.
+    """
+    series.exceptions[original_start] = moved_to
+    span_start, span_end = _series_span(series)
+    with transaction() as conn:
+        conn.execute(
+            """INSERT OR REPLACE INTO series_exceptions
+               (series_id, original_start_epoch, new_start_epoch, new_end_epoch)
+               VALUES (?, ?, ?, ?)""",
+            (
+                series.id,
+                to_epoch(original_start),
+                to_epoch(moved_to[0]) if moved_to else None,
+                to_epoch(moved_to[1]) if moved_to else None,
+            ),
+        )
+        conn.execute(
+            "UPDATE appointment_series SET span_start = ?, span_end = ? WHERE id = ?",
+            (span_start, span_end, series.id),
+        )
+
+def update_series_status(series_id: int, new_status: str) -> None:
+    """Update the status of a whole series (e.g. cancel every occurrence)."""
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE appointment_series SET status = ? WHERE id = ?", (new_status, series_id)
+        )
 
 # ---------------------------------------------------------------------------
 # Users
@@ -407,30 +1057,25 @@ def add_user(username: str, password: str, role: str) -> None:
     Add a new user to the database.
     Ignores if the username already exists.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-            (username, password, role),
-        )
-        conn.commit()
+        with transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                (username, password, role),
+            )
     except sqlite3.IntegrityError:
         # Username already exists – ignore
         pass
-    finally:
-        conn.close()
 
 def validate_user(username: str, password: str):
     """
     Validate a user's credentials.
     Returns the user's role if valid, else None.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT role FROM users WHERE username=? AND password=?", (username, password))
+    cursor = create_connection().execute(
+        "SELECT role FROM users WHERE username=? AND password=?", (username, password)
+    )
     row = cursor.fetchone()
-    conn.close()
     return row[0] if row else None
 
 def get_user_by_username(username: str):
@@ -438,12 +1083,10 @@ def get_user_by_username(username: str):
     Get a user by their username.
     Returns the user row or None if not found.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    cursor = create_connection().execute(
+        "SELECT * FROM users WHERE username = ?", (username,)
+    )
+    return cursor.fetchone()
 
 # ---------------------------------------------------------------------------
 # Maintenance helpers
@@ -452,13 +1095,14 @@ def reset_database() -> None:
     """
     Delete all data from all tables (for maintenance/testing).
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.executescript(
-        """DELETE FROM appointments;
-           DELETE FROM clients;
-           DELETE FROM employees;
-           DELETE FROM users;"""
-    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with transaction() as conn:
+        conn.execute("DELETE FROM appointments")
+        conn.execute("DELETE FROM series_exceptions")
+        conn.execute("DELETE FROM appointment_series")
+        conn.execute("DELETE FROM employee_availability")
+        conn.execute("DELETE FROM clients")
+        conn.execute("DELETE FROM employees")
+        conn.execute("DELETE FROM users")
+        # Followers of the feed see a gap and re-read everything.
+        conn.execute("DELETE FROM appointment_changes")
+    _employees_changed()
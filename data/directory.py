@@ -0,0 +1,164 @@
+"""
+In-process cache of the employee directory.
+
+``employee_directory`` keeps parsed ``Employee`` objects, their normalized
+names and availability compiled from the ``employee_availability`` table.
+It is invalidated explicitly by the write paths in ``data/database.py`` and
+detects changes committed by other connections (other threads or
+processes) through ``PRAGMA data_version`` plus the ``table_versions``
+counter kept up to date by triggers; ``TableWatch`` packages that check
+for other caches.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from smartscheduler.data import database
+from smartscheduler.data.connection import config_generation, open_connection
+from smartscheduler.models.availability import CompiledAvailability
+from smartscheduler.models.person import Employee, normalize_name
+
+class TableWatch:
+    """
+    Detects commits to a set of ``table_versions`` counters, including
+    commits by other connections (other threads or processes).
+    ``committed()`` alone reports commits to any table.
+    """
+
+    def __init__(self, *names: str):
+        self.names = names
+        self._conn: Optional[sqlite3.Connection] = None
+        self._generation = None
+        self._data_version = None
+        self._versions: Optional[Dict[str, int]] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # A dedicated connection never writes, so its data_version changes
+        # whenever any other connection commits.
+        if self._conn is None or self._generation != config_generation():
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = open_connection()
+            self._generation = config_generation()
+            self._data_version = None
+            self._versions = None
+        return self._conn
+
+    def _read_versions(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        marks = ", ".join("?" for _ in self.names)
+        return dict(conn.execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({marks})", self.names
+        ).fetchall())
+
+    def committed(self) -> bool:
+        """
+        True if any connection may have committed since the last check
+        (always on the first check or after a reconfiguration).
+        """
+        data_version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        return True
+
+    def poll(self) -> Optional[Dict[str, int]]:
+        """
+        The current counters if any changed since the last poll (always on
+        the first poll or after a reconfiguration), otherwise None.
+        """
+        if not self.committed() and self._versions is not None:
+            return None
+        versions = self._read_versions(self._connection())
+        if versions == self._versions:
+            return None
+        self._versions = versions
+        return versions
+
+class EmployeeDirectory:
+    """
+    Cached, read-only view of all employees. Returned objects are shared
+    between callers and must not be mutated.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._watch = TableWatch("employees")
+        self._employees: Optional[List[Employee]] = None
+        self._by_id: Dict[int, Employee] = {}
+        self._by_key: Dict[str, Employee] = {}
+        self._names: List[Tuple[str, Employee]] = []
+        self._availability: Dict[int, CompiledAvailability] = {}
+        # Bumped on every reload, so dependent indexes can tell when to resync.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    # -- invalidation -------------------------------------------------------
+    def invalidate(self) -> None:
+        """Drop the cached employees; the next access reloads them."""
+        with self._lock:
+            self._employees = None
+
+    def _load(self) -> None:
+        employees = database.get_employees()
+        self._by_id = {e.id: e for e in employees}
+        self._by_key = {}
+        for e in employees:
+            self._by_key.setdefault(normalize_name(e.name), e)
+        self._names = [(normalize_name(e.name), e) for e in employees]
+        compiled = database.get_compiled_availability()
+        empty = CompiledAvailability({})
+        self._availability = {e.id: compiled.get(e.id, empty) for e in employees}
+        self._employees = employees
+        self.generation += 1
+
+    def _ensure(self) -> None:
+        # Poll first, so the counters are recorded before a reload reads.
+        changed = self._watch.poll() is not None
+        if self._employees is not None and not changed:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._load()
+
+    # -- queries ------------------------------------------------------------
+    def employees(self) -> List[Employee]:
+        """All employees, in id order."""
+        with self._lock:
+            self._ensure()
+            return list(self._employees)
+
+    def get(self, employee_id: int) -> Optional[Employee]:
+        with self._lock:
+            self._ensure()
+            return self._by_id.get(employee_id)
+
+    def find_by_name(self, name: str) -> Optional[Employee]:
+        """Exact match on the normalized (accent/case-insensitive) name."""
+        with self._lock:
+            self._ensure()
+            return self._by_key.get(normalize_name(name))
+
+    def normalized_names(self) -> List[Tuple[str, Employee]]:
+        """``(normalized name, employee)`` pairs, computed once per load."""
+        with self._lock:
+            self._ensure()
+            return list(self._names)
+
+    def current_generation(self) -> int:
+        """The reload counter, after bringing the cache up to date."""
+        with self._lock:
+            self._ensure()
+            return self.generation
+
+    def availability(self, employee_id: int) -> Optional[CompiledAvailability]:
+        with self._lock:
+            self._ensure()
+            return self._availability.get(employee_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+employee_directory = EmployeeDirectory()
+database.on_employees_changed(employee_directory.invalidate)
@@ -0,0 +1,549 @@
+"""
+Versioned schema migrations.
+
+The schema version is stored in ``PRAGMA user_version``; every migration
+in ``MIGRATIONS`` with a higher version is applied in order, each in its
+own transaction together with the version bump.
+
+Run with:  python -m smartscheduler.data.migrations [--dry-run]
+"""
+
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from smartscheduler.data.connection import get_connection
+from smartscheduler.models.availability import WEEKDAYS, parse_block
+from smartscheduler.data.timestamps import from_wall_seconds, parse_wall_time, to_epoch
+from smartscheduler.models.person import normalize_name
+
+# ---------------------------------------------------------------------------
+# Migration definitions
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+def _sql(*statements: str) -> Callable[[sqlite3.Connection], None]:
+    """Build a migration step that runs the given statements in order."""
+    def apply(conn: sqlite3.Connection) -> None:
+        for statement in statements:
+            conn.execute(statement)
+    return apply
+
+def _column_names(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def _epoch(column: str) -> str:
+    # Wall-clock TEXT timestamp -> integer seconds (the text carries no
+    # zone, so it is read as UTC; ordering is all the index relies on).
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+def _add_users_role(conn: sqlite3.Connection) -> None:
+    # Databases created before the role column existed (formerly patched by
+    # migrate_columna_role.py).
+    if "role" not in _column_names(conn, "users"):
+        conn.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'empleado'")
+
+def _add_interval_index(conn: sqlite3.Connection) -> None:
+    columns = _column_names(conn, "appointments")
+    if "start_epoch" not in columns:
+        conn.execute("ALTER TABLE appointments ADD COLUMN start_epoch INTEGER")
+    if "end_epoch" not in columns:
+        conn.execute("ALTER TABLE appointments ADD COLUMN end_epoch INTEGER")
+    conn.execute(
+        f"UPDATE appointments SET start_epoch = {_epoch('start_time')}, "
+        f"end_epoch = {_epoch('end_time')}"
+    )
+    # Two dimensions: employee (a point) and the [start, end] interval.
+    conn.execute(
+        """CREATE VIRTUAL TABLE IF NOT EXISTS appointment_intervals USING rtree(
+            id, employee_lo, employee_hi, start_epoch, end_epoch
+        )"""
+    )
+    conn.execute("DELETE FROM appointment_intervals")
+    conn.execute(
+        """INSERT INTO appointment_intervals
+           SELECT id, employee_id, employee_id, start_epoch, end_epoch FROM appointments"""
+    )
+    sync = f"""
+            UPDATE appointments
+               SET start_epoch = {_epoch('NEW.start_time')},
+                   end_epoch = {_epoch('NEW.end_time')}
+             WHERE id = NEW.id;
+            INSERT OR REPLACE INTO appointment_intervals VALUES (
+                NEW.id, NEW.employee_id, NEW.employee_id,
+                {_epoch('NEW.start_time')}, {_epoch('NEW.end_time')}
+            );"""
+    conn.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS trg_appointments_interval_insert
+            AFTER INSERT ON appointments
+            BEGIN {sync}
+            END"""
+    )
+    conn.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS trg_appointments_interval_update
+            AFTER UPDATE OF start_time, end_time, employee_id ON appointments
+            BEGIN {sync}
+            END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER IF NOT EXISTS trg_appointments_interval_delete
+           AFTER DELETE ON appointments
+           BEGIN
+               DELETE FROM appointment_intervals WHERE id = OLD.id;
+           END"""
+    )
+
+def _add_name_keys(conn: sqlite3.Connection) -> None:
+    # The key is computed in Python (accent stripping has no SQL equivalent),
+    # so rows are backfilled here and the write paths set it on insert.
+    for table in ("clients", "employees"):
+        if "name_key" not in _column_names(conn, table):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN name_key TEXT")
+        rows = conn.execute(f"SELECT id, name FROM {table}").fetchall()
+        conn.executemany(
+            f"UPDATE {table} SET name_key = ? WHERE id = ?",
+            ((normalize_name(name), row_id) for row_id, name in rows),
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_name_key ON {table} (name_key)"
+        )
+
+def _add_availability_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS employee_availability (
+            employee_id INTEGER NOT NULL REFERENCES employees(id),
+            weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+            start_min INTEGER NOT NULL,
+            end_min INTEGER NOT NULL CHECK (end_min > start_min AND end_min <= 1440),
+            PRIMARY KEY (employee_id, weekday, start_min)
+        ) WITHOUT ROWID"""
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_employee_availability_version_{event.lower()}
+                AFTER {event} ON employee_availability
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = 'employees';
+                END"""
+        )
+    # Backfill from the JSON blobs; malformed blocks are dropped.
+    rows = conn.execute("SELECT id, availability FROM employees").fetchall()
+    for employee_id, raw in rows:
+        try:
+            availability = json.loads(raw or "{}")
+        except ValueError:
+            availability = {}
+        if not isinstance(availability, dict):
+            continue
+        for weekday, name in enumerate(WEEKDAYS):
+            for block in availability.get(name) or []:
+                interval = parse_block(block)
+                if interval:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO employee_availability VALUES (?, ?, ?, ?)",
+                        (employee_id, weekday, *interval),
+                    )
+
+def _interval_triggers(conn: sqlite3.Connection) -> None:
+    """Keep the R*Tree in step with the integer epoch columns."""
+    sync = """
+            INSERT OR REPLACE INTO appointment_intervals VALUES (
+                NEW.id, NEW.employee_id, NEW.employee_id, NEW.start_epoch, NEW.end_epoch
+            );"""
+    conn.execute(
+        f"""CREATE TRIGGER trg_appointments_interval_insert
+            AFTER INSERT ON appointments
+            BEGIN {sync}
+            END"""
+    )
+    conn.execute(
+        f"""CREATE TRIGGER trg_appointments_interval_update
+            AFTER UPDATE OF start_epoch, end_epoch, employee_id ON appointments
+            BEGIN {sync}
+            END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER trg_appointments_interval_delete
+           AFTER DELETE ON appointments
+           BEGIN
+               DELETE FROM appointment_intervals WHERE id = OLD.id;
+           END"""
+    )
+
+def _change_feed(conn: sqlite3.Connection) -> None:
+    """
+    Append-only log of every write to ``appointments``. Updates and deletes
+    keep the row as it was before (NULL for inserts), so a reader can tell
+    where the old row stood in any sort order. AUTOINCREMENT keeps ``seq``
+    growing even after old entries are pruned.
+    """
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS appointment_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            appointment_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            old_client_id INTEGER,
+            old_employee_id INTEGER,
+            old_start_epoch INTEGER,
+            old_end_epoch INTEGER,
+            old_status TEXT
+        )"""
+    )
+    before = "OLD.client_id, OLD.employee_id, OLD.start_epoch, OLD.end_epoch, OLD.status"
+    for event, values in (
+        ("INSERT", "NEW.id, 'insert', NULL, NULL, NULL, NULL, NULL"),
+        ("UPDATE", f"NEW.id, 'update', {before}"),
+        ("DELETE", f"OLD.id, 'delete', {before}"),
+    ):
+        conn.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_appointments_change_{event.lower()}
+                AFTER {event} ON appointments
+                BEGIN
+                    INSERT INTO appointment_changes (
+                        appointment_id, op, old_client_id, old_employee_id,
+                        old_start_epoch, old_end_epoch, old_status
+                    ) VALUES ({values});
+                END"""
+        )
+
+def _rebuild(conn: sqlite3.Connection, table: str, create: str, copy: str) -> None:
+    """Replace ``table`` by a new definition, keeping its AUTOINCREMENT counter."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    conn.execute(create.format(table=f"{table}_new"))
+    conn.execute(copy.format(table=f"{table}_new"))
+    conn.execute(f"DROP TABLE {table}")  # also drops its indexes and triggers
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if row and conn.execute(
+        "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (row[0], table)
+    ).rowcount == 0:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, row[0]))
+
+def _epoch_timestamps(conn: sqlite3.Connection) -> None:
+    # Conversion runs in Python so the configured timezone applies.
+    conn.create_function("wall_epoch", 1, lambda text: parse_wall_time(text) if text else None,
+                         deterministic=True)
+    conn.create_function("wall_seconds_epoch", 1,
+                         lambda s: to_epoch(from_wall_seconds(s)) if s is not None else None,
+                         deterministic=True)
+
+    _rebuild(conn, "appointments",
+        """CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            start_epoch INTEGER NOT NULL,
+            end_epoch INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            FOREIGN KEY(client_id) REFERENCES clients(id),
+            FOREIGN KEY(employee_id) REFERENCES employees(id)
+        )""",
+        """INSERT INTO {table} (id, client_id, employee_id, start_epoch, end_epoch, status)
+           SELECT id, client_id, employee_id, wall_epoch(start_time), wall_epoch(end_time), status
+           FROM appointments""",
+    )
+    for statement in (
+        """CREATE INDEX idx_appointments_employee_status_time
+           ON appointments (employee_id, status, start_epoch, end_epoch)""",
+        "CREATE INDEX idx_appointments_client_status ON appointments (client_id, status)",
+        "CREATE INDEX idx_appointments_start ON appointments (start_epoch)",
+        "CREATE INDEX idx_appointments_employee_start ON appointments (employee_id, start_epoch)",
+        "CREATE INDEX idx_appointments_client_start ON appointments (client_id, start_epoch)",
+        "DELETE FROM appointment_intervals",
+        """INSERT INTO appointment_intervals
+           SELECT id, employee_id, employee_id, start_epoch, end_epoch FROM appointments""",
+    ):
+        conn.execute(statement)
+    _interval_triggers(conn)
+
+    _rebuild(conn, "appointment_series",
+        """CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            first_start_epoch INTEGER NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            freq TEXT NOT NULL,
+            interval INTEGER NOT NULL DEFAULT 1,
+            count INTEGER,
+            until_epoch INTEGER,
+            status TEXT NOT NULL,
+            span_start INTEGER NOT NULL,
+            span_end INTEGER NOT NULL,
+            FOREIGN KEY(client_id) REFERENCES clients(id),
+            FOREIGN KEY(employee_id) REFERENCES employees(id)
+        )""",
+        """INSERT INTO {table}
+           SELECT id, client_id, employee_id, wall_epoch(first_start), duration_minutes, freq,
+                  interval, count, wall_epoch(until), status,
+                  wall_seconds_epoch(span_start), wall_seconds_epoch(span_end)
+           FROM appointment_series""",
+    )
+    conn.execute(
+        """CREATE INDEX idx_series_employee_status_span
+           ON appointment_series (employee_id, status, span_start, span_end)"""
+    )
+    _rebuild(conn, "series_exceptions",
+        """CREATE TABLE {table} (
+            series_id INTEGER NOT NULL,
+            original_start_epoch INTEGER NOT NULL,
+            new_start_epoch INTEGER,
+            new_end_epoch INTEGER,
+            PRIMARY KEY (series_id, original_start_epoch),
+            FOREIGN KEY(series_id) REFERENCES appointment_series(id)
+        ) WITHOUT ROWID""",
+        """INSERT INTO {table}
+           SELECT series_id, wall_epoch(original_start), wall_epoch(new_start), wall_epoch(new_end)
+           FROM series_exceptions""",
+    )
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base tables", _sql(
+        """CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT,
+            phone TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT NOT NULL,
+            role TEXT NOT NULL,
+            availability TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            status TEXT NOT NULL,
+            FOREIGN KEY(client_id) REFERENCES clients(id),
+            FOREIGN KEY(employee_id) REFERENCES employees(id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL
+        )""",
+    )),
+    Migration(2, "users.role column", _add_users_role),
+    Migration(3, "appointment lookup indexes", _sql(
+        """CREATE INDEX IF NOT EXISTS idx_appointments_employee_status_time
+           ON appointments (employee_id, status, start_time, end_time)""",
+        """CREATE INDEX IF NOT EXISTS idx_appointments_client_status
+           ON appointments (client_id, status)""",
+    )),
+    Migration(4, "epoch bounds and R*Tree interval index", _add_interval_index),
+    # Ordered indexes for keyset pagination on (start_time, id); the rowid is
+    # implicitly the last index column.
+    Migration(5, "appointment pagination indexes", _sql(
+        """CREATE INDEX IF NOT EXISTS idx_appointments_start
+           ON appointments (start_time)""",
+        """CREATE INDEX IF NOT EXISTS idx_appointments_employee_start
+           ON appointments (employee_id, start_time)""",
+        """CREATE INDEX IF NOT EXISTS idx_appointments_client_start
+           ON appointments (client_id, start_time)""",
+    )),
+    # Bumped by triggers so caches can tell whether a table really changed
+    # after PRAGMA data_version reports a commit.
+    Migration(6, "table version counters", _sql(
+        """CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('employees', 0)",
+        *(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_employees_version_{event.lower()}
+                AFTER {event} ON employees
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = 'employees';
+                END"""
+            for event in ("INSERT", "UPDATE", "DELETE")
+        ),
+    )),
+    Migration(7, "normalized name_key columns", _add_name_keys),
+    Migration(8, "normalized employee_availability table", _add_availability_table),
+    # A recurring series is one row; occurrences are expanded on read. The
+    # span columns bound every occurrence (moved ones included) so series
+    # overlapping a window can be found through the index.
+    Migration(9, "recurring appointment series", _sql(
+        """CREATE TABLE IF NOT EXISTS appointment_series (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            first_start TEXT NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            freq TEXT NOT NULL,
+            interval INTEGER NOT NULL DEFAULT 1,
+            count INTEGER,
+            until TEXT,
+            status TEXT NOT NULL,
+            span_start INTEGER NOT NULL,
+            span_end INTEGER NOT NULL,
+            FOREIGN KEY(client_id) REFERENCES clients(id),
+            FOREIGN KEY(employee_id) REFERENCES employees(id)
+        )""",
+        """CREATE INDEX IF NOT EXISTS idx_series_employee_status_span
+           ON appointment_series (employee_id, status, span_start, span_end)""",
+        # new_start/new_end NULL means the occurrence is cancelled.
+        """CREATE TABLE IF NOT EXISTS series_exceptions (
+            series_id INTEGER NOT NULL,
+            original_start TEXT NOT NULL,
+            new_start TEXT,
+            new_end TEXT,
+            PRIMARY KEY (series_id, original_start),
+            FOREIGN KEY(series_id) REFERENCES appointment_series(id)
+        ) WITHOUT ROWID""",
+    )),
+    # Integer epoch seconds become the only stored form of every timestamp
+    # (converted from the old TEXT columns in the configured timezone).
+    Migration(10, "integer epoch timestamps", _epoch_timestamps),
+    # 'clients' moves on every write; 'client_rewrites' only when existing
+    # rows change, so a name index can pick up inserts by id alone.
+    Migration(11, "client version counters", _sql(
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('clients', 0)",
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('client_rewrites', 0)",
+        *(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_clients_version_{event.lower()}
+                AFTER {event} ON clients
+                BEGIN
+                    UPDATE table_versions SET version = version + 1
+                    WHERE name IN ({names});
+                END"""
+            for event, names in (
+                ("INSERT", "'clients'"),
+                ("UPDATE", "'clients', 'client_rewrites'"),
+                ("DELETE", "'clients', 'client_rewrites'"),
+            )
+        ),
+    )),
+    # Ordered indexes for the remaining sort orders of the appointment list.
+    Migration(12, "appointment list sort indexes", _sql(
+        """CREATE INDEX IF NOT EXISTS idx_appointments_end
+           ON appointments (end_epoch)""",
+        """CREATE INDEX IF NOT EXISTS idx_appointments_status_start
+           ON appointments (status, start_epoch)""",
+    )),
+    Migration(13, "appointment change feed", _change_feed),
+]
+
+# ---------------------------------------------------------------------------
+# Hot queries (checked by the dry-run)
+# ---------------------------------------------------------------------------
+HOT_QUERIES: Dict[str, Tuple[str, Sequence]] = {}
+
+def register_hot_query(name: str, sql: str, sample_params: Sequence = ()) -> str:
+    """
+    Register a performance-critical query so the dry-run can show its plan.
+    Returns ``sql`` unchanged, so it can be used inline as a constant.
+    """
+    HOT_QUERIES[name] = (sql, tuple(sample_params))
+    return sql
+
+def explain(conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[str]:
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines for a statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params))]
+
+def _is_full_scan(line: str) -> bool:
+    if not line.startswith("SCAN ") or "USING" in line or "CONSTANT ROW" in line:
+        return False
+    if "VIRTUAL TABLE INDEX" in line:
+        # R*Tree: index 1 is a rowid lookup, otherwise the text after the
+        # colon lists the constraints passed to the tree.
+        index, _, constraints = line.partition("VIRTUAL TABLE INDEX ")[2].partition(":")
+        return index.strip() != "1" and not constraints.strip()
+    return True
+
+def uses_full_scan(plan: List[str]) -> bool:
+    """True if any step of the plan scans a table without an index."""
+    return any(_is_full_scan(line) for line in plan)
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Migration]:
+    version = current_version(conn)
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version > version]
+
+def migrate(conn: sqlite3.Connection = None) -> List[Migration]:
+    """
+    Apply all pending migrations in order, each in its own transaction.
+    Returns the migrations that were applied.
+    """
+    conn = conn or get_connection()
+    applied = []
+    for migration in pending_migrations(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock.
+            if current_version(conn) >= migration.version:
+                conn.execute("ROLLBACK")
+                continue
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        applied.append(migration)
+    return applied
+
+def dry_run(conn: sqlite3.Connection = None, out=sys.stdout) -> bool:
+    """
+    Apply pending migrations inside a transaction that is always rolled
+    back, and print the query plan of every hot query against the
+    resulting schema. Returns True if no hot query needs a full scan.
+    """
+    conn = conn or get_connection()
+    print(f"Schema version: {current_version(conn)}", file=out)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        pending = pending_migrations(conn)
+        for migration in pending:
+            print(f"  would apply {migration.version}: {migration.description}", file=out)
+            migration.apply(conn)
+        if not pending:
+            print("  no pending migrations", file=out)
+
+        all_indexed = True
+        for name, (sql, params) in sorted(HOT_QUERIES.items()):
+            plan = explain(conn, sql, params)
+            full_scan = uses_full_scan(plan)
+            all_indexed = all_indexed and not full_scan
+            print(f"\n[{'FULL SCAN' if full_scan else 'ok'}] {name}", file=out)
+            for line in plan:
+                print(f"    {line}", file=out)
+    finally:
+        conn.execute("ROLLBACK")
+    return all_indexed
+
+def main(argv: Sequence[str]) -> int:
+    # Importing the data layer registers its hot queries.
+    from smartscheduler.data import audit, database  # noqa: F401
+
+    if "--dry-run" in argv:
+        return 0 if dry_run() else 1
+    for m in migrate():
+        print(f"Applied migration {m.version}: {m.description}")
+    print(f"Schema version: {current_version(get_connection())}")
+    return 0
+
+if __name__ == "__main__":
+    # Run against the importable module so hot queries registered by the
+    # data layer land in the same registry.
+    from smartscheduler.data import migrations
+
+    sys.exit(migrations.main(sys.argv[1:]))
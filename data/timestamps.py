@@ -0,0 +1,77 @@
+"""
+Conversion layer between the integer epoch seconds stored in the database
+and the naive wall-clock datetimes used by the rest of the application.
+
+Wall-clock times are read in ``ConnectionConfig.timezone`` (an IANA name
+such as ``"Europe/Madrid"``, ``"UTC"`` by default); UTC takes a pure
+arithmetic fast path. Only this module knows about the zone: queries
+compare integers and callers see plain datetimes.
+
+"Wall seconds" are wall-clock times counted as if they were UTC. They keep
+calendar arithmetic (midnights, minutes of the day) trivial and are what
+the free-slot sweep in ``services/scheduler.py`` works in.
+"""
+
+import calendar
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from smartscheduler.data.connection import get_config
+
+_EPOCH = datetime(1970, 1, 1)
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> Optional[tzinfo]:
+    """The configured zone, or None for UTC (the fast path)."""
+    return None if name.upper() in ("UTC", "ETC/UTC") else ZoneInfo(name)
+
+def local_zone() -> tzinfo:
+    """The configured zone as a tzinfo object."""
+    return _zone(get_config().timezone) or timezone.utc
+
+def to_epoch(value: datetime) -> int:
+    """Naive wall-clock datetime (or aware datetime) -> epoch seconds."""
+    if value.tzinfo is not None:
+        return int(value.timestamp())
+    zone = _zone(get_config().timezone)
+    if zone is None:
+        return calendar.timegm(value.timetuple())
+    return int(value.replace(tzinfo=zone).timestamp())
+
+def from_epoch(seconds: int) -> datetime:
+    """Epoch seconds -> naive wall-clock datetime in the configured zone."""
+    zone = _zone(get_config().timezone)
+    if zone is None:
+        return _EPOCH + timedelta(0, seconds)
+    return datetime.fromtimestamp(seconds, zone).replace(tzinfo=None)
+
+def localize(value: datetime) -> datetime:
+    """Attach the configured zone to a naive wall-clock datetime."""
+    return value.replace(tzinfo=local_zone()) if value.tzinfo is None else value
+
+def to_local(value: datetime) -> datetime:
+    """Aware datetime -> naive wall-clock datetime in the configured zone (naive ones pass through)."""
+    return value if value.tzinfo is None else value.astimezone(local_zone()).replace(tzinfo=None)
+
+# ---------------------------------------------------------------------------
+# Wall seconds
+# ---------------------------------------------------------------------------
+def wall_seconds(value: datetime) -> int:
+    """Naive wall-clock datetime -> wall seconds (no zone involved)."""
+    return calendar.timegm(value.timetuple())
+
+def from_wall_seconds(seconds: int) -> datetime:
+    return _EPOCH + timedelta(0, seconds)
+
+def epoch_to_wall_seconds(seconds: int) -> int:
+    """Stored epoch seconds -> wall seconds in the configured zone."""
+    zone = _zone(get_config().timezone)
+    if zone is None:
+        return seconds
+    return seconds + int(datetime.fromtimestamp(seconds, zone).utcoffset().total_seconds())
+
+def parse_wall_time(text: str) -> int:
+    """Legacy ``"%Y-%m-%d %H:%M:%S"`` text -> epoch seconds (used by migrations)."""
+    return to_epoch(datetime.fromisoformat(text))
@@ -0,0 +1,101 @@
+"""
+Single-writer queue.
+
+``WriteQueue`` owns one thread, and every write submitted to it runs on that
+thread, so writers never race for SQLite's write lock. The calls waiting
+in the queue are committed together in one ``BEGIN IMMEDIATE`` transaction
+(group commit). Each call runs inside its own savepoint, so a call that
+raises is rolled back alone and the rest of the group still commits.
+
+    writes = WriteQueue()
+    future = writes.submit(cancel_appointment_by_id, 42)
+    future.result()  # 1
+"""
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from smartscheduler.data.connection import close_connection, transaction
+
+DEFAULT_GROUP_SIZE = 64
+
+_STOP = object()
+
+class WriteQueue:
+    def __init__(self, group_size: int = DEFAULT_GROUP_SIZE, name: str = "db-writer"):
+        self.group_size = group_size
+        self.calls = 0
+        self.transactions = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)``; the future holds its result."""
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """Finish the queued writes and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _next_group(self) -> Tuple[List[tuple], bool]:
+        group, item = [], self._queue.get()
+        while item is not _STOP:
+            group.append(item)
+            if len(group) == self.group_size:
+                return group, True
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return group, True
+        return group, False
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            group, running = self._next_group()
+            group = [item for item in group if item[0].set_running_or_notify_cancel()]
+            if not group:
+                continue
+            try:
+                self.transactions += 1
+                with transaction("IMMEDIATE") as conn:
+                    outcomes = [_call_in_savepoint(conn, item) for item in group]
+            except sqlite3.Error:
+                # The group could not commit: run each call on its own.
+                outcomes = []
+                for item in group:
+                    self.transactions += 1
+                    try:
+                        with transaction("IMMEDIATE") as conn:
+                            outcomes.append(_call_in_savepoint(conn, item))
+                    except sqlite3.Error as e:
+                        outcomes.append((False, e))
+            self.calls += len(group)
+            for (future, *_), (ok, value) in zip(group, outcomes):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        close_connection()
+
+def _call_in_savepoint(conn: sqlite3.Connection, item) -> Tuple[bool, object]:
+    _, fn, args, kwargs = item
+    conn.execute("SAVEPOINT write_call")
+    try:
+        value = fn(*args, **kwargs)
+    except Exception as e:
+        conn.execute("ROLLBACK TO write_call")
+        conn.execute("RELEASE write_call")
+        return False, e
+    conn.execute("RELEASE write_call")
+    return True, value
@@ -24,23 +24,30 @@ from smartscheduler.data.database import (
     get_employees,
     is_employee_available,
     add_appointment,
-    get_appointments,
+    count_appointments,
+    count_clients_with_appointments,
     update_appointment_status,
     cancel_appointments_by_client_id,
     get_client_by_name,
+    prune_appointment_changes,
     STATUS_SCHEDULED,
     STATUS_COMPLETED,
     STATUS_CANCELLED,
 )
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.data.timestamps import localize
 from smartscheduler.models.appointment import Appointment
 from smartscheduler.models.person import Client, Employee
 from smartscheduler.core.scheduler_utils import schedule_appointment_with_validation
+from smartscheduler.views.appointment_list import AppointmentList
 from smartscheduler.views.employee_calendar import show_employee_calendar_window
+from smartscheduler.views.team_calendar import show_team_calendar_window
 
 # ---------------------------------------------------------------------------
 # Bootstrap DB and Theme
 # ---------------------------------------------------------------------------
 create_tables()
+prune_appointment_changes()
 
 CURRENT_THEME = "superhero"  # Try others like "cyborg", "morph", "minty"
 root = tb.Window(themename=CURRENT_THEME)
@@ -48,7 +55,7 @@ root.title("SmartScheduler")
 root.geometry("950x700")
 root.minsize(900, 600)
 
-tree = None  # Global treeview reference
+appointment_list = None  # AppointmentList of the View appointments tab
 
 def seed_employees():
     """
@@ -136,58 +143,33 @@ def schedule_appointment(name_entry, employee_opts, employee_combo, date_picker,
     date_picker.entry.insert(0, datetime.now().strftime("%d/%m/%Y"))
     time_combo.set("")
 
-    refresh_tree()
+    appointment_list.poll()
 
 def refresh_tree():
     """
-    Refreshes the appointment treeview with current data.
+    Re-reads the appointment list (only the visible page is read). Single
+    changes reach it through the change feed (``appointment_list.poll()``).
     """
-    tree.delete(*tree.get_children())
-    for ap in get_appointments():
-        ap_id, client_name, employee_name, start, end, status = ap
-        tag = {
-            "Scheduled": "scheduled",
-            "Completed": "completed",
-            "Cancelled": "cancelled"
-        }.get(status, "")
-        tree.insert(
-            "",
-            "end",
-            iid=ap_id,
-            values=(client_name, employee_name, start, end, status),
-            tags=(tag,)
-        )
-
-    tree.tag_configure("scheduled", background="#0099ff", foreground="#fff")
-    tree.tag_configure("completed", background="#43d97b", foreground="#fff")
-    tree.tag_configure("cancelled", background="#e04f5f", foreground="#fff")
+    appointment_list.refresh()
 
 def export_appoint_selected():
     """
     Exports selected appointments to an .ics calendar file.
     """
-    seleccionadas = tree.selection()
+    seleccionadas = appointment_list.selected_rows()
     if not seleccionadas:
         messagebox.showwarning("No selection", "Select at least an appointment to export.")
         return
 
     calendar = Calendar()
-    for item_id in seleccionadas:
-        cita = tree.item(item_id, "values")
-        cliente = cita[0]
-        empleado = cita[1]
-        inicio_str = cita[2]  # Format: 'YYYY-MM-DD HH:MM:SS'
-        fin_str = cita[3]
-        estado = cita[4]
+    for cita in seleccionadas:
+        _, cliente, empleado, inicio, fin, estado = cita
 
         if estado.lower() == "cancelled":
             continue
 
-        try:
-            inicio = datetime.strptime(inicio_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-            fin = datetime.strptime(fin_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-        except Exception:
-            continue
+        # Wall-clock times in the configured timezone
+        inicio, fin = localize(inicio), localize(fin)
 
         event = Event()
         event.name = f"Cita: {cliente} con {empleado}"
@@ -217,13 +199,13 @@ def mark_selected(new_status: str):
     """
     Marks the selected appointment with a new status.
     """
-    selected_iid = tree.focus()
-    if not selected_iid:
+    selected_id = appointment_list.focused_id()
+    if selected_id is None:
         messagebox.showerror("Error", "Please select an appointment.")
         return
 
-    update_appointment_status(int(selected_iid), new_status)
-    refresh_tree()
+    update_appointment_status(selected_id, new_status)
+    appointment_list.poll()
     messagebox.showinfo("Success", f"Appointment marked as {new_status}.")
 
 def cancel_by_client(name_entry):
@@ -247,7 +229,7 @@ def cancel_by_client(name_entry):
         f"{affected} appointment(s) cancelled."
     )
     messagebox.showinfo("Cancelled", msg)
-    refresh_tree()
+    appointment_list.poll()
     name_entry.delete(0, "end")
 
 # ---------------------------------------------------------------------------
@@ -300,11 +282,11 @@ def launch_dashboard():
     cards_frame.pack(fill="x", padx=30, pady=18)
 
     # Data for summary cards
-    employees = get_employees()
-    clients_count = len(set(ap[1] for ap in get_appointments()))
-    appointments_today = sum(
-        1 for ap in get_appointments()
-        if datetime.strptime(ap[3], "%Y-%m-%d %H:%M:%S").date() == datetime.now().date()
+    employees = employee_directory.employees()
+    clients_count = count_clients_with_appointments()
+    today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+    appointments_today = count_appointments(
+        start_time=today_start, end_time=today_start + timedelta(days=1)
     )
     available_employees = len(employees)
 
@@ -364,19 +346,9 @@ def launch_dashboard():
     tab_view = tb.Frame(notebook)
     notebook.add(tab_view, text="👁 View appointments")
 
-    global tree
-    tree = ttk.Treeview(
-        tab_view,
-        columns=("Client", "Employee", "Start", "End", "Status"),
-        show="headings"
-    )
-    for col, w in zip(
-        ("Client", "Employee", "Start", "End", "Status"),
-        (140, 140, 140, 140, 100)
-    ):
-        tree.heading(col, text=col)
-        tree.column(col, width=w)
-    tree.pack(fill="both", expand=True, padx=10, pady=10)
+    global appointment_list
+    appointment_list = AppointmentList(tab_view)
+    appointment_list.pack(fill="both", expand=True)
 
     btn_frame = tb.Frame(tab_view)
     btn_frame.pack(pady=10)
@@ -419,6 +391,13 @@ def launch_dashboard():
         width=24,
         command=lambda: show_employee_calendar_window(root)
     ).pack(side="left", padx=8)
+    tb.Button(
+        nav_frame,
+        text="Team calendar",
+        bootstyle="info-outline",
+        width=24,
+        command=lambda: show_team_calendar_window(root)
+    ).pack(side="left", padx=8)
 
 def show_welcome():
     """
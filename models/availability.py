@@ -0,0 +1,95 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_DAY = 24 * 60
+
+Interval = Tuple[int, int]  # [start, end) in minutes since midnight
+
+def parse_minutes(value: str) -> int:
+    """'HH:MM' -> minutes since midnight ('24:00' is allowed as end of day)."""
+    hours, minutes = value.strip().split(":")
+    total = int(hours) * 60 + int(minutes)
+    if not 0 <= total <= MINUTES_PER_DAY or not 0 <= int(minutes) < 60:
+        raise ValueError(f"invalid time of day: {value!r}")
+    return total
+
+def parse_block(block: str) -> Optional[Interval]:
+    """'09:00-12:00' -> (540, 720), or None if the block is malformed."""
+    try:
+        start, end = block.split("-")
+        interval = parse_minutes(start), parse_minutes(end)
+    except (ValueError, AttributeError):
+        return None
+    return interval if interval[0] < interval[1] else None
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def _merge(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class CompiledAvailability:
+    """
+    Working hours compiled to sorted, merged minute intervals per weekday
+    (0 = Monday), so containment checks are a binary search instead of
+    re-parsing ``"HH:MM-HH:MM"`` strings.
+    """
+    __slots__ = ("_days", "_starts")
+
+    def __init__(self, days: Dict[int, Iterable[Interval]]):
+        self._days: Dict[int, List[Interval]] = {
+            weekday: _merge(intervals) for weekday, intervals in days.items()
+        }
+        self._starts = {weekday: [s for s, _ in iv] for weekday, iv in self._days.items()}
+
+    @classmethod
+    def from_dict(cls, availability: Dict[str, List[str]]) -> "CompiledAvailability":
+        """Compile the ``{"Monday": ["09:00-13:00", ...]}`` form; bad blocks are skipped."""
+        days: Dict[int, List[Interval]] = {}
+        for weekday, name in enumerate(WEEKDAYS):
+            blocks = (availability or {}).get(name) or []
+            parsed = [iv for iv in (parse_block(b) for b in blocks) if iv]
+            if parsed:
+                days[weekday] = parsed
+        return cls(days)
+
+    def intervals(self, weekday: int) -> List[Interval]:
+        return self._days.get(weekday, [])
+
+    def block(self, weekday: int, minute: int) -> Optional[Interval]:
+        """The working interval of the day containing ``minute``, if any."""
+        starts = self._starts.get(weekday)
+        if not starts:
+            return None
+        i = bisect_right(starts, minute) - 1
+        if i < 0:
+            return None
+        interval = self._days[weekday][i]
+        return interval if minute < interval[1] else None
+
+    def contains_minutes(self, weekday: int, start: int, end: int) -> bool:
+        """True if ``[start, end)`` lies inside one working interval of the day."""
+        starts = self._starts.get(weekday)
+        if not starts:
+            return False
+        i = bisect_right(starts, start) - 1
+        return i >= 0 and end <= self._days[weekday][i][1]
+
+    def contains(self, start_time: datetime, end_time: datetime) -> bool:
+        """True if the appointment falls entirely within working hours."""
+        start = start_time.hour * 60 + start_time.minute
+        if end_time.date() == start_time.date():
+            end = end_time.hour * 60 + end_time.minute + (end_time.second > 0)
+        elif end_time == datetime.combine(start_time.date() + timedelta(days=1), datetime.min.time()):
+            end = MINUTES_PER_DAY
+        else:
+            return False
+        return start < end and self.contains_minutes(start_time.weekday(), start, end)
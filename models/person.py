@@ -1,6 +1,20 @@
+import unicodedata
 from dataclasses import dataclass, field
 from typing import Dict, List
 
+def normalize_name(text: str) -> str:
+    """
+    Remove accents, casefold and collapse whitespace for name comparison.
+    This is also the form stored in the ``name_key`` columns.
+    """
+    if not text:
+        return ""
+    stripped = ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+    return ' '.join(stripped.casefold().split())
+
 @dataclass
 class Person:
     name: str
@@ -0,0 +1,182 @@
+"""
+Recurring appointment series.
+
+A series is stored as one row with a subset of the iCalendar RRULE: weekly
+or monthly, with an interval (``INTERVAL=2`` is biweekly) and bounded by
+``COUNT`` or ``UNTIL``. Occurrences are never stored. ``iter_occurrences``
+expands them lazily and applies per-occurrence exceptions: a cancelled
+occurrence is dropped, and a moved one is yielded at its new time.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+FREQ_WEEKLY = "WEEKLY"
+FREQ_MONTHLY = "MONTHLY"
+FREQUENCIES = (FREQ_WEEKLY, FREQ_MONTHLY)
+
+@dataclass(frozen=True)
+class Occurrence:
+    series_id: Optional[int]
+    original_start: datetime
+    start: datetime
+    end: datetime
+    moved: bool = False
+
+@dataclass
+class AppointmentSeries:
+    client_id: Optional[int]
+    employee_id: Optional[int]
+    first_start: datetime
+    duration: timedelta
+    freq: str = FREQ_WEEKLY
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    status: str = "Scheduled"
+    # original start -> None (cancelled) or (new start, new end)
+    exceptions: Dict[datetime, Optional[Tuple[datetime, datetime]]] = field(default_factory=dict)
+    id: Optional[int] = None
+
+    @classmethod
+    def from_rrule(cls, rule: str, **fields) -> "AppointmentSeries":
+        """Build a series from an RRULE string such as ``FREQ=WEEKLY;INTERVAL=2;COUNT=10``."""
+        return cls(**fields, **parse_rrule(rule))
+
+    @property
+    def rrule(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        return ";".join(parts)
+
+    def validate(self) -> None:
+        """Raise ValueError if the series is not a bounded, non-overlapping rule."""
+        if self.freq not in FREQUENCIES:
+            raise ValueError(f"unsupported frequency '{self.freq}'")
+        if self.interval < 1:
+            raise ValueError("interval must be at least 1")
+        if self.count is None and self.until is None:
+            raise ValueError("a series needs COUNT or UNTIL")
+        if self.count is not None and self.count < 1:
+            raise ValueError("count must be at least 1")
+        if self.duration <= timedelta(0):
+            raise ValueError("duration must be positive")
+        shortest_gap = timedelta(weeks=self.interval) if self.freq == FREQ_WEEKLY else timedelta(days=28)
+        if self.duration > shortest_gap:
+            raise ValueError("occurrences of the series would overlap each other")
+
+    def span(self) -> Tuple[datetime, datetime]:
+        """First start and last end over all occurrences, moved ones included."""
+        start, end = self.first_start, self.first_start + self.duration
+        for original in iter_original_starts(self):
+            end = original + self.duration
+        for moved in self.exceptions.values():
+            if moved is not None:
+                start, end = min(start, moved[0]), max(end, moved[1])
+        return start, end
+
+# ---------------------------------------------------------------------------
+# Rule parsing
+# ---------------------------------------------------------------------------
+def parse_rrule(rule: str) -> dict:
+    """Parse the supported RRULE subset into ``AppointmentSeries`` fields."""
+    fields = {}
+    for part in rule.strip().removeprefix("RRULE:").split(";"):
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        key, value = key.strip().upper(), value.strip()
+        if key == "FREQ":
+            fields["freq"] = value.upper()
+        elif key == "INTERVAL":
+            fields["interval"] = int(value)
+        elif key == "COUNT":
+            fields["count"] = int(value)
+        elif key == "UNTIL":
+            fields["until"] = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+        else:
+            raise ValueError(f"unsupported RRULE part '{key}'")
+    return fields
+
+# ---------------------------------------------------------------------------
+# Expansion
+# ---------------------------------------------------------------------------
+def _add_months(start: datetime, months: int) -> Optional[datetime]:
+    """``start`` moved by whole months, or None if that day does not exist."""
+    year, month = divmod(start.month - 1 + months, 12)
+    try:
+        return start.replace(year=start.year + year, month=month + 1)
+    except ValueError:
+        return None
+
+def iter_original_starts(series: AppointmentSeries,
+                         not_before: Optional[datetime] = None) -> Iterator[datetime]:
+    """
+    Yield the rule's occurrence starts in order, ignoring exceptions.
+    ``not_before`` lets weekly (and UNTIL-bounded monthly) rules jump
+    straight to the first relevant occurrence instead of walking from the
+    start; a few earlier starts may still be yielded.
+    """
+    first, until, count = series.first_start, series.until, series.count
+    if series.freq == FREQ_WEEKLY:
+        period = timedelta(weeks=series.interval)
+        k = max(0, (not_before - first) // period) if not_before is not None else 0
+        while count is None or k < count:
+            start = first + k * period
+            if until is not None and start > until:
+                return
+            yield start
+            k += 1
+        return
+
+    # Monthly: months lacking the day (e.g. the 31st) are skipped, as in
+    # RRULE, and do not count towards COUNT.
+    k, produced = 0, 0
+    if not_before is not None and count is None:
+        k = max(0, (not_before.year - first.year) * 12 + not_before.month - first.month - 1)
+    k -= k % series.interval
+    while count is None or produced < count:
+        start = _add_months(first, k)
+        k += series.interval
+        if start is None:
+            continue
+        if until is not None and start > until:
+            return
+        produced += 1
+        yield start
+
+def iter_occurrences(series: AppointmentSeries, window_start: Optional[datetime] = None,
+                     window_end: Optional[datetime] = None) -> Iterator[Occurrence]:
+    """
+    Lazily yield the occurrences overlapping ``[window_start, window_end)``
+    (unbounded sides default to the whole series), ordered by start, with
+    exceptions applied.
+    """
+    duration, exceptions = series.duration, series.exceptions
+
+    def regular() -> Iterator[Occurrence]:
+        not_before = window_start - duration if window_start is not None else None
+        for original in iter_original_starts(series, not_before):
+            if window_end is not None and original >= window_end:
+                return
+            end = original + duration
+            if original in exceptions or (window_start is not None and end <= window_start):
+                continue
+            yield Occurrence(series.id, original, original, end)
+
+    moved = sorted(
+        (Occurrence(series.id, original, new[0], new[1], moved=True)
+         for original, new in exceptions.items()
+         if new is not None
+         and (window_end is None or new[0] < window_end)
+         and (window_start is None or new[1] > window_start)),
+        key=lambda o: o.start,
+    )
+    return heapq.merge(regular(), moved, key=lambda o: o.start)
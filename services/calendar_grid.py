@@ -0,0 +1,164 @@
+"""
+Occupancy grids for the calendar views.
+
+A calendar day runs from HOUR_START to HOUR_END in slots of ``slot``
+minutes. Every slot of an employee is BUSY (a scheduled appointment or
+series occurrence overlaps it), FREE (wholly inside the working hours) or
+UNAVAILABLE. ``team_grid`` works this out for many employees at once: one
+grouped query reads everyone's busy intervals (``get_team_busy_intervals``)
+and each employee's row becomes two integers used as bit vectors, one bit
+per slot, so rows and columns are combined with bitwise operations instead
+of slot-by-slot loops. Times are wall seconds (see ``data/timestamps.py``),
+so slots follow the clock across DST changes.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Dict, List, Sequence, Tuple
+
+from smartscheduler.data.database import get_team_busy_intervals
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.data.timestamps import (
+    epoch_to_wall_seconds,
+    from_wall_seconds,
+    to_epoch,
+    wall_seconds,
+)
+from smartscheduler.models.availability import CompiledAvailability
+
+HOUR_START = 8
+HOUR_END = 21  # the last slot ends at 21:00
+DAY = 24 * 3600
+
+FREE, BUSY, UNAVAILABLE = "free", "busy", "unavailable"
+
+def slot_minutes(slot: int) -> List[int]:
+    """Start of every slot of a day, in minutes since midnight."""
+    return list(range(HOUR_START * 60, HOUR_END * 60, slot))
+
+def _bits(first: int, last: int) -> int:
+    """An integer with bits ``first`` to ``last - 1`` set."""
+    return ((1 << (last - first)) - 1) << first if first < last else 0
+
+def busy_mask(intervals: Sequence[Tuple[int, int]], first_day: int, days: int, slot: int) -> int:
+    """
+    Bit ``day * per_day + i`` set where one of the ``(start, end)``
+    wall-second intervals overlaps slot ``i`` of that day, for ``days``
+    days from the midnight ``first_day`` (wall seconds).
+    """
+    per_day = len(slot_minutes(slot))
+    seconds = slot * 60
+    mask = 0
+    for start, end in intervals:
+        day = (start - first_day) // DAY
+        midnight = first_day + day * DAY
+        if 0 <= day < days and end <= midnight + DAY:
+            # Within one day (the usual case): no loop over days.
+            opens = midnight + HOUR_START * 3600
+            first = max(0, (start - opens) // seconds)
+            last = min(per_day, -((opens - end) // seconds))
+            if first < last:
+                mask |= ((1 << (last - first)) - 1) << (day * per_day + first)
+            continue
+        for day in range(max(0, day), min(days, -(-(end - first_day) // DAY))):
+            opens = first_day + day * DAY + HOUR_START * 3600
+            first = max(0, (start - opens) // seconds)
+            last = min(per_day, -(-(end - opens) // seconds))
+            mask |= _bits(first, last) << (day * per_day)
+    return mask
+
+def available_mask(compiled: CompiledAvailability, weekday: int, slot: int) -> int:
+    """Bit ``i`` set if slot ``i`` of ``weekday`` is wholly inside one working interval."""
+    per_day = len(slot_minutes(slot))
+    opens = HOUR_START * 60
+    mask = 0
+    for start, end in compiled.intervals(weekday):
+        mask |= _bits(max(0, -(-(start - opens) // slot)), min(per_day, (end - opens) // slot))
+    return mask
+
+# ---------------------------------------------------------------------------
+# Grids
+# ---------------------------------------------------------------------------
+@dataclass
+class TeamGrid:
+    """
+    Slot states of several employees over the same days. Slots are
+    numbered day by day (``day * per_day + i``); ``busy`` and ``available``
+    hold one bit per slot for each employee.
+    """
+    first_day: date
+    days: int
+    slot: int
+    busy: Dict[int, int]
+    available: Dict[int, int]
+
+    @property
+    def per_day(self) -> int:
+        return len(slot_minutes(self.slot))
+
+    @property
+    def buckets(self) -> int:
+        return self.days * self.per_day
+
+    def free_employees(self, first: int, last: int) -> List[int]:
+        """The employees free in every slot of ``[first, last)``."""
+        wanted = _bits(first, last)
+        return [
+            employee_id for employee_id, available in self.available.items()
+            if available & ~self.busy[employee_id] & wanted == wanted
+        ]
+
+    def runs(self, employee_id: int) -> List[Tuple[int, int, str]]:
+        """The employee's slots as ``(first, last, state)`` runs of one state."""
+        busy = self.busy[employee_id]
+        free = self.available[employee_id] & ~busy
+        # A run starts at slot 0 and wherever either mask changes.
+        edges = ((busy ^ (busy << 1)) | (free ^ (free << 1)) | 1) & _bits(0, self.buckets)
+        runs = []
+        while edges:
+            first = (edges & -edges).bit_length() - 1
+            edges &= edges - 1
+            last = (edges & -edges).bit_length() - 1 if edges else self.buckets
+            state = BUSY if busy >> first & 1 else FREE if free >> first & 1 else UNAVAILABLE
+            runs.append((first, last, state))
+        return runs
+
+    def states(self, employee_id: int) -> List[List[str]]:
+        """``[day][slot]`` FREE, BUSY or UNAVAILABLE."""
+        row = [UNAVAILABLE] * self.buckets
+        for first, last, state in self.runs(employee_id):
+            row[first:last] = [state] * (last - first)
+        per_day = self.per_day
+        return [row[day * per_day:(day + 1) * per_day] for day in range(self.days)]
+
+def team_grid(employee_ids: Sequence[int], first_day: date, days: int, slot: int) -> TeamGrid:
+    """Slot states of the employees for ``days`` days from ``first_day``."""
+    start = wall_seconds(datetime.combine(first_day, time()))
+    window_start, window_end = from_wall_seconds(start), from_wall_seconds(start + days * DAY)
+    intervals = get_team_busy_intervals(employee_ids, window_start, window_end)
+    # Without a DST change in the window, epochs are wall seconds plus a constant.
+    first_epoch, last_epoch = to_epoch(window_start), to_epoch(window_end)
+    offset = epoch_to_wall_seconds(first_epoch) - first_epoch
+    constant = epoch_to_wall_seconds(last_epoch) - last_epoch == offset
+    per_day = len(slot_minutes(slot))
+    weekday = first_day.weekday()
+    busy, available = {}, {}
+    weeks: Dict[int, List[int]] = {}  # id(availability) -> mask per weekday; often shared
+    for employee_id in employee_ids:
+        wall = (
+            [(s + offset, e + offset) for s, e in intervals[employee_id]] if constant else
+            [(epoch_to_wall_seconds(s), epoch_to_wall_seconds(e)) for s, e in intervals[employee_id]]
+        )
+        busy[employee_id] = busy_mask(wall, start, days, slot)
+        compiled = employee_directory.availability(employee_id) or CompiledAvailability({})
+        week = weeks.get(id(compiled))
+        if week is None:
+            week = weeks[id(compiled)] = [available_mask(compiled, day, slot) for day in range(7)]
+        available[employee_id] = sum(
+            week[(weekday + day) % 7] << (day * per_day) for day in range(days)
+        )
+    return TeamGrid(first_day, days, slot, busy, available)
+
+def week_states(employee_id: int, week_start: date, slot: int, days: int = 7) -> List[List[str]]:
+    """``[day][slot]`` FREE, BUSY or UNAVAILABLE for ``days`` days from ``week_start``."""
+    return team_grid([employee_id], week_start, days, slot).states(employee_id)
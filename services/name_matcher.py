@@ -0,0 +1,383 @@
+"""
+Name-matching index for the assistant.
+
+``NameIndex`` finds which known names a message mentions. Each entry (a key
+and a display name) contributes its normalized full name and each of its
+name tokens ("laura", "sanchez") as patterns of an Aho-Corasick automaton,
+so one pass over the message finds every mention, whatever the size of the
+directory. Matches must start and end on word boundaries, and tokens
+shorter than ``MIN_TOKEN`` are never patterns on their own, so "a" or "de"
+match nobody. When nothing matches exactly, a trigram index over the name
+tokens gives a typo-tolerant fallback ("lura" -> "laura").
+
+Updates are incremental: patterns added since the automaton was built sit
+in a set that is looked up by runs of words, and are folded into a new
+automaton once they outgrow a fraction of it. Removed entries stop being
+reported at once; their patterns are dropped at the next fold.
+
+``employee_names`` follows the employee directory and ``client_names`` the
+``clients`` table (new rows are picked up by id, through the
+``table_versions`` counters).
+"""
+
+import math
+import re
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Collection, Dict, Hashable, Iterable, Iterator, List, Mapping, Set, Tuple
+
+from smartscheduler.data.database import get_client_names
+from smartscheduler.data.directory import TableWatch, employee_directory
+from smartscheduler.models.person import normalize_name
+
+MIN_TOKEN = 3
+# Name particles that say nothing about who is meant.
+PARTICLES = frozenset({"del", "der", "den", "las", "los", "van", "von"})
+
+FUZZY_MIN_WORD = 4
+FUZZY_THRESHOLD = 0.5  # Dice coefficient over padded trigrams
+
+# Pending patterns are folded into the automaton when there are more than
+# this many, and more than 1/FOLD_RATIO of the automaton's.
+FOLD_MIN = 256
+FOLD_RATIO = 8
+
+_WORD = re.compile(r"[^\W_]+")
+
+@dataclass(frozen=True)
+class NameMatch:
+    key: Hashable
+    name: str
+    # Share of the name's tokens mentioned; 1.0 for the full name.
+    score: float
+    # How many of its tokens were mentioned; breaks ties between names of
+    # different lengths ("Laura" and "Laura Sanchez" in "laura sanchez").
+    mentioned: int = 1
+    # False for typo-tolerant (trigram) matches.
+    exact: bool = True
+
+@dataclass(frozen=True)
+class _Entry:
+    name: str
+    full: str
+    tokens: Tuple[str, ...]
+
+def _words(text: str) -> List[str]:
+    """Normalized words of ``text``, punctuation dropped."""
+    return _WORD.findall(normalize_name(text))
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# ---------------------------------------------------------------------------
+# Aho-Corasick automaton
+# ---------------------------------------------------------------------------
+class _Automaton:
+    """Aho-Corasick automaton over a fixed set of strings."""
+
+    def __init__(self, patterns: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+        self.patterns = set(patterns)
+        for pattern in self.patterns:
+            node = 0
+            for ch in pattern:
+                child = goto[node].get(ch)
+                if child is None:
+                    child = goto[node][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                node = child
+            out[node] = (pattern,)
+        # Failure links, breadth first so every shorter suffix is done.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] += out[fail[child]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def search(self, text: str) -> Iterator[Tuple[int, str]]:
+        """``(end, pattern)`` for every occurrence of a pattern in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in out[node]:
+                yield i + 1, pattern
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+class NameIndex:
+    """
+    Keyed names, matched against free text. Not thread-safe; the live
+    indexes below serialize access.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Entry] = {}
+        # full name -> keys, and token -> token count of the name -> keys.
+        # Bucketing by token count lets ranking stop after ``limit`` holders
+        # of a common first name instead of scoring every one of them.
+        self._full: Dict[str, Set[Hashable]] = {}
+        self._tokens: Dict[str, Dict[int, Set[Hashable]]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._main = _Automaton(())
+        self._pending: Set[str] = set()
+        self._pending_sizes: Counter = Counter()  # word count -> pending patterns
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> Collection[Hashable]:
+        return self._entries.keys()
+
+    # -- updates ------------------------------------------------------------
+    def add(self, key: Hashable, name: str) -> None:
+        """Add (or rename) an entry."""
+        if key in self._entries:
+            if self._entries[key].name == name:
+                return
+            self.remove(key)
+        words = _words(name)
+        tokens = tuple(dict.fromkeys(
+            w for w in words if len(w) >= MIN_TOKEN and w not in PARTICLES
+        ))
+        entry = _Entry(name, " ".join(words), tokens)
+        self._entries[key] = entry
+        if len(entry.full) >= MIN_TOKEN:
+            self._full.setdefault(entry.full, set()).add(key)
+            self._track(entry.full)
+        for token in tokens:
+            buckets = self._tokens.get(token)
+            if buckets is None:
+                buckets = self._tokens[token] = {}
+                for gram in _trigrams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+                self._track(token)
+            buckets.setdefault(len(tokens), set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        owners = self._full.get(entry.full)
+        if owners is not None:
+            owners.discard(key)
+            if not owners:
+                del self._full[entry.full]
+                self._untrack(entry.full)
+        size = len(entry.tokens)
+        for token in entry.tokens:
+            buckets = self._tokens[token]
+            buckets[size].discard(key)
+            if buckets[size]:
+                continue
+            del buckets[size]
+            if buckets:
+                continue
+            del self._tokens[token]
+            for gram in _trigrams(token):
+                postings = self._grams[gram]
+                postings.discard(token)
+                if not postings:
+                    del self._grams[gram]
+            self._untrack(token)
+
+    def sync(self, names: Mapping[Hashable, str]) -> None:
+        """Make the index hold exactly ``names``, touching only the differences."""
+        for key in [k for k in self._entries if k not in names]:
+            self.remove(key)
+        for key, name in names.items():
+            self.add(key, name)
+
+    def _track(self, pattern: str) -> None:
+        if pattern not in self._main.patterns and pattern not in self._pending:
+            self._pending.add(pattern)
+            self._pending_sizes[pattern.count(" ") + 1] += 1
+
+    def _untrack(self, pattern: str) -> None:
+        # A dead pattern of the automaton matches nobody until the next
+        # fold drops it.
+        if pattern in self._pending and pattern not in self._full and pattern not in self._tokens:
+            self._pending.discard(pattern)
+            size = pattern.count(" ") + 1
+            self._pending_sizes[size] -= 1
+            if not self._pending_sizes[size]:
+                del self._pending_sizes[size]
+
+    def _mentions(self, words: List[str]) -> Iterator[str]:
+        """Live and dead patterns occurring in the text on word boundaries."""
+        if len(self._pending) > max(FOLD_MIN, len(self._main.patterns) // FOLD_RATIO):
+            self._main = _Automaton(self._full.keys() | self._tokens.keys())
+            self._pending.clear()
+            self._pending_sizes.clear()
+        line = " ".join(words)
+        for end, pattern in self._main.search(line):
+            start = end - len(pattern)
+            if (start and line[start - 1] != " ") or (end < len(line) and line[end] != " "):
+                continue
+            yield pattern
+        for size in self._pending_sizes:
+            for i in range(len(words) - size + 1):
+                run = " ".join(words[i:i + size])
+                if run in self._pending:
+                    yield run
+
+    # -- queries ------------------------------------------------------------
+    def match(self, text: str, limit: int = 5, ignore: Collection[str] = ()) -> List[NameMatch]:
+        """
+        Entries mentioned in ``text``, best first. Exact mentions win; only
+        if there are none are the words of the text (except those in
+        ``ignore``) compared by trigrams.
+        """
+        words = _words(text)
+        if not words:
+            return []
+        full: Set[Hashable] = set()
+        weights: Dict[str, float] = {}
+        for pattern in self._mentions(words):
+            if pattern in self._full:
+                full |= self._full[pattern]
+            if pattern in self._tokens:
+                weights[pattern] = 1.0
+        exact = bool(full or weights)
+        if not exact:
+            weights = self._similar(words, ignore)
+        scores = self._rank(full, weights, limit)
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1][0], -kv[1][1], self._entries[kv[0]].name))
+        return [
+            NameMatch(key, self._entries[key].name, round(score, 3), mentioned, exact)
+            for key, (score, mentioned) in ranked[:limit]
+        ]
+
+    def _similar(self, words: List[str], ignore: Collection[str]) -> Dict[str, float]:
+        """Tokens close to a word of the text, with their Dice coefficient."""
+        similar: Dict[str, float] = {}
+        for word in set(words):
+            if len(word) < FUZZY_MIN_WORD or word in ignore:
+                continue
+            grams = _trigrams(word)
+            # A token close enough shares at least ``needed`` trigrams, so it
+            # is in one of the len - needed + 1 shortest posting lists.
+            postings = sorted((self._grams.get(g, ()) for g in grams), key=len)
+            needed = math.ceil(FUZZY_THRESHOLD * (len(grams) + 1) / 2)
+            for token in set().union(*postings[:len(postings) - needed + 1]):
+                token_grams = _trigrams(token)
+                dice = 2 * len(grams & token_grams) / (len(grams) + len(token_grams))
+                if dice >= FUZZY_THRESHOLD and dice > similar.get(token, 0.0):
+                    similar[token] = dice
+        return similar
+
+    def _rank(self, full: Set[Hashable], weights: Dict[str, float],
+              limit: int) -> Dict[Hashable, Tuple[float, int]]:
+        """
+        ``(score, tokens mentioned)`` of the best entries: the score is the
+        summed weight of the mentioned tokens over the name's token count,
+        or 1.0 for the full name. Beyond the full-name matches at most
+        ``limit`` entries are scored.
+        """
+        scores = {key: (1.0, max(1, len(self._entries[key].tokens))) for key in full}
+        tokens = sorted(weights)
+        # Entries sharing a token count and a set of mentioned tokens share
+        # a score, so whole groups are ranked: a depth-first walk over token
+        # subsets keeps the non-empty intersections of same-size buckets.
+        groups = []
+        for size in {size for t in tokens for size in self._tokens[t]}:
+            stack = [
+                (i + 1, weights[t], 1, self._tokens[t][size])
+                for i, t in enumerate(tokens) if size in self._tokens[t]
+            ]
+            while stack:
+                following, weight, count, keys = stack.pop()
+                groups.append((min(1.0, weight / size), count, keys))
+                if count == size:
+                    continue
+                for j in range(following, len(tokens)):
+                    bucket = self._tokens[tokens[j]].get(size)
+                    both = keys & bucket if bucket else None
+                    if both:
+                        stack.append((j + 1, weight + weights[tokens[j]], count + 1, both))
+        # An entry mentioned by more tokens sits in a better group too, and
+        # is taken there first.
+        groups.sort(key=lambda g: (g[0], g[1]), reverse=True)
+        taken = 0
+        for score, count, keys in groups:
+            for key in keys:
+                if key in scores:
+                    continue
+                if taken == limit:
+                    return scores
+                scores[key] = (score, count)
+                taken += 1
+        return scores
+
+# ---------------------------------------------------------------------------
+# Live indexes
+# ---------------------------------------------------------------------------
+class EmployeeNames:
+    """Employee names, resynced whenever the employee directory reloads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = NameIndex()
+        self._generation = None
+
+    def match(self, text: str, limit: int = 5, ignore: Collection[str] = ()) -> List[NameMatch]:
+        """Matches keyed by employee id."""
+        generation = employee_directory.current_generation()
+        with self._lock:
+            if generation != self._generation:
+                # A reload racing with this read only costs another resync.
+                self._index.sync({e.id: e.name for e in employee_directory.employees()})
+                self._generation = generation
+            return self._index.match(text, limit, ignore)
+
+class ClientNames:
+    """
+    Client names. New clients are loaded by id; only updates or deletes
+    (the 'client_rewrites' counter) make it resync the whole table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watch = TableWatch("clients", "client_rewrites")
+        self._index = NameIndex()
+        self._last_id = 0
+        self._rewrites = None
+
+    def _refresh(self) -> None:
+        versions = self._watch.poll()
+        if versions is None:
+            return
+        rewrites = versions.get("client_rewrites")
+        if rewrites != self._rewrites:
+            self._index.sync(dict(get_client_names()))
+            self._last_id = max(self._index.keys(), default=0)
+            self._rewrites = rewrites
+            return
+        for client_id, name in get_client_names(self._last_id):
+            self._index.add(client_id, name)
+            self._last_id = client_id
+
+    def match(self, text: str, limit: int = 5, ignore: Collection[str] = ()) -> List[NameMatch]:
+        """Matches keyed by client id."""
+        with self._lock:
+            self._refresh()
+            return self._index.match(text, limit, ignore)
+
+employee_names = EmployeeNames()
+client_names = ClientNames()
@@ -0,0 +1,513 @@
+"""
+Scheduling services built on top of the data layer.
+
+``find_free_slots`` answers "when is this employee next free for N
+minutes": it subtracts the employee's scheduled appointments (fetched in a
+single query) from their compiled working hours with an interval sweep.
+``find_first_available`` runs that search for every employee of a role in
+a thread pool and merges the results. ``schedule_batch`` assigns a whole
+queue of booking requests at once.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from smartscheduler.data.bulk_import import add_appointments_bulk
+from smartscheduler.data.connection import transaction
+from smartscheduler.data.database import get_busy_intervals, get_client_by_name
+from smartscheduler.data.timestamps import epoch_to_wall_seconds, from_wall_seconds, wall_seconds
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.models.availability import CompiledAvailability
+from smartscheduler.models.person import Employee, normalize_name
+
+DEFAULT_GRANULARITY = timedelta(minutes=15)
+DAY = 24 * 3600
+SEARCH_WORKERS = 8
+
+@dataclass(frozen=True)
+class FreeSlot:
+    employee_id: int
+    start: datetime
+    end: datetime
+
+# ---------------------------------------------------------------------------
+# Interval sweep
+# ---------------------------------------------------------------------------
+def _working_intervals(availability: CompiledAvailability, window_start: int,
+                       window_end: int) -> Iterator[Tuple[int, int]]:
+    """Working hours as wall-second intervals, clipped to the window, in order."""
+    day = window_start - window_start % DAY
+    weekday = from_wall_seconds(day).weekday()
+    while day < window_end:
+        for start_min, end_min in availability.intervals(weekday):
+            start = max(day + start_min * 60, window_start)
+            end = min(day + end_min * 60, window_end)
+            if start < end:
+                yield start, end
+        day += DAY
+        weekday = (weekday + 1) % 7
+
+def free_intervals(availability: CompiledAvailability, busy: Sequence[Tuple[int, int]],
+                   window_start: int, window_end: int) -> Iterator[Tuple[int, int]]:
+    """
+    Subtract ``busy`` (sorted by start) from the working hours inside
+    ``[window_start, window_end)``. All values are wall seconds (see
+    ``data/timestamps.py``); the sweep is linear in the number of working
+    and busy intervals.
+    """
+    i = 0
+    for start, end in _working_intervals(availability, window_start, window_end):
+        # Busy intervals ending before this working interval are done with.
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        cursor, j = start, i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > cursor:
+                yield cursor, busy[j][0]
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < end:
+            yield cursor, end
+
+def _busy_wall_seconds(employee_id: int, window_start: datetime,
+                       window_end: datetime) -> List[Tuple[int, int]]:
+    return [
+        (epoch_to_wall_seconds(start), epoch_to_wall_seconds(end))
+        for start, end in get_busy_intervals(employee_id, window_start, window_end)
+    ]
+
+def _slot_starts(free: Iterator[Tuple[int, int]], duration: int, step: int,
+                 granularity: int) -> Iterator[Tuple[int, int]]:
+    for start, end in free:
+        # Round up to the granularity grid (aligned to midnight).
+        t = start + (-start % granularity)
+        while t + duration <= end:
+            yield t, t + duration
+            t += step
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def iter_free_slots(employee_id: int, duration: timedelta, window_start: datetime,
+                    window_end: datetime, step: Optional[timedelta] = None,
+                    granularity: timedelta = DEFAULT_GRANULARITY,
+                    availability: Optional[CompiledAvailability] = None) -> Iterator[FreeSlot]:
+    """
+    Lazily yield the employee's free slots of ``duration`` inside the window,
+    earliest first. Slot starts are aligned to ``granularity`` and
+    consecutive slots in the same gap are ``step`` apart (default: the
+    duration, i.e. back-to-back options).
+
+    The scheduled appointments are read in a single query up front; working
+    hours come from the employee directory cache unless ``availability`` is
+    given.
+    """
+    if availability is None:
+        availability = employee_directory.availability(employee_id)
+    if availability is None or window_end <= window_start:
+        return
+    duration_s = int(duration.total_seconds())
+    step_s = int((step or duration).total_seconds())
+    granularity_s = max(int(granularity.total_seconds()), 1)
+    if duration_s <= 0 or step_s <= 0:
+        raise ValueError("duration and step must be positive")
+
+    start, end = wall_seconds(window_start), wall_seconds(window_end)
+    busy = _busy_wall_seconds(employee_id, window_start, window_end)
+    free = free_intervals(availability, busy, start, end)
+    for slot_start, slot_end in _slot_starts(free, duration_s, step_s, granularity_s):
+        yield FreeSlot(employee_id, from_wall_seconds(slot_start), from_wall_seconds(slot_end))
+
+def find_free_slots(employee_id: int, duration: timedelta, window_start: datetime,
+                    window_end: datetime, limit: int = 5, **options) -> List[FreeSlot]:
+    """Return the first ``limit`` free slots (see ``iter_free_slots``)."""
+    slots = []
+    for slot in iter_free_slots(employee_id, duration, window_start, window_end, **options):
+        slots.append(slot)
+        if len(slots) >= limit:
+            break
+    return slots
+
+# ---------------------------------------------------------------------------
+# Role-wide search
+# ---------------------------------------------------------------------------
+def _employees_with_role(role: str) -> List[Employee]:
+    role_key = normalize_name(role)
+    return [e for e in employee_directory.employees() if normalize_name(e.role) == role_key]
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _search_pool() -> ThreadPoolExecutor:
+    # Shared and bounded: worker threads keep their thread-local DB
+    # connections between searches.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(SEARCH_WORKERS, thread_name_prefix="slot-search")
+        return _pool
+
+def _search_group(employee_ids, duration, window_start, window_end, k, options) -> List[FreeSlot]:
+    """
+    Earliest ``k`` slots across ``employee_ids``. Once ``k`` candidates are
+    known, later employees only need searching up to the current k-th start,
+    which also narrows their busy-interval query.
+    """
+    best: List[Tuple[datetime, int, FreeSlot]] = []
+    for employee_id in employee_ids:
+        end = window_end
+        if len(best) == k:
+            end = min(end, best[-1][0] + duration)
+        for slot in find_free_slots(employee_id, duration, window_start, end, limit=k, **options):
+            best.append((slot.start, slot.employee_id, slot))
+        best.sort(key=lambda entry: entry[:2])
+        del best[k:]
+    return [slot for _, _, slot in best]
+
+def find_first_available(role: str, duration: timedelta, window_start: datetime,
+                         window_end: datetime, k: int = 5, **options) -> List[FreeSlot]:
+    """
+    Return the globally earliest ``k`` free slots across every employee
+    whose role matches ``role`` (accent/case-insensitive). Employees are
+    split into groups searched in the shared thread pool. The per-group
+    lists, each already sorted, are merged with a heap. Ties go to the
+    lower employee id.
+    """
+    employee_ids = [e.id for e in _employees_with_role(role)]
+    if not employee_ids or k <= 0:
+        return []
+
+    # One task per group keeps the number of futures bounded by the pool size.
+    groups = [employee_ids[i::SEARCH_WORKERS] for i in range(min(SEARCH_WORKERS, len(employee_ids)))]
+    pool = _search_pool()
+    futures = [
+        pool.submit(_search_group, group, duration, window_start, window_end, k, options)
+        for group in groups
+    ]
+    merged = heapq.merge(*(future.result() for future in futures),
+                         key=lambda slot: (slot.start, slot.employee_id))
+    return list(islice(merged, k))
+
+# ---------------------------------------------------------------------------
+# Batch assignment
+# ---------------------------------------------------------------------------
+@dataclass
+class BookingRequest:
+    client_name: str
+    role: str
+    duration: timedelta
+    windows: Sequence[Tuple[datetime, datetime]]  # preferred, any order
+
+@dataclass
+class BatchAssignment:
+    request: int  # index into the queue
+    slot: FreeSlot
+    appointment_id: Optional[int] = None
+
+@dataclass
+class BatchQuality:
+    assigned: int
+    booked_minutes: int
+    fragmented_minutes: int  # free time left in gaps too short for any request
+
+@dataclass
+class BatchResult:
+    assignments: List[BatchAssignment]
+    unassigned: List[int]
+    capacity_minutes: int
+    solve_seconds: float
+    quality: BatchQuality
+    baseline: BatchQuality
+    baseline_seconds: float
+    committed: bool = False
+    rejected: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def utilization(self) -> float:
+        return self.quality.booked_minutes / self.capacity_minutes if self.capacity_minutes else 0.0
+
+    @property
+    def baseline_utilization(self) -> float:
+        return self.baseline.booked_minutes / self.capacity_minutes if self.capacity_minutes else 0.0
+
+class _FreeTimes:
+    """Mutable per-employee free intervals (wall seconds), sorted and disjoint."""
+
+    def __init__(self, gaps: Dict[int, List[Tuple[int, int]]]):
+        self.starts = {emp: [s for s, _ in g] for emp, g in gaps.items()}
+        self.ends = {emp: [e for _, e in g] for emp, g in gaps.items()}
+
+    def copy(self) -> "_FreeTimes":
+        other = _FreeTimes({})
+        other.starts = {emp: list(v) for emp, v in self.starts.items()}
+        other.ends = {emp: list(v) for emp, v in self.ends.items()}
+        return other
+
+    def overlapping(self, emp: int, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        starts, ends = self.starts.get(emp, ()), self.ends.get(emp, ())
+        for i in range(bisect_right(ends, start), bisect_left(starts, end)):
+            yield starts[i], ends[i]
+
+    def reserve(self, emp: int, start: int, end: int) -> None:
+        starts, ends = self.starts[emp], self.ends[emp]
+        i = bisect_right(starts, start) - 1
+        gap_start, gap_end = starts[i], ends[i]
+        del starts[i], ends[i]
+        if end < gap_end:
+            starts.insert(i, end)
+            ends.insert(i, gap_end)
+        if gap_start < start:
+            starts.insert(i, gap_start)
+            ends.insert(i, start)
+
+    def release(self, emp: int, start: int, end: int) -> None:
+        starts, ends = self.starts[emp], self.ends[emp]
+        i = bisect_left(starts, start)
+        if i < len(starts) and starts[i] == end:
+            end = ends[i]
+            del starts[i], ends[i]
+        if i and ends[i - 1] == start:
+            i -= 1
+            start = starts[i]
+            del starts[i], ends[i]
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def minutes(self, shorter_than: Optional[int] = None) -> int:
+        total = 0
+        for emp, starts in self.starts.items():
+            for s, e in zip(starts, self.ends[emp]):
+                if shorter_than is None or e - s < shorter_than:
+                    total += e - s
+        return total // 60
+
+class _Batch:
+    """The queue in wall seconds plus the candidate employees of each request."""
+
+    def __init__(self, requests: Sequence[BookingRequest], granularity: int):
+        self.granularity = granularity
+        self.durations = [int(r.duration.total_seconds()) for r in requests]
+        self.windows = [
+            sorted((wall_seconds(ws), wall_seconds(we)) for ws, we in r.windows) for r in requests
+        ]
+        by_role: Dict[str, List[int]] = {}
+        known: Dict[str, bool] = {}
+        self.employees: List[List[int]] = []
+        for r in requests:
+            key = normalize_name(r.role)
+            if key not in by_role:
+                by_role[key] = [e.id for e in _employees_with_role(r.role)]
+            client = normalize_name(r.client_name)
+            if client not in known:
+                known[client] = get_client_by_name(r.client_name) is not None
+            # Unknown clients get no candidates and stay unassigned, as
+            # book_appointment refuses them too.
+            self.employees.append(by_role[key] if known[client] else [])
+        self.min_duration = min(self.durations, default=0)
+
+    def options(self, index: int, free: _FreeTimes) -> Iterator[Tuple[int, int, int]]:
+        """Yield (waste, start, employee) for the flush-left and flush-right
+        placement in every free gap the request fits into."""
+        duration, grain = self.durations[index], self.granularity
+        for emp in self.employees[index]:
+            for ws, we in self.windows[index]:
+                for gap_start, gap_end in free.overlapping(emp, ws, we):
+                    lo, hi = max(ws, gap_start), min(we, gap_end)
+                    first = lo + (-lo % grain)
+                    last = hi - duration
+                    last -= last % grain
+                    if first > last:
+                        continue
+                    for start in {first, last}:
+                        yield self._waste(gap_start, gap_end, start, start + duration), start, emp
+
+    def _waste(self, gap_start: int, gap_end: int, start: int, end: int) -> int:
+        # Leftover pieces no request in the queue could ever use.
+        return sum(piece for piece in (start - gap_start, gap_end - end)
+                   if 0 < piece < self.min_duration)
+
+    def best(self, index: int, free: _FreeTimes) -> Tuple[int, Optional[Tuple[int, int, int]]]:
+        count, best = 0, None
+        for option in self.options(index, free):
+            count += 1
+            if best is None or option < best:
+                best = option
+        return count, best
+
+def _naive_assign(batch: _Batch, free: _FreeTimes) -> Dict[int, Tuple[int, int]]:
+    """First come, first served: each request takes its earliest fit."""
+    assigned = {}
+    for index, duration in enumerate(batch.durations):
+        options = [(start, emp) for _, start, emp in batch.options(index, free)]
+        if options:
+            start, emp = min(options)
+            free.reserve(emp, start, start + duration)
+            assigned[index] = (emp, start)
+    return assigned
+
+def _greedy_assign(batch: _Batch, free: _FreeTimes) -> Dict[int, Tuple[int, int]]:
+    """
+    Most constrained request first (fewest feasible placements, then
+    longest), each placed where it leaves the least unusable time. Counts
+    go stale as the book fills, so they are refreshed lazily on pop.
+    """
+    heap = []
+    for index, duration in enumerate(batch.durations):
+        heap.append((batch.best(index, free)[0], -duration, index))
+    heapq.heapify(heap)
+    assigned = {}
+    while heap:
+        count, neg_duration, index = heapq.heappop(heap)
+        fresh, best = batch.best(index, free)
+        if best is None:
+            continue
+        if fresh != count and heap and (fresh, neg_duration, index) > heap[0]:
+            heapq.heappush(heap, (fresh, neg_duration, index))
+            continue
+        _, start, emp = best
+        free.reserve(emp, start, start + batch.durations[index])
+        assigned[index] = (emp, start)
+    return assigned
+
+def _local_search(batch: _Batch, free: _FreeTimes, assigned: Dict[int, Tuple[int, int]],
+                  passes: int) -> None:
+    """
+    Try to fit each unassigned request by relocating one assigned request
+    that sits in its way on a candidate employee.
+    """
+    for _ in range(passes):
+        improved = False
+        by_employee: Dict[int, List[int]] = {}
+        for index, (emp, _) in assigned.items():
+            by_employee.setdefault(emp, []).append(index)
+        for index in range(len(batch.durations)):
+            if index in assigned:
+                continue
+            for other in _blockers(batch, index, assigned, by_employee):
+                emp, start = assigned[other]
+                end = start + batch.durations[other]
+                free.release(emp, start, end)
+                _, mine = batch.best(index, free)
+                if mine is not None:
+                    free.reserve(mine[2], mine[1], mine[1] + batch.durations[index])
+                    _, theirs = batch.best(other, free)
+                    if theirs is not None:
+                        free.reserve(theirs[2], theirs[1], theirs[1] + batch.durations[other])
+                        assigned[index] = (mine[2], mine[1])
+                        assigned[other] = (theirs[2], theirs[1])
+                        for i, e in ((index, mine[2]), (other, theirs[2])):
+                            by_employee.setdefault(e, []).append(i)
+                        by_employee[emp].remove(other)
+                        improved = True
+                        break
+                    free.release(mine[2], mine[1], mine[1] + batch.durations[index])
+                free.reserve(emp, start, end)
+        if not improved:
+            break
+
+def _blockers(batch: _Batch, index: int, assigned: Dict[int, Tuple[int, int]],
+              by_employee: Dict[int, List[int]]) -> List[int]:
+    blockers = []
+    for emp in batch.employees[index]:
+        for other in by_employee.get(emp, ()):
+            start = assigned[other][1]
+            end = start + batch.durations[other]
+            if any(start < we and end > ws for ws, we in batch.windows[index]):
+                blockers.append(other)
+    return blockers
+
+def _quality(batch: _Batch, assigned: Dict[int, Tuple[int, int]], free: _FreeTimes) -> BatchQuality:
+    return BatchQuality(
+        assigned=len(assigned),
+        booked_minutes=sum(batch.durations[i] for i in assigned) // 60,
+        fragmented_minutes=free.minutes(shorter_than=batch.min_duration),
+    )
+
+def _load_free_times(batch: _Batch) -> _FreeTimes:
+    """One busy-interval read per candidate employee over the queue's span."""
+    windows = [w for ws in batch.windows for w in ws]
+    if not windows:
+        return _FreeTimes({})
+    span_start = min(ws for ws, _ in windows)
+    span_end = max(we for _, we in windows)
+    gaps = {}
+    for emp in {e for employees in batch.employees for e in employees}:
+        availability = employee_directory.availability(emp)
+        if availability is None:
+            continue
+        busy = _busy_wall_seconds(emp, from_wall_seconds(span_start), from_wall_seconds(span_end))
+        gaps[emp] = list(free_intervals(availability, busy, span_start, span_end))
+    return _FreeTimes(gaps)
+
+def schedule_batch(requests: Sequence[BookingRequest],
+                   granularity: timedelta = DEFAULT_GRANULARITY,
+                   commit: bool = True, local_search_passes: int = 2) -> BatchResult:
+    """
+    Assign a queue of booking requests against the current appointment book,
+    maximizing the number of filled requests and leaving as little unusable
+    free time as possible.
+
+    The book is read once, the assignment is solved in memory (greedy plus
+    local search) and, with ``commit``, written through the bulk importer.
+    Everything runs inside a single IMMEDIATE transaction so the book cannot
+    change in between. The result also carries the quality of a naive
+    first-come-first-served pass over the same snapshot, for comparison.
+    Requests naming a client that does not exist are left unassigned.
+    """
+    batch = _Batch(requests, max(int(granularity.total_seconds()), 1))
+    with transaction("IMMEDIATE"):
+        free = _load_free_times(batch)
+        capacity = free.minutes()
+
+        began = time.perf_counter()
+        naive_free = free.copy()
+        naive = _naive_assign(batch, naive_free)
+        baseline_seconds = time.perf_counter() - began
+
+        began = time.perf_counter()
+        assigned = _greedy_assign(batch, free)
+        _local_search(batch, free, assigned, local_search_passes)
+        solve_seconds = time.perf_counter() - began
+
+        assignments = [
+            BatchAssignment(index, FreeSlot(emp, from_wall_seconds(start),
+                                            from_wall_seconds(start + batch.durations[index])))
+            for index, (emp, start) in sorted(assigned.items())
+        ]
+        result = BatchResult(
+            assignments=assignments,
+            unassigned=[i for i in range(len(requests)) if i not in assigned],
+            capacity_minutes=capacity,
+            solve_seconds=solve_seconds,
+            quality=_quality(batch, assigned, free),
+            baseline=_quality(batch, naive, naive_free),
+            baseline_seconds=baseline_seconds,
+        )
+        if commit and assignments:
+            _commit(requests, result)
+    return result
+
+def _commit(requests: Sequence[BookingRequest], result: BatchResult) -> None:
+    rows = []
+    for a in result.assignments:
+        employee = employee_directory.get(a.slot.employee_id)
+        rows.append({
+            "client": requests[a.request].client_name,
+            "employee": employee.email or employee.name,
+            "start_time": a.slot.start,
+            "end_time": a.slot.end,
+        })
+    report = add_appointments_bulk(rows, chunk_size=len(rows), create_clients=False)
+    for a, row in zip(result.assignments, report.results):
+        if row.accepted:
+            a.appointment_id = row.appointment_id
+        else:
+            result.rejected[a.request] = row.reason
+    result.committed = True
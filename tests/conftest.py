@@ -0,0 +1,13 @@
+import pytest
+
+from smartscheduler.data import connection, database
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh database in a temporary directory, migrated to the latest schema."""
+    previous = connection.get_config()
+    connection.configure(path=str(tmp_path / "test.db"), timezone="UTC")
+    database.create_tables()
+    yield connection.get_connection()
+    connection.close_connection()
+    connection.configure(path=previous.path, timezone=previous.timezone)
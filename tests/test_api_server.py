@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+server = pytest.importorskip("smartscheduler.api.server")
+
+def _read(raw: bytes):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await server.read_request(reader)
+    return asyncio.run(read())
+
+def test_request_with_body():
+    request = _read(b'POST /clients/cancel?x=1 HTTP/1.1\r\nContent-Length: 15\r\n\r\n{"client": "A"}')
+    assert (request.method, request.path, request.query) == ("POST", "/clients/cancel", {"x": "1"})
+    assert request.json() == {"client": "A"}
+    assert request.keep_alive
+
+@pytest.mark.parametrize("length, status", [("abc", 400), ("-5", 400), (str(server.MAX_BODY + 1), 413)])
+def test_bad_content_length(length, status):
+    with pytest.raises(server.HTTPError) as error:
+        _read(f"POST /appointments HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+    assert error.value.status == status
@@ -0,0 +1,60 @@
+import json
+
+from smartscheduler.data import database
+from smartscheduler.data.bulk_import import add_appointments_bulk, main
+from smartscheduler.models.person import Employee
+
+def _employee():
+    database.add_employee(Employee(
+        name="Laura Gomez", email="laura@clinic.com", phone="0", role="Doctor",
+        availability={"Monday": ["08:00-20:00"]},
+    ))
+
+def test_offset_times_next_to_naive_ones(db):
+    _employee()
+    report = add_appointments_bulk([
+        {"client": "Ana", "employee": "laura@clinic.com",
+         "start_time": "2030-01-07T10:00:00+02:00", "end_time": "2030-01-07T11:00:00"},
+        {"client": "Ana", "employee": "laura@clinic.com",
+         "start_time": "2030-01-07T12:00:00", "end_time": "2030-01-07T13:00:00"},
+    ])
+    # 10:00+02:00 is 08:00 UTC, so the first row ends three hours later.
+    assert [r.accepted for r in report.results] == [True, True]
+    start, end = db.execute(
+        "SELECT start_epoch, end_epoch FROM appointments WHERE id = ?",
+        (report.results[0].appointment_id,),
+    ).fetchone()
+    assert end - start == 3 * 3600
+    assert database.from_epoch(start).hour == 8
+
+def test_non_object_jsonl_line_is_rejected(db, tmp_path):
+    _employee()
+    path = tmp_path / "rows.jsonl"
+    path.write_text("\n".join([
+        json.dumps(["a"]),
+        json.dumps({"client": "Ana", "employee": "laura@clinic.com",
+                    "start_time": "2030-01-07T09:00:00", "end_time": "2030-01-07T10:00:00"}),
+        json.dumps({"client": "Ana", "employee": "laura@clinic.com",
+                    "start_time": ["2030"], "end_time": None, "status": 3}),
+    ]), encoding="utf-8")
+    report_path = tmp_path / "report.jsonl"
+    assert main([str(path), "--report", str(report_path)]) == 0
+    results = [json.loads(line) for line in report_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["accepted"] for r in results] == [False, True, False]
+    assert "expected an object" in results[0]["reason"]
+    assert "invalid time" in results[2]["reason"]
+
+def test_malformed_jsonl_line_is_rejected(db, tmp_path):
+    _employee()
+    path = tmp_path / "rows.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"client": "Ana", "employee": "laura@clinic.com",
+                    "start_time": "2030-01-07T09:00:00", "end_time": "2030-01-07T10:00:00"}),
+        "{bad",
+    ]), encoding="utf-8")
+    report_path = tmp_path / "report.jsonl"
+    assert main([str(path), "--report", str(report_path)]) == 0
+    results = [json.loads(line) for line in report_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["accepted"] for r in results] == [True, False]
+    assert results[1]["reason"].startswith("invalid JSON:")
+    assert db.execute("SELECT COUNT(*) FROM appointments").fetchone()[0] == 1
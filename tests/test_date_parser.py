@@ -0,0 +1,73 @@
+"""
+Golden corpus of the assistant's date/time parser, parsed with a fixed
+"now" (Wednesday 11 June 2025, 09:30). The benchmark in
+``benchmarks/bench_date_parser.py`` times the same messages.
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from smartscheduler.core.date_parser import parse_date_time
+
+NOW = datetime(2025, 6, 11, 9, 30)
+
+# (message, expected date, expected "HH:MM")
+CORPUS = [
+    ("I want to schedule an appointment with Laura on Friday at 10 am.", date(2025, 6, 13), "10:00"),
+    ("Book a meeting with Carlos next Tuesday at 3 pm.", date(2025, 6, 17), "15:00"),
+    ("Show all my appointments for this month.", None, None),
+    ("tomorrow at 2pm", date(2025, 6, 12), "14:00"),
+    ("day after tomorrow 14:30", date(2025, 6, 13), "14:30"),
+    ("today at noon", date(2025, 6, 11), "12:00"),
+    ("next week at 9", date(2025, 6, 18), "09:00"),
+    ("15/06/2025 at 14:00", date(2025, 6, 15), "14:00"),
+    ("15/06", date(2025, 6, 15), None),
+    ("3/2", date(2026, 2, 3), None),
+    ("31/02", None, None),
+    ("29/02/2025", None, None),
+    ("15/06/26 10:30", date(2026, 6, 15), "10:30"),
+    ("2025-12-24 9:15", date(2025, 12, 24), "09:15"),
+    ("june 15", date(2025, 6, 15), None),
+    ("July 4th at 11am", date(2025, 7, 4), "11:00"),
+    ("on the 3rd", date(2025, 7, 3), None),
+    ("the 15th of august", date(2025, 8, 15), None),
+    ("15th of june", date(2025, 6, 15), None),
+    ("5 may 2027", date(2027, 5, 5), None),
+    ("feb 29", date(2028, 2, 29), None),
+    ("Sep 3rd, 2026 at 4:45 pm", date(2026, 9, 3), "16:45"),
+    ("2 p.m. on dec 1", date(2025, 12, 1), "14:00"),
+    ("friday 13", date(2025, 6, 13), None),
+    ("friday the 13th at 3 o'clock", date(2025, 6, 13), "15:00"),
+    ("monday 15 june", date(2025, 6, 15), None),
+    ("monday, june 16", date(2025, 6, 16), None),
+    ("tomorrow, june 20", date(2025, 6, 20), None),
+    ("this wednesday at 8", date(2025, 6, 11), "08:00"),
+    ("wednesday", date(2025, 6, 11), None),
+    ("next wednesday", date(2025, 6, 18), None),
+    ("next friday 3pm", date(2025, 6, 13), "15:00"),
+    ("on tue", date(2025, 6, 17), None),
+    ("sat 9am", date(2025, 6, 14), "09:00"),
+    ("thursday 10:00", date(2025, 6, 12), "10:00"),
+    ("thurs 9:00am", date(2025, 6, 12), "09:00"),
+    ("sunday at midnight", date(2025, 6, 15), "00:00"),
+    ("at 3", None, "15:00"),
+    ("at 14", None, "14:00"),
+    ("at 0", None, None),
+    ("at 10:30", None, "10:30"),
+    ("10 a.m.", None, "10:00"),
+    ("12am", None, "00:00"),
+    ("12pm", None, "12:00"),
+    ("13pm", None, None),
+    ("25:00", None, None),
+    ("may I come at 5?", None, "17:00"),
+    ("15/06 at 3pm or 16/06 at 4pm", date(2025, 6, 15), "15:00"),
+    ("call me at 555-1234", None, None),
+    ("I need 2 hours", None, None),
+    ("Hello Laura", None, None),
+    ("Ana Ruiz", None, None),
+]
+
+@pytest.mark.parametrize("text, expected_date, expected_time", CORPUS)
+def test_golden_corpus(text, expected_date, expected_time):
+    assert parse_date_time(text, NOW) == (expected_date, expected_time)
@@ -0,0 +1,492 @@
+"""
+Virtualized appointment list for the View appointments tab.
+
+The Treeview only ever holds the rows on screen. ``AppointmentPager`` reads
+them with ``get_appointments_sorted`` a page at a time (the visible rows
+plus read-ahead on both sides) and re-reads only when the view leaves the
+cached page. Sorting (column headings) and the status/date filters run in
+SQL. The sort key of every page boundary (and of every ``ANCHOR_EVERY``-th
+row) is remembered, so scrolling resumes from a key instead of an offset,
+and a scrollbar jump only skips rows from the nearest key already seen.
+While the GUI is idle, ``sweep()`` walks the list in ``SWEEP_STRIDE`` steps
+to remember keys all along it, so no jump skips more than that many rows.
+
+Writes, from this process or any other, reach the list through the
+appointment change feed: ``catch_up()`` places the old and new sort key of
+every changed row, shifts the cached rows and keys around it and updates
+the Treeview row by row, without recounting or re-reading the list.
+"""
+
+import bisect
+import functools
+import time
+import tkinter as tk
+from datetime import datetime, timedelta
+from tkinter import ttk
+from typing import Dict, List, Optional
+
+from smartscheduler.data.connection import transaction
+from smartscheduler.data.database import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_SCHEDULED,
+    ChangesPruned,
+    count_appointments,
+    get_appointment_changes,
+    get_appointment_keys,
+    get_appointment_keys_before,
+    get_appointments_sorted,
+    get_table_versions,
+    latest_change_seq,
+)
+
+# (heading, sort order, width)
+COLUMNS = (
+    ("Client", "client", 140),
+    ("Employee", "employee", 140),
+    ("Start", "start", 140),
+    ("End", "end", 140),
+    ("Status", "status", 100),
+)
+PAGE_SIZE = 200  # rows per query, read-ahead included
+ANCHOR_EVERY = 100  # rows between remembered sort keys
+SWEEP_STRIDE = 1000  # the idle sweep leaves no wider gap between keys
+SWEEP_SLICE = 0.005  # seconds of sweeping per idle callback
+WHEEL_ROWS = 3
+POLL_INTERVAL = 500  # ms between checks of the change feed
+CATCH_UP_LIMIT = 500  # more changes than this re-read the list instead
+# Renames move rows without an appointment change: re-read the list.
+PEOPLE_VERSIONS = ("employees", "client_rewrites")
+ALL_STATUSES = "All"
+TAGS = {
+    STATUS_SCHEDULED: "scheduled",
+    STATUS_COMPLETED: "completed",
+    STATUS_CANCELLED: "cancelled",
+}
+
+class AppointmentPager:
+    """Rows of the sorted, filtered appointment list by position."""
+
+    def __init__(self, page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self.sort = "start"
+        self.descending = False
+        self.status: Optional[str] = None
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self.total = 0
+        self.queries = 0
+        self.seq = 0  # last change feed entry reflected in the list
+        # Rows changed by catch-ups (None: left the list), for the owner to take.
+        self.changed: Dict[int, Optional[tuple]] = {}
+        self._people: Optional[Dict[str, int]] = None
+        self._anchor_rows: List[int] = []  # sorted positions with a known key
+        self._anchors: Dict[int, tuple] = {}
+        self._cache_start = 0
+        self._cache: List[tuple] = []
+        self._cache_keys: List[tuple] = []
+        self._swept = -1
+
+    def set_sort(self, sort: str, descending: bool = False) -> None:
+        self.sort, self.descending = sort, descending
+        self.refresh()
+
+    def set_filters(self, status: Optional[str] = None, start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None) -> None:
+        self.status, self.start_time, self.end_time = status, start_time, end_time
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Forget cached rows and keys (the data may have changed) and recount."""
+        self._anchor_rows.clear()
+        self._anchors.clear()
+        self._cache_start, self._cache, self._cache_keys = 0, [], []
+        self._swept = -1
+        with transaction():
+            self.seq = latest_change_seq()
+            self._people = get_table_versions(*PEOPLE_VERSIONS)
+            self.total = count_appointments(
+                status=self.status, start_time=self.start_time, end_time=self.end_time
+            )
+
+    def rows(self, top: int, count: int) -> List[tuple]:
+        """The rows at positions ``[top, top + count)``."""
+        if not self._cached(top, count):
+            # The page and the changes before it come from one snapshot.
+            with transaction():
+                self._catch_up()
+                if not self._cached(top, count):
+                    # Center the visible rows in the page, for scrolling either way.
+                    self._fetch(max(0, top - max(0, self.page_size - count) // 2),
+                                max(self.page_size, count))
+        end = min(self.total, top + count)
+        top = max(0, min(top, end))
+        return self._cache[top - self._cache_start:end - self._cache_start]
+
+    def catch_up(self) -> bool:
+        """
+        Apply the changes committed since the list was read. Returns True if
+        anything changed; the changed rows are added to ``changed``.
+        """
+        with transaction():
+            return self._catch_up()
+
+    def sweep(self, stride: int = SWEEP_STRIDE) -> bool:
+        """
+        Remember one more key, at most ``stride`` rows past the part of the
+        list already covered. Returns False once keys cover the whole list.
+        """
+        i = bisect.bisect_right(self._anchor_rows, self._swept) - 1
+        base = self._anchor_rows[i] if i >= 0 else -1
+        target = base + stride
+        if target >= self.total:
+            return False
+        j = bisect.bisect_right(self._anchor_rows, target) - 1
+        if self._anchor_rows[j:j + 1] and self._anchor_rows[j] > base:
+            self._swept = self._anchor_rows[j]  # already known from scrolling
+            return True
+        with transaction():
+            if self._catch_up():
+                return True  # the keys moved; resume from them next time
+            _, keys = get_appointments_sorted(
+                self.sort, self.descending, self.status, self.start_time, self.end_time,
+                after=self._anchors.get(base), offset=target - base - 1 if base >= 0 else target,
+                limit=1,
+            )
+        self.queries += 1
+        if not keys:
+            return False
+        bisect.insort(self._anchor_rows, target)
+        self._anchors[target] = keys[0]
+        self._swept = target
+        return True
+
+    def _fetch(self, start: int, limit: int) -> None:
+        i = bisect.bisect_left(self._anchor_rows, start) - 1
+        if i >= 0:
+            anchor = self._anchor_rows[i]
+            after, offset = self._anchors[anchor], start - anchor - 1
+        else:
+            after, offset = None, start
+        rows, keys = get_appointments_sorted(
+            self.sort, self.descending, self.status, self.start_time, self.end_time,
+            after=after, offset=offset, limit=limit,
+        )
+        self.queries += 1
+        for j, key in enumerate(keys):
+            position = start + j
+            if (position % ANCHOR_EVERY == 0 or j == len(keys) - 1) and position not in self._anchors:
+                bisect.insort(self._anchor_rows, position)
+                self._anchors[position] = key
+        self._cache_start, self._cache, self._cache_keys = start, rows, keys
+
+    def _cached(self, top: int, count: int) -> bool:
+        end = min(self.total, top + count)
+        top = max(0, min(top, end))
+        return self._cache_start <= top and end <= self._cache_start + len(self._cache)
+
+    # --- Change feed ---
+    def _catch_up(self) -> bool:
+        latest = latest_change_seq()
+        if latest == self.seq:
+            return False
+        if latest - self.seq > CATCH_UP_LIMIT or get_table_versions(*PEOPLE_VERSIONS) != self._people:
+            self.refresh()
+            return True
+        try:
+            changes = get_appointment_changes(self.seq, CATCH_UP_LIMIT)
+        except ChangesPruned:
+            self.refresh()
+            return True
+        self.seq = latest
+        first: Dict[int, int] = {}  # appointment -> its first change in the batch
+        for seq, appointment_id, _, _ in changes:
+            first.setdefault(appointment_id, seq)
+        filters = dict(status=self.status, start_time=self.start_time, end_time=self.end_time)
+        before = get_appointment_keys_before(self.sort, list(first.values()), **filters)
+        after = get_appointment_keys(self.sort, list(first), **filters)
+
+        removed, added = [], []
+        for appointment_id in first:
+            old = before.get(appointment_id)
+            new = after.get(appointment_id)
+            self.changed[appointment_id] = new[0] if new else None
+            if old and new and old[1] == new[1]:
+                self._replace_cached(*new)  # same place in the list
+                continue
+            if old:
+                removed.append(old[1])
+            if new:
+                added.append(new)
+        if not removed and not added:
+            return True
+        for key in removed:
+            self._remove_cached(key)
+        for row, key in added:
+            self._insert_cached(row, key)
+        self.total += len(added) - len(removed)
+        self._shift_anchors(removed, [key for _, key in added])
+        self._swept = -1
+        return True
+
+    def _precedes(self, a: tuple, b: tuple) -> bool:
+        return a > b if self.descending else a < b
+
+    def _count_before(self, keys: List[tuple], key: tuple) -> int:
+        """How many of ``keys`` (in list order) come before ``key``."""
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._precedes(keys[mid], key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _replace_cached(self, row: tuple, key: tuple) -> None:
+        i = self._count_before(self._cache_keys, key)
+        if i < len(self._cache_keys) and self._cache_keys[i] == key:
+            self._cache[i] = row
+
+    def _remove_cached(self, key: tuple) -> None:
+        if not self._cache_keys:
+            return
+        i = self._count_before(self._cache_keys, key)
+        if i < len(self._cache_keys) and self._cache_keys[i] == key:
+            del self._cache[i], self._cache_keys[i]
+        elif i == 0:
+            self._cache_start -= 1  # the row was above the cached page
+
+    def _insert_cached(self, row: tuple, key: tuple) -> None:
+        if not self._cache_keys:
+            return
+        i = self._count_before(self._cache_keys, key)
+        if i == 0:
+            self._cache_start += 1  # the row lands above the cached page
+        elif i < len(self._cache_keys):
+            self._cache.insert(i, row)
+            self._cache_keys.insert(i, key)
+
+    def _shift_anchors(self, removed: List[tuple], added: List[tuple]) -> None:
+        order = functools.cmp_to_key(lambda a, b: -1 if self._precedes(a, b) else (a != b))
+        removed, added = sorted(removed, key=order), sorted(added, key=order)
+        gone = set(removed)
+        anchors = {}
+        for position, key in self._anchors.items():
+            if key not in gone:
+                shift = self._count_before(added, key) - self._count_before(removed, key)
+                anchors[position + shift] = key
+        self._anchors = anchors
+        self._anchor_rows = sorted(anchors)
+
+class AppointmentList(ttk.Frame):
+    """Filter bar, sortable Treeview and a scrollbar over the whole list."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.pager = AppointmentPager()
+        self.top = 0
+        self.visible = 20
+        self.shown: List[tuple] = []
+        self.selected: Dict[int, tuple] = {}  # kept while the rows scroll away
+        self._sweep_job = None
+        self._poll_job = None
+
+        # --- Filters ---
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", padx=10, pady=(10, 0))
+        ttk.Label(bar, text="Status").pack(side="left")
+        self.status_var = tk.StringVar(value=ALL_STATUSES)
+        status_box = ttk.Combobox(
+            bar, textvariable=self.status_var, state="readonly", width=12,
+            values=(ALL_STATUSES, STATUS_SCHEDULED, STATUS_COMPLETED, STATUS_CANCELLED),
+        )
+        status_box.pack(side="left", padx=(4, 12))
+        status_box.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        ttk.Label(bar, text="From").pack(side="left")
+        self.from_entry = ttk.Entry(bar, width=12)
+        self.from_entry.pack(side="left", padx=(4, 12))
+        ttk.Label(bar, text="To").pack(side="left")
+        self.to_entry = ttk.Entry(bar, width=12)
+        self.to_entry.pack(side="left", padx=4)
+        ttk.Label(bar, text="(dd/mm/yyyy)").pack(side="left")
+        for entry in (self.from_entry, self.to_entry):
+            entry.bind("<Return>", lambda e: self.apply_filters())
+        self.count_label = ttk.Label(bar)
+        self.count_label.pack(side="right")
+
+        # --- Rows ---
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tree = ttk.Treeview(body, columns=[c[0] for c in COLUMNS], show="headings")
+        for title, sort, width in COLUMNS:
+            self.tree.heading(title, text=title, command=lambda s=sort: self.sort_by(s))
+            self.tree.column(title, width=width)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.tag_configure("scheduled", background="#0099ff", foreground="#fff")
+        self.tree.tag_configure("completed", background="#43d97b", foreground="#fff")
+        self.tree.tag_configure("cancelled", background="#e04f5f", foreground="#fff")
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS) or "break")
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible) or "break")
+        self.tree.bind("<Up>", lambda e: self.on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self.on_arrow(1))
+        self._update_headings()
+
+    # --- Public API ---
+    def refresh(self) -> None:
+        """Re-read the list, keeping the scroll position."""
+        self.pager.refresh()
+        self._show()
+
+    def poll(self) -> None:
+        """Apply the changes committed since the last poll (done every POLL_INTERVAL ms)."""
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+        if self.pager.catch_up():
+            self._show()
+        self._poll_job = self.after(POLL_INTERVAL, self.poll)
+
+    def selected_rows(self) -> List[tuple]:
+        return list(self.selected.values())
+
+    def focused_id(self) -> Optional[int]:
+        focus = self.tree.focus()
+        return int(focus) if focus else None
+
+    def sort_by(self, sort: str) -> None:
+        descending = not self.pager.descending if sort == self.pager.sort else False
+        self.pager.set_sort(sort, descending)
+        self.top = 0
+        self.selected.clear()
+        self._update_headings()
+        self._show()
+
+    def apply_filters(self) -> None:
+        try:
+            start = self._parse_day(self.from_entry.get())
+            end = self._parse_day(self.to_entry.get())
+        except ValueError:
+            self.count_label.config(text="Dates must be dd/mm/yyyy")
+            return
+        status = self.status_var.get()
+        self.pager.set_filters(
+            None if status == ALL_STATUSES else status,
+            start,
+            end + timedelta(days=1) if end else None,  # the 'To' day is included
+        )
+        self.top = 0
+        self.selected.clear()
+        self._show()
+
+    # --- Scrolling ---
+    def render(self) -> None:
+        self.top = max(0, min(self.top, self.pager.total - self.visible))
+        self.shown = self.pager.rows(self.top, self.visible)
+        self._take_changes()
+        # Row by row: rows still on screen are updated and moved in place.
+        iids = [str(row[0]) for row in self.shown]
+        wanted = set(iids)
+        gone = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+        for index, (iid, row) in enumerate(zip(iids, self.shown)):
+            _, client_name, employee_name, start, end, status = row
+            values = (client_name, employee_name, start, end, status)
+            tags = (TAGS.get(status, ""),)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values, tags=tags)
+                self.tree.move(iid, "", index)
+            else:
+                self.tree.insert("", index, iid=iid, values=values, tags=tags)
+        self.tree.selection_set([iid for iid, row in zip(iids, self.shown) if row[0] in self.selected])
+        self.count_label.config(text=f"{self.pager.total} appointments")
+        total = max(1, self.pager.total)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self.shown)) / total))
+
+    def scroll(self, rows: int) -> None:
+        self.top += rows
+        self.render()
+
+    def on_scrollbar(self, action, *args) -> None:
+        if action == "moveto":
+            self.top = int(float(args[0]) * self.pager.total)
+        elif action == "scroll":
+            step = int(args[0])
+            self.top += step * self.visible if args[1] == "pages" else step
+        self.render()
+
+    def on_arrow(self, step: int):
+        # Past the first/last visible row, scroll instead of stopping.
+        children = self.tree.get_children()
+        if not children or self.tree.focus() != children[0 if step < 0 else -1]:
+            return None
+        self.scroll(step)
+        children = self.tree.get_children()
+        if children:
+            edge = children[0 if step < 0 else -1]
+            self.tree.focus(edge)
+            self.tree.selection_set(edge)
+        return "break"
+
+    def on_resize(self, event) -> None:
+        rowheight = int(float(ttk.Style().lookup("Treeview", "rowheight") or 20))
+        visible = max(1, (event.height - rowheight - 4) // rowheight)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_select(self, event=None) -> None:
+        chosen = set(self.tree.selection())
+        for row in self.shown:
+            if str(row[0]) in chosen:
+                self.selected[row[0]] = row
+            else:
+                self.selected.pop(row[0], None)
+
+    # --- Helpers ---
+    def _show(self) -> None:
+        self.render()
+        if self._sweep_job is not None:
+            self.after_cancel(self._sweep_job)
+        self._sweep_job = self.after(50, self._sweep)
+        if self._poll_job is None:
+            self._poll_job = self.after(POLL_INTERVAL, self.poll)
+
+    def _take_changes(self) -> None:
+        for ap_id, row in self.pager.changed.items():
+            if ap_id not in self.selected:
+                continue
+            if row is None:
+                del self.selected[ap_id]  # no longer in the list
+            else:
+                self.selected[ap_id] = row
+        self.pager.changed.clear()
+
+    def _sweep(self) -> None:
+        # A few milliseconds at a time, so the GUI stays responsive.
+        deadline = time.perf_counter() + SWEEP_SLICE
+        while time.perf_counter() < deadline:
+            if not self.pager.sweep():
+                self._sweep_job = None
+                return
+        self._sweep_job = self.after(1, self._sweep)
+
+    def _update_headings(self) -> None:
+        for title, sort, _ in COLUMNS:
+            arrow = ""
+            if sort == self.pager.sort:
+                arrow = " ▼" if self.pager.descending else " ▲"
+            self.tree.heading(title, text=title + arrow)
+
+    @staticmethod
+    def _parse_day(text: str) -> Optional[datetime]:
+        text = text.strip()
+        return datetime.strptime(text, "%d/%m/%Y") if text else None
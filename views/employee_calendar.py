@@ -1,26 +1,105 @@
-import ttkbootstrap as tb
+"""
+Weekly calendar of one employee.
+
+The grid is drawn on a single Canvas: one rectangle and one text item per
+time slot, created when the slot size changes and only re-coloured when
+the week or the employee changes. The slot states come from
+``services/calendar_grid.py`` (one indexed query per week).
+"""
+
+import tkinter as tk
+from datetime import date, datetime, timedelta
 from tkinter import ttk
-from datetime import datetime, timedelta, time
-from smartscheduler.data.database import get_appointments, get_employees
+from typing import Dict, List, Optional, Tuple
+
+import ttkbootstrap as tb
+
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.services.calendar_grid import BUSY, FREE, UNAVAILABLE, slot_minutes, week_states
 
 DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-HOUR_BLOCKS = [f"{h:02d}:00" for h in range(8, 21)]  # 08:00 a 20:00
-
-def parse_block(block: str):
-    """returns tuples (hora_inicio, hora_fin) de un string '09:00-12:00'."""
-    try:
-        start, end = block.split("-")
-        return datetime.strptime(start, "%H:%M").time(), datetime.strptime(end, "%H:%M").time()
-    except Exception:
-        return None, None
-
-def block_is_occupied(block_start, block_end, citas):
-    """True if an appointment overlaps with a block."""
-    for cita_start, cita_end in citas:
-        if (cita_start < block_end and cita_end > block_start):
-            return True
-    return False
+SLOT_CHOICES = ("60", "30", "15")  # minutes per slot
+CELL_TEXT = {FREE: "", BUSY: "X", UNAVAILABLE: "-"}
+CELL_COLOR = {FREE: "success", BUSY: "danger", UNAVAILABLE: "secondary"}  # theme colours
+HEADER_HEIGHT = 36
+LABEL_WIDTH = 56
+MIN_TEXT_HEIGHT = 14  # smaller cells show their colour only
+
+# ---------------------------------------------------------------------------
+# Canvas
+# ---------------------------------------------------------------------------
+class WeekGrid(tk.Canvas):
+    """A week of slots on one Canvas; its items are reused from week to week."""
+
+    def __init__(self, parent, colors: Dict[str, str], foreground: str, **kwargs):
+        super().__init__(parent, highlightthickness=0, **kwargs)
+        self.colors = colors  # state -> fill colour
+        self.foreground = foreground
+        self.slot: Optional[int] = None
+        self.day_items: List[int] = []
+        self.time_items: List[Tuple[int, int]] = []  # (slot row, item)
+        self.cells: List[List[Tuple[int, int]]] = []  # [day][slot] -> (rectangle, text)
+        self.states: List[List[Optional[str]]] = []
+        self.bind("<Configure>", lambda e: self._place())
+
+    def layout(self, slot: int) -> None:
+        """Create the items for ``slot``-minute slots (nothing to do if unchanged)."""
+        if slot == self.slot:
+            return
+        self.delete("all")
+        self.slot = slot
+        starts = slot_minutes(slot)
+        self.day_items = [
+            self.create_text(0, 0, justify="center", fill=self.foreground) for _ in DAYS
+        ]
+        self.time_items = [
+            (row, self.create_text(0, 0, text=f"{m // 60:02d}:00", fill=self.foreground))
+            for row, m in enumerate(starts) if m % 60 == 0
+        ]
+        self.cells = [
+            [(self.create_rectangle(0, 0, 0, 0, outline=""), self.create_text(0, 0, fill="#fff"))
+             for _ in starts]
+            for _ in DAYS
+        ]
+        self.states = [[None] * len(starts) for _ in DAYS]
+        self._place()
+
+    def show(self, week_start: date, states: List[List[str]]) -> None:
+        """Colour the cells for one week; only cells whose state changed are touched."""
+        for i, item in enumerate(self.day_items):
+            self.itemconfigure(item, text=f"{DAYS[i]}\n{week_start + timedelta(days=i):%d/%m}")
+        for day, row in enumerate(states):
+            shown = self.states[day]
+            for j, state in enumerate(row):
+                if shown[j] != state:
+                    rectangle, text = self.cells[day][j]
+                    self.itemconfigure(rectangle, fill=self.colors[state])
+                    self.itemconfigure(text, text=CELL_TEXT[state])
+                    shown[j] = state
+
+    def _place(self) -> None:
+        # Only on resize or a new slot size: move every item to its cell.
+        if not self.cells:
+            return
+        rows = len(self.cells[0])
+        width = (max(self.winfo_width(), 200) - LABEL_WIDTH) / 7
+        height = (max(self.winfo_height(), 200) - HEADER_HEIGHT) / rows
+        for i, item in enumerate(self.day_items):
+            self.coords(item, LABEL_WIDTH + (i + 0.5) * width, HEADER_HEIGHT / 2)
+        for row, item in self.time_items:
+            self.coords(item, LABEL_WIDTH / 2, HEADER_HEIGHT + row * height + min(height, 20) / 2)
+        text_state = "normal" if height >= MIN_TEXT_HEIGHT else "hidden"
+        for day, column in enumerate(self.cells):
+            x = LABEL_WIDTH + day * width
+            for row, (rectangle, text) in enumerate(column):
+                y = HEADER_HEIGHT + row * height
+                self.coords(rectangle, x + 1, y + 1, x + width - 1, y + height - 1)
+                self.coords(text, x + width / 2, y + height / 2)
+                self.itemconfigure(text, state=text_state)
 
+# ---------------------------------------------------------------------------
+# Window
+# ---------------------------------------------------------------------------
 def show_employee_calendar_window(root):
     # Main window
     win = tb.Toplevel(root)
@@ -28,10 +107,11 @@ def show_employee_calendar_window(root):
     win.geometry("950x600")
 
     # Employee selection
-    employees = get_employees()
+    employees = employee_directory.employees()
     emp_names = [f"{e.name} ({e.email})" for e in employees]
     sel_emp = tb.StringVar(value=emp_names[0] if emp_names else "")
     sel_week = tb.StringVar()
+    sel_slot = tb.StringVar(value=SLOT_CHOICES[0])
 
     # Current week (monday)
     today = datetime.now().date()
@@ -46,83 +126,13 @@ def show_employee_calendar_window(root):
         return None
 
     def refresh_calendar():
-        for widget in frame_calendar.winfo_children():
-            widget.destroy()
         employee = get_selected_employee()
-        print("Empleado:", employee.name)
-        print("Availability", employee.availability)
         if not employee:
             return
         week_start = datetime.strptime(sel_week.get(), "%Y-%m-%d").date()
-        week_days = [week_start + timedelta(days=i) for i in range(7)]
-        # title days
-        for i, day in enumerate(DAYS):
-            date_str = week_days[i].strftime("%d/%m")
-            l = ttk.Label(frame_calendar, text=f"{day}\n{date_str}", anchor="center")
-            l.grid(row=0, column=i+1, padx=2, pady=2)
-        # Time
-        for j, hour in enumerate(HOUR_BLOCKS):
-            l = ttk.Label(frame_calendar, text=hour, anchor="center")
-            l.grid(row=j+1, column=0, padx=2, pady=2)
-        # Cells: availability
-        # Find appointments of that employee
-        citas = []
-        for ap in get_appointments():
-            # ap: (id, client_name, employee_name, start, end, status)
-            emp_name = ap[2]
-            if emp_name == employee.name:
-                start_dt = datetime.strptime(ap[3], "%Y-%m-%d %H:%M:%S")
-                end_dt = datetime.strptime(ap[4], "%Y-%m-%d %H:%M:%S")
-                if week_start <= start_dt.date() <= week_start + timedelta(days=6):
-                    citas.append((start_dt, end_dt))
-        print(f"Citas para {employee.name} en semana que inicia {week_start}:")
-        for c in citas:
-            print(f"{c[0]} - {c[1]}")
-
-        for i, day in enumerate(DAYS):
-            this_date = week_days[i]
-            blocks = employee.availability.get(day, [])
-            # List of actual availability intervals for that day 
-            available_intervals = []
-            for block in blocks:
-                h_ini, h_fin = parse_block(block)
-                if h_ini is not None:
-                    available_intervals.append((h_ini, h_fin))
-            for j, hour in enumerate(HOUR_BLOCKS):
-                block_time = datetime.combine(this_date, datetime.strptime(hour, "%H:%M").time())
-                siguiente = block_time + timedelta(hours=1)
-                block_start_time = block_time.time()
-                block_end_time = siguiente.time()
-                # Is this block available?
-                disp = False
-                for h_ini, h_fin in available_intervals:
-                    # The block must be fully contained within the availability interval
-                    if h_ini <= block_start_time < h_fin and block_end_time <= h_fin:
-                        disp = True
-                        break
-                ocupado = block_is_occupied(block_time, siguiente, citas)
-                if ocupado:
-                    print(f"Bloque ocupado detectado: {day} {hour} ({block_time} - {siguiente})")
-                    color = "danger"
-                    text= "X"
-                    state = "disabled"
-                elif disp:
-                    color = "success"
-                    text = ""
-                    state = "normal"
-                else:
-                    color = "secondary"
-                    text = "-"
-                    state = "disabled"
-
-                btn = tb.Button(
-                    frame_calendar,
-                    text=text,
-                    width=4,
-                    bootstyle=color,
-                    state=state
-                )
-                btn.grid(row=j+1, column=i+1, padx=1, pady=1)
+        slot = int(sel_slot.get())
+        grid.layout(slot)
+        grid.show(week_start, week_states(employee.id, week_start, slot))
 
     # employee selector
     frame_top = tb.Frame(win)
@@ -145,12 +155,23 @@ def show_employee_calendar_window(root):
         refresh_calendar()
     tb.Button(frame_top, text="⏪", bootstyle="secondary", command=prev_week).pack(side="left", padx=5)
     tb.Button(frame_top, text="⏩", bootstyle="secondary", command=next_week).pack(side="left", padx=5)
+    ttk.Label(frame_top, text="Slot (min):").pack(side="left", padx=5)
+    slot_cb = ttk.Combobox(frame_top, textvariable=sel_slot, values=SLOT_CHOICES, state="readonly", width=4)
+    slot_cb.pack(side="left", padx=5)
     tb.Button(frame_top, text="Show", bootstyle="primary", command=refresh_calendar).pack(side="left", padx=10)
 
     # Calendar
-    frame_calendar = tb.Frame(win)
-    frame_calendar.pack(padx=10, pady=10, fill="both", expand=True)
+    colors = tb.Style().colors
+    grid = WeekGrid(
+        win,
+        colors={state: colors.get(name) for state, name in CELL_COLOR.items()},
+        foreground=colors.fg,
+        background=colors.bg,
+    )
+    grid.pack(padx=10, pady=10, fill="both", expand=True)
 
     # Inicial
     emp_cb.bind("<<ComboboxSelected>>", lambda e: refresh_calendar())
-    refresh_calendar()
\ No newline at end of file
+    slot_cb.bind("<<ComboboxSelected>>", lambda e: refresh_calendar())
+    week_entry.bind("<Return>", lambda e: refresh_calendar())
+    refresh_calendar()
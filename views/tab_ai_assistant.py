@@ -3,10 +3,22 @@
 # ui/ai_tab.py
 import tkinter as tk
 from tkinter import ttk
-import re
 from datetime import datetime, timedelta
 from smartscheduler.data.database import get_client_by_name, cancel_appointments_by_client_id, cancel_appointment_by_id, get_active_appointments_by_client_id
+from smartscheduler.ai.rule_engine import (
+    CONTEXT_AWAITING_CLIENT,
+    CONTEXT_CHOOSING_APPOINTMENT,
+    CONTEXT_CONFIRMING_CANCEL_ALL,
+    INTENT_CANCEL_ALL,
+    INTENT_CANCEL_APPOINTMENT,
+    INTENT_CANCEL_CLIENT_NAME,
+    INTENT_CONFIRM_CANCEL_ALL,
+    INTENT_PICK_APPOINTMENT,
+    INTENT_SCHEDULE_EXPLICIT,
+    assistant_rules,
+)
 from smartscheduler.core.ai_engine import chat_completion
+from smartscheduler.core.sessions import sessions
 from smartscheduler.core.scheduler_utils import schedule_appointment_with_validation
 
 class AIAssistantTab(ttk.Frame):
@@ -14,12 +26,23 @@ class AIAssistantTab(ttk.Frame):
         super().__init__(parent)
 
         self.history = []
+        self.session_id = sessions.get().id
         self.pending_cancellation = None
         self.awaiting_cancellation_client = False
 
         self.awaiting_cancellation_which = False
         self.citas_a_cancelar = []
 
+        # Intents handled by the tab itself; the rest go to the engine.
+        self.handlers = {
+            INTENT_PICK_APPOINTMENT: self.on_pick_appointment,
+            INTENT_CANCEL_APPOINTMENT: self.on_cancel_appointment,
+            INTENT_CANCEL_CLIENT_NAME: self.on_cancel_client_name,
+            INTENT_SCHEDULE_EXPLICIT: self.on_schedule_explicit,
+            INTENT_CONFIRM_CANCEL_ALL: self.on_confirm_cancel_all,
+            INTENT_CANCEL_ALL: self.on_cancel_all,
+        }
+
         self.chat_display = tk.Text(self, wrap="word", state="disabled", height=25)
         self.chat_display.pack(padx=10, pady=10, fill="both", expand=True)
 
@@ -42,168 +65,139 @@ class AIAssistantTab(ttk.Frame):
         self.append_to_chat("You", user_input)
         self.history.append(("user", user_input))
 
-         # --- STEP 1: If we are waiting for the user to choose which appointment to cancel ---
-        if self.awaiting_cancellation_which:
-            try:
-                idx = int(user_input.strip()) - 1
-                cita = self.citas_a_cancelar[idx]
-                affected = cancel_appointment_by_id(cita[0])  # cita[0] es el id
-                if affected:
-                    reply = f"Appointment cancelled: {cita[1]} a {cita[2]} with employee ID {cita[3]}"
-                else:
-                    reply = "Could not cancel the appointment, perhaps is already cancelled before ."
-            except Exception:
-                reply = "Invalid selection. Please, insert the number of the appointment to be cancelled."
-                self.history.append(("assistant", reply))
-                self.append_to_chat("AI", reply)
-                return
-            self.awaiting_cancellation_which = False
-            self.citas_a_cancelar = []
-            self.history.append(("assistant", reply))
-            self.append_to_chat("AI", reply)
-            return
-
-        # --- STEP 2: If user want to cancel ---
-        if "cancel" in user_input.lower() and "appointment" in user_input.lower():
-            lowered = user_input.lower()
-            # Extracts the customer's name after the word for
-            if "for" in lowered:
-                idx = lowered.find("for") + 4
-                client_name = user_input[idx:].strip()
-            else:
-                client_name = ""
-            if not client_name:
-                reply = "Which client do you want to cancel an appointment for? Write the name."
-                self.awaiting_cancellation_client = True
-                self.history.append(("assistant", reply))
-                self.append_to_chat("AI", reply)
-                return
+        intent = assistant_rules.match(user_input, self.context())
+        handler = self.handlers.get(intent.intent) if intent else None
+        if handler is not None:
+            reply = handler(intent)
+        else:
+            # --- CONTINUES THE NORMAL FLOW OF THE ASSISTANT ---
+            self.chat_display.config(state="normal")
+            self.chat_display.insert(tk.END, "AI typing...\n")
+            self.chat_display.config(state="disabled")
+            self.chat_display.see(tk.END)
 
-            client = get_client_by_name(client_name)
-            if not client:
-                reply = f"Client not found '{client_name}'."
-                self.history.append(("assistant", reply))
-                self.append_to_chat("AI", reply)
-                return
-
-            citas = get_active_appointments_by_client_id(client.id)
-            if not citas:
-                reply = f"{client_name} does not have appointments to cancel."
-            elif len(citas) == 1:
-                affected = cancel_appointment_by_id(citas[0][0])
-                if affected:
-                    reply = f"appointment cancelled: {citas[0][1]} a {citas[0][2]} with employee ID {citas[0][3]}"
-                else:
-                    reply = "Your appointment could not be cancelled, perhaps it was already cancelled before."
-            else:
-                listado = "\n".join(
-                    [f"{i+1}. {c[1]} a {c[2]} with employee ID {c[3]}" for i, c in enumerate(citas)]
-                )
-                reply = (
-                    f"{client_name} has several active appointments:\n{listado}\n"
-                    "Please, insert the number of the appointment you want to cancel."
-                )
-                self.awaiting_cancellation_which = True
-                self.citas_a_cancelar = citas
-            self.history.append(("assistant", reply))
-            self.append_to_chat("AI", reply)
-            return
+            self.update_idletasks()
 
-        # --- STEP 3: If waiting for the user to write ---
-        if self.awaiting_cancellation_client:
-            client_name = user_input
-            client = get_client_by_name(client_name)
-            if not client:
-                reply = f"Client was not found '{client_name}'."
-                self.awaiting_cancellation_client = False
-                self.history.append(("assistant", reply))
-                self.append_to_chat("AI", reply)
-                return
-            citas = get_active_appointments_by_client_id(client.id)
-            if not citas:
-                reply = f"{client_name} have no appointments to cancel."
-                self.awaiting_cancellation_client = False
-            elif len(citas) == 1:
-                affected = cancel_appointment_by_id(citas[0][0])
-                if affected:
-                    reply = f"Appointment cancelled: {citas[0][1]} a {citas[0][2]} with employee ID {citas[0][3]}"
-                else:
-                    reply = "Your appointment could not be cancelled, perhaps it was already cancelled previously."
-                self.awaiting_cancellation_client = False
-            else:
-                listado = "\n".join(
-                    [f"{i+1}. {c[1]} a {c[2]} with employee ID {c[3]}" for i, c in enumerate(citas)]
-                )
-                reply = (
-                    f"{client_name} have several active appointments:\n{listado}\n"
-                    "Please, insert the number of the appointment you want to cancel"
-                )
-                self.awaiting_cancellation_which = True
-                self.citas_a_cancelar = citas
-                self.awaiting_cancellation_client = False
-            self.history.append(("assistant", reply))
-            self.append_to_chat("AI", reply)
-            return
+            try:
+                reply = chat_completion(sessions.get(self.session_id), self.history, intent)
+            except Exception as e:
+                reply = f"[Error]: {e}"
 
-        # --- ORIGINAL SCHEDULE ---
-        schedule_reply = self.try_schedule_from_input(user_input)
-        if schedule_reply:
-            self.history.append(("assistant", schedule_reply))
-            self.append_to_chat("AI", schedule_reply)
-            return
+        self.history.append(("assistant", reply))
+        self.append_to_chat("AI", reply)
 
-        # --- MASS CANCELATION ---
+    def context(self):
+        """Context flags for the assistant rules, from the pending steps."""
+        flags = set()
+        if self.awaiting_cancellation_which:
+            flags.add(CONTEXT_CHOOSING_APPOINTMENT)
+        if self.awaiting_cancellation_client:
+            flags.add(CONTEXT_AWAITING_CLIENT)
         if self.pending_cancellation:
-            if user_input.lower() in ("si", "yes", "confirm", "ok"):
-                client_name = self.pending_cancellation
-                client = get_client_by_name(client_name)
-                if client:
-                    cancel_appointments_by_client_id(client.id)
-                    reply = f"All appointments for {client.name} have been cancelled."
-                else:
-                    reply = f"No client found with the name '{client_name}'."
-                self.pending_cancellation = None
+            flags.add(CONTEXT_CONFIRMING_CANCEL_ALL)
+        return flags
+
+    # --- Intent handlers: each returns the reply ---
+    def on_pick_appointment(self, intent):
+        # The user chooses which appointment to cancel
+        choice = intent.slots["choice"]
+        if choice is None or not 1 <= choice <= len(self.citas_a_cancelar):
+            return "Invalid selection. Please, insert the number of the appointment to be cancelled."
+        cita = self.citas_a_cancelar[choice - 1]
+        affected = cancel_appointment_by_id(cita[0])  # cita[0] es el id
+        if affected:
+            reply = f"Appointment cancelled: {cita[1]} a {cita[2]} with employee ID {cita[3]}"
+        else:
+            reply = "Could not cancel the appointment, perhaps is already cancelled before ."
+        self.awaiting_cancellation_which = False
+        self.citas_a_cancelar = []
+        return reply
+
+    def on_cancel_appointment(self, intent):
+        client_name = intent.slots["client_name"] or ""
+        if not client_name:
+            self.awaiting_cancellation_client = True
+            return "Which client do you want to cancel an appointment for? Write the name."
+
+        client = get_client_by_name(client_name)
+        if not client:
+            return f"Client not found '{client_name}'."
+
+        citas = get_active_appointments_by_client_id(client.id)
+        if not citas:
+            reply = f"{client_name} does not have appointments to cancel."
+        elif len(citas) == 1:
+            affected = cancel_appointment_by_id(citas[0][0])
+            if affected:
+                reply = f"appointment cancelled: {citas[0][1]} a {citas[0][2]} with employee ID {citas[0][3]}"
             else:
-                reply = "Appointment Cancellation aborted"
-                self.pending_cancellation = None
-            self.history.append(("assistant", reply))
-            self.append_to_chat("AI", reply)
-            return
-
-        # --- Deprecated bulk flow  ---
-        if "cancel all" in user_input.lower() and "appointments" in user_input.lower():
-            lowered = user_input.lower()
-            if "for" in lowered:
-                idx = lowered.find("for") + 4
-                client_name = user_input[idx:].strip()
+                reply = "Your appointment could not be cancelled, perhaps it was already cancelled before."
+        else:
+            listado = "\n".join(
+                [f"{i+1}. {c[1]} a {c[2]} with employee ID {c[3]}" for i, c in enumerate(citas)]
+            )
+            reply = (
+                f"{client_name} has several active appointments:\n{listado}\n"
+                "Please, insert the number of the appointment you want to cancel."
+            )
+            self.awaiting_cancellation_which = True
+            self.citas_a_cancelar = citas
+        return reply
+
+    def on_cancel_client_name(self, intent):
+        # The user writes the name of the client whose appointment to cancel
+        client_name = intent.slots["client_name"]
+        client = get_client_by_name(client_name)
+        if not client:
+            self.awaiting_cancellation_client = False
+            return f"Client was not found '{client_name}'."
+        citas = get_active_appointments_by_client_id(client.id)
+        if not citas:
+            reply = f"{client_name} have no appointments to cancel."
+            self.awaiting_cancellation_client = False
+        elif len(citas) == 1:
+            affected = cancel_appointment_by_id(citas[0][0])
+            if affected:
+                reply = f"Appointment cancelled: {citas[0][1]} a {citas[0][2]} with employee ID {citas[0][3]}"
             else:
-                client_name = ""
-
-            if client_name:
-                reply = f"Are you sure you want to cancel all appointments for {client_name}? (Reply 'yes' to confirm)"
-                self.pending_cancellation = client_name
+                reply = "Your appointment could not be cancelled, perhaps it was already cancelled previously."
+            self.awaiting_cancellation_client = False
+        else:
+            listado = "\n".join(
+                [f"{i+1}. {c[1]} a {c[2]} with employee ID {c[3]}" for i, c in enumerate(citas)]
+            )
+            reply = (
+                f"{client_name} have several active appointments:\n{listado}\n"
+                "Please, insert the number of the appointment you want to cancel"
+            )
+            self.awaiting_cancellation_which = True
+            self.citas_a_cancelar = citas
+            self.awaiting_cancellation_client = False
+        return reply
+
+    def on_confirm_cancel_all(self, intent):
+        # --- MASS CANCELATION ---
+        if intent.slots["confirmed"]:
+            client_name = self.pending_cancellation
+            client = get_client_by_name(client_name)
+            if client:
+                cancel_appointments_by_client_id(client.id)
+                reply = f"All appointments for {client.name} have been cancelled."
             else:
-                reply = "Which client would you like to cancel all appointments for? Please specify the name"
-                self.awaiting_cancellation_client = True
-            self.history.append(("assistant", reply))
-            self.append_to_chat("AI", reply)
-            return
-
-        # --- CONTINUES THE NORMAL FLOW OF THE ASSISTANT ---
-        self.chat_display.config(state="normal")
-        self.chat_display.insert(tk.END, "AI typing...\n")
-        self.chat_display.config(state="disabled")
-        self.chat_display.see(tk.END)
-
-        self.update_idletasks()
-
-        try:
-            reply = chat_completion(self.history)
-        except Exception as e:
-            reply = f"[Error]: {e}"
+                reply = f"No client found with the name '{client_name}'."
+        else:
+            reply = "Appointment Cancellation aborted"
+        self.pending_cancellation = None
+        return reply
 
-        self.history.append(("assistant", reply))
-        self.append_to_chat("AI", reply)
+    def on_cancel_all(self, intent):
+        # --- Deprecated bulk flow  ---
+        client_name = intent.slots["client_name"]
+        if client_name:
+            self.pending_cancellation = client_name
+            return f"Are you sure you want to cancel all appointments for {client_name}? (Reply 'yes' to confirm)"
+        self.awaiting_cancellation_client = True
+        return "Which client would you like to cancel all appointments for? Please specify the name"
 
     def append_to_chat(self, speaker, text):
         self.chat_display.config(state="normal")
@@ -211,34 +205,29 @@ class AIAssistantTab(ttk.Frame):
         self.chat_display.config(state="disabled")
         self.chat_display.see(tk.END)
 
-    def try_schedule_from_input(self, user_input):
+    def on_schedule_explicit(self, intent):
         """
-        Detect and schedule appointments for messages like:
+        Schedule appointments from messages like:
         'Schedule appointment with Laura Sanchez on 27/06/2025 at 16:00 for Adriana Vargas'
         """
-        m = re.search(
-            r"(?:appointment|cita)\s+with\s+([\w\s]+)\s+on\s+(\d{1,2}/\d{1,2}/\d{4})\s+at\s+(\d{1,2}(?::\d{2})?)\s*(am|pm)?(?:\s+for\s+([\w\s]+))?",
-            user_input, re.IGNORECASE)
-        if m:
-            employee_name = m.group(1).strip()
-            date_str = m.group(2).strip()
-            time_str = m.group(3).strip()
-            am_pm = m.group(4)
-            client_name = m.group(5).strip() if m.group(5) else "Unknown Client"
-
-            # Process date and time
-            try:
-                start_date = datetime.strptime(date_str, "%d/%m/%Y")
-                if am_pm:
-                    start_time = datetime.strptime(time_str + " " + am_pm, "%I:%M %p" if ":" in time_str else "%I %p")
-                else:
-                    start_time = datetime.strptime(time_str, "%H:%M" if ":" in time_str else "%H")
-                start = start_date.replace(hour=start_time.hour, minute=start_time.minute)
-                end = start + timedelta(hours=1)
-            except Exception as e:
-                return f"Could not parse date/time: {e}"
-
-            ok, msg = schedule_appointment_with_validation(client_name, employee_name, start, end)
-            return msg
+        slots = intent.slots
+        employee_name = slots["employee"].strip()
+        date_str = slots["date"].strip()
+        time_str = slots["time"].strip()
+        am_pm = slots["meridiem"]
+        client_name = slots["client"].strip() if slots["client"] else "Unknown Client"
+
+        # Process date and time
+        try:
+            start_date = datetime.strptime(date_str, "%d/%m/%Y")
+            if am_pm:
+                start_time = datetime.strptime(time_str + " " + am_pm, "%I:%M %p" if ":" in time_str else "%I %p")
+            else:
+                start_time = datetime.strptime(time_str, "%H:%M" if ":" in time_str else "%H")
+            start = start_date.replace(hour=start_time.hour, minute=start_time.minute)
+            end = start + timedelta(hours=1)
+        except Exception as e:
+            return f"Could not parse date/time: {e}"
 
-        return None
\ No newline at end of file
+        ok, msg = schedule_appointment_with_validation(client_name, employee_name, start, end)
+        return msg
@@ -0,0 +1,251 @@
+"""
+Team calendar: employees as rows and time slots as columns, for a day or
+a week.
+
+Occupancy for everyone is loaded at once with ``team_grid`` (one grouped
+query). The Canvas only holds the rows on screen: each visible row is a
+name plus a pool of rectangles, one per run of slots in the same state,
+reused as the list scrolls, so 500 employees scroll like 10. Clicking a
+slot heading keeps only the employees free in that slot.
+"""
+
+import tkinter as tk
+from datetime import datetime, timedelta
+from tkinter import ttk
+from typing import Dict, List, Optional, Tuple
+
+import ttkbootstrap as tb
+
+from smartscheduler.data.directory import employee_directory
+from smartscheduler.models.person import Employee
+from smartscheduler.services.calendar_grid import TeamGrid, slot_minutes, team_grid
+from smartscheduler.views.employee_calendar import CELL_COLOR, DAYS, SLOT_CHOICES
+
+RANGES = {"Day": 1, "Week": 7}
+ALL_ROLES = "All"
+ROW_HEIGHT = 22
+HEADER_HEIGHT = 40
+NAME_WIDTH = 180
+WHEEL_ROWS = 3
+
+class TeamCalendar(ttk.Frame):
+    """Scrollable grid of employees by slots, drawing only the visible rows."""
+
+    def __init__(self, parent, colors: Dict[str, str], foreground: str, background: str):
+        super().__init__(parent)
+        self.colors = colors  # state -> fill colour
+        self.foreground = foreground
+        self.team: Optional[TeamGrid] = None
+        self.everyone: List[Employee] = []
+        self.employees: List[Employee] = []  # the rows, after the slot filter
+        self.filter_slot: Optional[int] = None
+        self.top = 0
+        self._runs: Dict[int, List[Tuple[int, int, str]]] = {}  # per employee, for self.team
+        self._pool: List[Tuple[int, List[int]]] = []  # per screen row: (name item, rectangles)
+
+        self.info = ttk.Label(self)
+        self.info.pack(fill="x", padx=10)
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, padx=10, pady=10)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = tk.Canvas(body, highlightthickness=0, background=background)
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+
+    # --- Public API ---
+    def load(self, team: TeamGrid, employees: List[Employee]) -> None:
+        """Show a freshly loaded grid for these employees (in row order)."""
+        self.team = team
+        self.everyone = employees
+        self._runs.clear()
+        if self.filter_slot is not None and self.filter_slot >= team.buckets:
+            self.filter_slot = None
+        self._filter()
+        self.redraw()
+
+    def redraw(self) -> None:
+        """Headings and rows (after a load or a resize)."""
+        self._draw_headings()
+        self.render()
+
+    # --- Rows ---
+    def visible(self) -> int:
+        return max(1, (self.canvas.winfo_height() - HEADER_HEIGHT) // ROW_HEIGHT)
+
+    def render(self) -> None:
+        if self.team is None:
+            return
+        visible = self.visible()
+        self.top = max(0, min(self.top, len(self.employees) - visible))
+        while len(self._pool) < visible:
+            self._pool.append((self.canvas.create_text(0, 0, anchor="w", fill=self.foreground), []))
+        x0, width = NAME_WIDTH, self._slot_width()
+        for i, (name, rectangles) in enumerate(self._pool):
+            index = self.top + i
+            if i >= visible or index >= len(self.employees):
+                self.canvas.itemconfigure(name, state="hidden")
+                for rectangle in rectangles:
+                    self.canvas.itemconfigure(rectangle, state="hidden")
+                continue
+            employee = self.employees[index]
+            y = HEADER_HEIGHT + i * ROW_HEIGHT
+            self.canvas.coords(name, 4, y + ROW_HEIGHT / 2)
+            self.canvas.itemconfigure(name, text=employee.name, state="normal")
+            runs = self._row_runs(employee.id)
+            while len(rectangles) < len(runs):
+                rectangles.append(self.canvas.create_rectangle(0, 0, 0, 0, outline=""))
+            for rectangle, (first, last, state) in zip(rectangles, runs):
+                self.canvas.coords(rectangle, x0 + first * width, y + 1, x0 + last * width, y + ROW_HEIGHT - 1)
+                self.canvas.itemconfigure(rectangle, fill=self.colors[state], state="normal")
+            for rectangle in rectangles[len(runs):]:
+                self.canvas.itemconfigure(rectangle, state="hidden")
+        self.canvas.tag_raise("grid")
+        total = max(1, len(self.employees))
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+
+    def scroll(self, rows: int) -> None:
+        self.top += rows
+        self.render()
+
+    def on_scrollbar(self, action, *args) -> None:
+        if action == "moveto":
+            self.top = int(float(args[0]) * len(self.employees))
+        elif action == "scroll":
+            step = int(args[0])
+            self.top += step * self.visible() if args[1] == "pages" else step
+        self.render()
+
+    def on_click(self, event) -> None:
+        # A slot heading toggles "only employees free in this slot".
+        if self.team is None or event.y >= HEADER_HEIGHT or event.x < NAME_WIDTH:
+            return
+        slot = int((event.x - NAME_WIDTH) // self._slot_width())
+        if slot >= self.team.buckets:
+            return
+        self.filter_slot = None if slot == self.filter_slot else slot
+        self.top = 0
+        self._filter()
+        self.redraw()
+
+    # --- Helpers ---
+    def _row_runs(self, employee_id: int) -> List[Tuple[int, int, str]]:
+        runs = self._runs.get(employee_id)
+        if runs is None:
+            runs = self._runs[employee_id] = self.team.runs(employee_id)
+        return runs
+
+    def _slot_width(self) -> float:
+        return max(1.0, (self.canvas.winfo_width() - NAME_WIDTH) / max(1, self.team.buckets))
+
+    def _slot_label(self, slot: int) -> str:
+        day, i = divmod(slot, self.team.per_day)
+        minute = slot_minutes(self.team.slot)[i]
+        date = self.team.first_day + timedelta(days=day)
+        return f"{DAYS[date.weekday()]} {date:%d/%m} {minute // 60:02d}:{minute % 60:02d}"
+
+    def _filter(self) -> None:
+        if self.filter_slot is None:
+            self.employees = self.everyone
+            self.info.config(text=f"{len(self.everyone)} employees")
+            return
+        free = set(self.team.free_employees(self.filter_slot, self.filter_slot + 1))
+        self.employees = [e for e in self.everyone if e.id in free]
+        self.info.config(
+            text=f"{len(self.employees)} of {len(self.everyone)} employees free on "
+                 f"{self._slot_label(self.filter_slot)} (click the heading again to show all)"
+        )
+
+    def _draw_headings(self) -> None:
+        self.canvas.delete("grid")
+        if self.team is None:
+            return
+        team, width = self.team, self._slot_width()
+        bottom = HEADER_HEIGHT + self.visible() * ROW_HEIGHT
+        starts = slot_minutes(team.slot)
+        for day in range(team.days):
+            x = NAME_WIDTH + day * team.per_day * width
+            if team.days > 1:
+                date = team.first_day + timedelta(days=day)
+                self.canvas.create_text(x + 2, 2, anchor="nw", fill=self.foreground, tags="grid",
+                                        text=f"{DAYS[date.weekday()][:3]} {date:%d/%m}")
+                self.canvas.create_line(x, 0, x, bottom, fill=self.foreground, tags="grid")
+            for i, minute in enumerate(starts):
+                # Hour labels where they fit (always on a single day).
+                if minute % 60 or (team.days > 1 and (minute // 60 - starts[0] // 60) % 4):
+                    continue
+                self.canvas.create_text(x + i * width + 1, HEADER_HEIGHT - 2, anchor="sw",
+                                        fill=self.foreground, tags="grid", text=f"{minute // 60:02d}")
+        if self.filter_slot is not None:
+            x = NAME_WIDTH + self.filter_slot * width
+            self.canvas.create_rectangle(x, HEADER_HEIGHT - 4, x + width, bottom,
+                                         outline=self.foreground, width=2, tags="grid")
+
+# ---------------------------------------------------------------------------
+# Window
+# ---------------------------------------------------------------------------
+def show_team_calendar_window(root):
+    win = tb.Toplevel(root)
+    win.title("Team Calendar")
+    win.geometry("1200x700")
+
+    employees = employee_directory.employees()
+    roles = sorted({e.role for e in employees if e.role})
+    sel_range = tb.StringVar(value="Day")
+    sel_date = tb.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
+    sel_slot = tb.StringVar(value=SLOT_CHOICES[0])
+    sel_role = tb.StringVar(value=ALL_ROLES)
+
+    def refresh():
+        days = RANGES[sel_range.get()]
+        first_day = datetime.strptime(sel_date.get(), "%Y-%m-%d").date()
+        if days == 7:
+            first_day -= timedelta(days=first_day.weekday())  # the week's Monday
+        role = sel_role.get()
+        rows = sorted(
+            (e for e in employee_directory.employees() if role == ALL_ROLES or e.role == role),
+            key=lambda e: e.name.lower(),
+        )
+        view.load(team_grid([e.id for e in rows], first_day, days, int(sel_slot.get())), rows)
+
+    def move(step):
+        day = datetime.strptime(sel_date.get(), "%Y-%m-%d").date()
+        sel_date.set((day + timedelta(days=step * RANGES[sel_range.get()])).strftime("%Y-%m-%d"))
+        refresh()
+
+    frame_top = tb.Frame(win)
+    frame_top.pack(pady=10)
+    ttk.Label(frame_top, text="Show:").pack(side="left", padx=5)
+    range_cb = ttk.Combobox(frame_top, textvariable=sel_range, values=list(RANGES), state="readonly", width=6)
+    range_cb.pack(side="left", padx=5)
+    ttk.Label(frame_top, text="Date:").pack(side="left", padx=5)
+    date_entry = ttk.Entry(frame_top, textvariable=sel_date, width=12)
+    date_entry.pack(side="left", padx=5)
+    tb.Button(frame_top, text="⏪", bootstyle="secondary", command=lambda: move(-1)).pack(side="left", padx=5)
+    tb.Button(frame_top, text="⏩", bootstyle="secondary", command=lambda: move(1)).pack(side="left", padx=5)
+    ttk.Label(frame_top, text="Slot (min):").pack(side="left", padx=5)
+    slot_cb = ttk.Combobox(frame_top, textvariable=sel_slot, values=SLOT_CHOICES, state="readonly", width=4)
+    slot_cb.pack(side="left", padx=5)
+    ttk.Label(frame_top, text="Role:").pack(side="left", padx=5)
+    role_cb = ttk.Combobox(frame_top, textvariable=sel_role, values=[ALL_ROLES] + roles, state="readonly", width=14)
+    role_cb.pack(side="left", padx=5)
+    tb.Button(frame_top, text="Show", bootstyle="primary", command=refresh).pack(side="left", padx=10)
+
+    colors = tb.Style().colors
+    view = TeamCalendar(
+        win,
+        colors={state: colors.get(name) for state, name in CELL_COLOR.items()},
+        foreground=colors.fg,
+        background=colors.bg,
+    )
+    view.pack(fill="both", expand=True)
+
+    for box in (range_cb, slot_cb, role_cb):
+        box.bind("<<ComboboxSelected>>", lambda e: refresh())
+    date_entry.bind("<Return>", lambda e: refresh())
+    refresh()